@@ -3,10 +3,18 @@
 Data Logger Automation Service
 Handles XML → Database automation and Unitas upload scheduling
 
-Upload triggers:
-- On startup: Check database for pending uploads
-- At 3 AM daily: Check database for pending uploads
-- On file detection: When pending_upload file appears in /var/lib/datalogger/
+Unitas uploads run from a queue in the database (Upload_Jobs). Jobs come from:
+- The web app: "Send to Unitas" and manual re-sends enqueue the date directly
+- On startup and at 3 AM daily: every date still pending upload
+- The cooler log schedule: every date with an unsent cooler log
+- On file detection: a pending_upload file in the config directory (older web apps)
+- On startup and at 3 AM daily: one verification of the last week's uploads
+A single worker runs them one at a time and retries failures with backoff.
+Finished jobs are deleted after UPLOAD_JOB_RETENTION_DAYS.
+
+Only the default house is automated: XML import, the upload queue and the
+Unitas farm/house ids all come from the main config and its database. Other
+houses (server/tenants.py) are served by the web app only.
 """
 import sys
 import schedule
@@ -15,7 +23,8 @@ import time
 import argparse
 import os
 import json
-from datetime import datetime, timedelta
+import threading
+from datetime import date, datetime, timedelta
 import pathlib
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
@@ -33,6 +42,7 @@ from server.xml_processing import deleteOldFiles, do_xml_setup
 import server.unitas_manager.unitas_coolerlog as coolerlog
 import server.unitas_manager.unitas_production as unitas
 from server.unitas_manager.unitas_helper import set_timeout as helper_set_timeout
+from unitas_session import UnitasSession, WarmUnitasSession
 
 
 # ─── Logging ───
@@ -55,6 +65,8 @@ parser.add_argument("--CoolerLogToUnitas", "-CTU", action="store_true", help="Lo
 parser.add_argument("--CoolerLogToDB", "-CTD", action="store_true", help="Backup cooler logs → Cooler DB (one-shot)")
 parser.add_argument("--NoDelete", "-ND", action="store_true", help="Don't delete old XML files")
 parser.add_argument("--date", "-d", type=str, help="Specific date for Unitas upload (YYYY-MM-DD format)")
+parser.add_argument("--WarmBrowser", "-WB", action="store_true",
+                    help="Keep a logged-in headless browser ready for uploads (Forever Mode)")
 args = parser.parse_args()
 
 # ─── Config ───
@@ -69,6 +81,8 @@ config = get_flat_config()
 RETRIEVE_FROM_XML_TIME = config["retrieve_from_xml_time"]
 LOG_COOLER_TO_UNITAS = config["Cooler_Log_To_Unitas"]
 TIMEOUT = config["Timeout"]
+WARM_BROWSER = args.WarmBrowser or config["Unitas_Warm_Browser"]
+WARM_BROWSER_CHECK_SECONDS = 300  # health check (and keep-alive) of the idle warm browser
 
 
 # ─── Init ───
@@ -79,15 +93,39 @@ do_xml_setup(config)
 helper_set_timeout(TIMEOUT)
 coolerlog.do_coolerlog_setup(config, DB_FILE)
 
+# One logged-in browser shared by all Unitas jobs in forever mode; closed after
+# unitas.session_idle_minutes without a job, or - in warm browser mode - kept
+# ready (headless) and replaced every unitas.warm_browser_max_jobs jobs /
+# unitas.warm_browser_max_minutes. Being headless, the warm browser saves every
+# production form itself instead of leaving it for a person to Save.
+if WARM_BROWSER:
+    unitas_session = WarmUnitasSession(
+        config,
+        max_jobs=int(config["Unitas_Warm_Browser_Max_Jobs"]),
+        max_age=float(config["Unitas_Warm_Browser_Max_Minutes"]) * 60,
+        check_interval=WARM_BROWSER_CHECK_SECONDS,
+    )
+else:
+    unitas_session = UnitasSession(
+        config, headless=unitas.HEADLESS,
+        idle_timeout=float(config["Unitas_Session_Idle_Minutes"]) * 60,
+    )
+
 # Backup database on startup
 db.backup_database(DB_FILE)
 
 
-# ─── Pending Upload Processing ───
+# ─── Upload Queue ───
 TRIGGER_FILE_PATH = CONFIG_DIR / "pending_upload"
+UPLOAD_QUEUE_POLL_SECONDS = 5   # the web app enqueues from another process
+UPLOAD_MAX_ATTEMPTS = 8         # retries after 1, 2, 4, ... 60 minutes, then give up
+UPLOAD_JOB_RETENTION_DAYS = 30  # finished jobs are kept this long for the record
+
+# Set when this process enqueues something, so the worker doesn't wait for its next poll
+upload_queue_wake = threading.Event()
 
-def check_and_process_pending_uploads():
-    """Check database for pending uploads and process them"""
+def enqueue_pending_uploads():
+    """Queue every date waiting for a production upload"""
     try:
         pending_dates = db.get_dates_pending_unitas_upload(DB_FILE)
 
@@ -95,29 +133,116 @@ def check_and_process_pending_uploads():
             logger.info("No pending uploads found")
             return
 
-        logger.info(f"Found {len(pending_dates)} pending upload(s): {pending_dates}")
-
         for date_str in pending_dates:
-            try:
-                logger.info(f"Processing upload for {date_str}")
-                unitas.run_unitas_stuff(config, DB_FILE, target_date=date_str)
-                logger.info(f"Successfully uploaded {date_str}")
-            except Exception as e:
-                logger.error(f"Error uploading {date_str}: {e}")
-                # Continue with next date even if one fails
+            db.enqueue_upload_job(DB_FILE, "production", date_str)
+        logger.info(f"Queued {len(pending_dates)} pending upload(s): {pending_dates}")
+        upload_queue_wake.set()
 
     except Exception as e:
         logger.error(f"Error checking pending uploads: {e}")
 
+def enqueue_pending_coolerlogs():
+    """Queue every date with a cooler log not yet sent to Unitas"""
+    try:
+        pending_dates = db.get_dates_pending_coolerlog_upload(DB_FILE)
+
+        if not pending_dates:
+            logger.info("No pending coolerlog uploads found")
+            return
+
+        for date_str in pending_dates:
+            db.enqueue_upload_job(DB_FILE, "coolerlog", date_str)
+        logger.info(f"Queued {len(pending_dates)} pending coolerlog upload(s): {pending_dates}")
+        upload_queue_wake.set()
+
+    except Exception as e:
+        logger.error(f"Error checking pending coolerlog uploads: {e}")
+
+def enqueue_verification():
+    """Queue a check of the last week's uploads against Unitas (once a day is enough)"""
+    try:
+        db.enqueue_upload_job(DB_FILE, "verify", date.today().isoformat())
+        upload_queue_wake.set()
+    except Exception as e:
+        logger.error(f"Error queuing upload verification: {e}")
+
+def prune_upload_jobs():
+    """Delete finished upload jobs past the retention window"""
+    try:
+        deleted = db.prune_upload_jobs(DB_FILE, keep_days=UPLOAD_JOB_RETENTION_DAYS)
+        if deleted:
+            logger.info(f"Pruned {deleted} finished upload job(s)")
+    except Exception as e:
+        logger.error(f"Error pruning upload jobs: {e}")
+
+def run_upload_job(job):
+    """Run one queued upload; raises if the date didn't go through"""
+    date_str = job["date"]
+
+    if job["job_type"] == "verify":
+        unitas.verify_uploads(config, DB_FILE, session=unitas_session)
+        return
+    if job["job_type"] == "production":
+        if date_str not in db.get_dates_pending_unitas_upload(DB_FILE):
+            logger.info(f"{date_str} is no longer pending upload, nothing to do")
+            return
+        # Verification is a job of its own, not repeated for every date
+        _, failed = unitas.run_unitas_stuff(config, DB_FILE, target_date=date_str, session=unitas_session,
+                                            verify=False)
+    else:
+        if date_str not in db.get_dates_pending_coolerlog_upload(DB_FILE):
+            logger.info(f"Coolerlog for {date_str} is no longer pending, nothing to do")
+            return
+        _, failed = coolerlog.run_coolerlog_to_unitas(DB_FILE, target_date=date_str, session=unitas_session)
+
+    if date_str in failed:
+        raise RuntimeError(failed[date_str])
+
+def upload_worker():
+    """Run queued uploads one at a time - there is only one browser - forever"""
+    while True:
+        try:
+            job = db.claim_upload_job(DB_FILE)
+        except Exception as e:
+            logger.error(f"Error reading upload queue: {e}")
+            job = None
+
+        if job is None:
+            try:
+                due_in = db.seconds_until_next_upload_job(DB_FILE)
+            except Exception:
+                due_in = None
+            timeout = UPLOAD_QUEUE_POLL_SECONDS if due_in is None else min(due_in, UPLOAD_QUEUE_POLL_SECONDS)
+            upload_queue_wake.wait(timeout)
+            upload_queue_wake.clear()
+            continue
+
+        label = f"{job['job_type']} upload for {job['date']}"
+        logger.info(f"Running {label} (attempt {job['attempts']})")
+        try:
+            run_upload_job(job)
+            db.complete_upload_job(DB_FILE, job["id"])
+            logger.info(f"Finished {label}")
+        except Exception as e:
+            try:
+                retry_in = db.fail_upload_job(DB_FILE, job["id"], e, max_attempts=UPLOAD_MAX_ATTEMPTS)
+            except Exception as db_error:
+                logger.error(f"Error recording failed {label}: {db_error}")
+                continue
+            if retry_in is None:
+                logger.error(f"{label} failed, not retrying: {e}")
+            else:
+                logger.warning(f"{label} failed, retrying in {retry_in / 60:.0f} min: {e}")
+
 
 # ─── File Watcher for Trigger File ───
 class PendingUploadHandler(FileSystemEventHandler):
-    """Watch for pending_upload file creation or modification"""
+    """Watch for pending_upload file creation or modification (web apps from before the queue)"""
 
     def _handle_trigger(self, event):
         if event.src_path == str(TRIGGER_FILE_PATH):
             logger.info("Detected pending_upload trigger file")
-            check_and_process_pending_uploads()
+            enqueue_pending_uploads()
             # Delete trigger file after processing
             try:
                 TRIGGER_FILE_PATH.unlink()
@@ -164,16 +289,26 @@ else:
         logger.error(f"Error processing XML files on startup: {e}")
 
     # ─── Startup Upload Check ───
+    requeued = db.requeue_running_upload_jobs(DB_FILE)
+    if requeued:
+        logger.info(f"Re-queued {requeued} upload job(s) interrupted by the last shutdown")
     logger.info("Checking for pending uploads on startup...")
-    check_and_process_pending_uploads()
+    enqueue_pending_uploads()
+    enqueue_verification()
+    prune_upload_jobs()
 
     # Check for pending coolerlog uploads if enabled
     if LOG_COOLER_TO_UNITAS:
         logger.info("Checking for pending coolerlog uploads on startup...")
-        try:
-            coolerlog.run_coolerlog_to_unitas(DB_FILE)
-        except Exception as e:
-            logger.error(f"Error processing pending coolerlog uploads on startup: {e}")
+        enqueue_pending_coolerlogs()
+
+    if WARM_BROWSER:
+        unitas_session.start()
+        logger.info("Warm browser mode: starting a logged-in browser for uploads "
+                    "(production forms are saved automatically and must be confirmed by Unitas)")
+
+    threading.Thread(target=upload_worker, name="upload-worker", daemon=True).start()
+    logger.info("Upload worker started")
 
     # ─── Scheduling ───
     schedule.every().day.at(RETRIEVE_FROM_XML_TIME).do(jobs.xml_to_sheet_job, args, DB_FILE)  # XML → DB
@@ -187,12 +322,14 @@ else:
     # Schedule coolerlog to Unitas if enabled
     if LOG_COOLER_TO_UNITAS:
         unitas_time = jobs.schedule_offset(RETRIEVE_FROM_XML_TIME, 2)  # Two minutes after XML processing
-        schedule.every().day.at(unitas_time).do(coolerlog.run_coolerlog_to_unitas, DB_FILE)
+        schedule.every().day.at(unitas_time).do(enqueue_pending_coolerlogs)
         logger.info(f"Cooler log to Unitas scheduled at {unitas_time}")
 
     # Schedule daily database check for pending Unitas uploads at 3 AM
-    schedule.every().day.at("03:00").do(check_and_process_pending_uploads)
-    logger.info("Daily Unitas upload check scheduled at 03:00")
+    schedule.every().day.at("03:00").do(enqueue_pending_uploads)
+    schedule.every().day.at("03:00").do(enqueue_verification)  # queued after the uploads, so runs after them
+    schedule.every().day.at("03:00").do(prune_upload_jobs)
+    logger.info("Daily Unitas upload check and verification scheduled at 03:00")
 
     logger.info("Daily database backup scheduled at 00:05")
 
@@ -214,3 +351,4 @@ else:
         logger.info("Stopped by user")
         observer.stop()
         observer.join()
+        unitas_session.close()
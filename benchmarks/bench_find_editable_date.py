@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: find_editable_date over 2 years of already-sent days
+Compares the old per-day lookup loop against the single range query.
+
+Usage:
+    python benchmarks/bench_find_editable_date.py [--days 730] [--repeat 20]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import pathlib
+from datetime import date, timedelta
+
+# Keep the benchmark away from the real config/database
+os.environ.setdefault('DATALOGGER_CONFIG_DIR', tempfile.mkdtemp(prefix="datalogger_bench_"))
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_dir)
+sys.path.insert(0, os.path.join(project_dir, "server"))
+
+import database_helper as db
+
+
+def populate(db_file, days):
+    """Insert `days` consecutive sent days ending yesterday"""
+    import sqlite3
+    conn = sqlite3.connect(db_file)
+    today = date.today()
+    rows = [((today - timedelta(days=i)).isoformat(),) for i in range(1, days + 1)]
+    conn.executemany("INSERT INTO Daily_User_Log (date, send_to_bot) VALUES (?, 1)", rows)
+    conn.commit()
+    conn.close()
+
+
+def old_find_editable_date(db_file, start_date, max_days):
+    """The previous endpoint implementation: one get_daily_user_log() per day"""
+    for i in range(1, max_days + 1):
+        check_date = start_date - timedelta(days=i)
+        if check_date.year < 2020:
+            break
+        user_log = db.get_daily_user_log(db_file, check_date.isoformat())
+        if not user_log or not (user_log.get('send_to_bot') == 1 or user_log.get('send_to_bot') == '1'):
+            return check_date.isoformat()
+    return None
+
+
+def time_it(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark find_editable_date")
+    parser.add_argument("--days", type=int, default=730, help="Days of sent history to generate")
+    parser.add_argument("--repeat", type=int, default=20, help="Iterations per implementation")
+    args = parser.parse_args()
+
+    db_file = pathlib.Path(tempfile.mkdtemp(prefix="datalogger_bench_")) / "bench.db"
+    db.setup_db(db_file)
+    populate(db_file, args.days)
+
+    start_date = date.today()
+    max_days = args.days + 1
+
+    old_time, old_result = time_it(lambda: old_find_editable_date(db_file, start_date, max_days), args.repeat)
+    new_time, new_result = time_it(lambda: db.find_editable_date(db_file, start_date, 'prev', max_days), args.repeat)
+
+    print(f"History: {args.days} sent days, searching back {max_days} days")
+    print(f"Per-day loop:  {old_time * 1000:8.2f} ms  -> {old_result}")
+    print(f"Range query:   {new_time * 1000:8.2f} ms  -> {new_result}")
+    if new_time > 0:
+        print(f"Speedup:       {old_time / new_time:8.1f}x")
+    if old_result != new_result:
+        print("WARNING: implementations disagree")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end Unitas upload per day against the mock Unitas server
+Starts benchmarks/mock_unitas.py in-process, fills a synthetic database with
+N days ready to send, then runs the real upload code - run_unitas_stuff(),
+run_coolerlog_to_unitas() and a status check - through the configured client
+(Selenium in headless Firefox, or the HTTP client).
+
+Reports browser start + login, seconds per day for the production form and
+the cooler log, the status check, and how many requests the mock served.
+Selenium needs Firefox and geckodriver like the real automation.
+
+Usage:
+    python benchmarks/bench_unitas_upload.py [--days 7] [--client selenium|http]
+                                             [--latency 80] [--jitter 40] [--show]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import date, timedelta
+
+# Keep the benchmark away from the real config/database (and the saved Unitas session)
+CONFIG_DIR = tempfile.mkdtemp(prefix="datalogger_unitas_bench_")
+os.environ['DATALOGGER_CONFIG_DIR'] = CONFIG_DIR
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(bench_dir)
+sys.path.insert(0, project_dir)
+sys.path.insert(0, os.path.join(project_dir, "server"))
+sys.path.insert(0, os.path.join(project_dir, "server", "unitas_manager"))
+sys.path.insert(0, bench_dir)
+
+import mock_unitas
+
+FARM_ID = "101"
+HOUSE_ID = "1"
+
+
+def write_config(db_file, base_url, client, username, password):
+    """Point the upload code at the synthetic database and the mock server"""
+    from server.config import load_config, save_config, get_flat_config
+    config = load_config()
+    config["deployment"]["mode"] = "localhost"
+    config["deployment"]["localhost_database"] = str(db_file)
+    config["farm"]["nws_station_id"] = ""
+    config["unitas"].update({
+        "username": username,
+        "password": password,
+        "farm_id": FARM_ID,
+        "house_id": HOUSE_ID,
+        "cooler_log_initials": "BM",
+        "client": client,
+        "base_url": base_url,
+    })
+    save_config(config)
+    return get_flat_config()
+
+
+def populate(db_file, days):
+    """Insert `days` complete days ending yesterday, all flagged for upload"""
+    import sqlite3
+    rng = random.Random(0)
+    today = date.today()
+    dates = []
+    conn = sqlite3.connect(db_file)
+    for i in range(days, 0, -1):
+        day = (today - timedelta(days=i)).isoformat()
+        dates.append(day)
+        eggs = rng.randint(9000, 11000)
+        conn.execute(
+            "INSERT INTO Daily_User_Log (date, total_eggs, floor_eggs, mortality_indoor, mortality_reasons, "
+            "cull_reasons, nutritionist, ration_used, weather, air_sensory, drinkers_clean, birds_under_slats, "
+            "safe_indoors, safe_outdoors, equipment_functioning, predator_activity, eggs_picked_up, "
+            "door_open, door_closed, comments, send_to_bot, version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, 1)",
+            (day, eggs, rng.randint(0, 50), rng.randint(0, 3), "N Natural, PC Pecking", "S Sick",
+             "Nutritionist A", "Layer 2", "Sunny", "Good", "Yes", "No", "Yes", "Yes", "Yes", "No",
+             eggs // 360, "07:30", "19:45", f"Benchmark day {day}"),
+        )
+        conn.execute(
+            "INSERT INTO Daily_Bot_Log (date, feed_consumption, water_consumption, body_weight, lights_on, "
+            "lights_off, inside_low_temp, inside_high_temp, outside_low_temp, outside_high_temp, "
+            "cooler_time_am, cooler_temp_am, cooler_time_pm, cooler_temp_pm, version) "
+            "VALUES (?, ?, ?, ?, '04:30', '20:00', ?, ?, ?, ?, '06:05:00', ?, '18:10:00', ?, 1)",
+            (day, round(rng.uniform(900, 1100), 1), round(rng.uniform(1800, 2200), 1),
+             round(rng.uniform(3.5, 4.5), 2), rng.randint(60, 65), rng.randint(75, 82),
+             rng.randint(40, 55), rng.randint(70, 90), rng.uniform(44, 46), rng.uniform(44, 46)),
+        )
+    conn.commit()
+    conn.close()
+    return dates
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def make_timed_client(client):
+    """Wrap a UnitasClient so every call's wall time is recorded per operation"""
+    from unitas_client import UnitasClient
+
+    class TimedUnitasClient(UnitasClient):
+        def __init__(self):
+            self.timings = {}
+
+        @property
+        def name(self):
+            return client.name
+
+        def __enter__(self):
+            client.__enter__()
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return client.__exit__(exc_type, exc, tb)
+
+        def _timed(self, operation, *args):
+            started = time.perf_counter()
+            try:
+                return getattr(client, operation)(*args)
+            finally:
+                self.timings.setdefault(operation, []).append(time.perf_counter() - started)
+
+        def daily_statuses(self, dates):
+            return self._timed("daily_statuses", dates)
+
+        def submit_production(self, date_str, values, previous=None):
+            return self._timed("submit_production", date_str, values, previous)
+
+        def submit_coolerlog(self, date_str, values):
+            return self._timed("submit_coolerlog", date_str, values)
+
+    return TimedUnitasClient()
+
+
+def report_line(label, values):
+    if not values:
+        print(f"  {label:<22} -")
+        return
+    print(f"  {label:<22} n={len(values):<3} mean {sum(values) / len(values):6.2f}s  "
+          f"p50 {percentile(values, 50):6.2f}s  max {max(values):6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the Unitas upload per day against a local mock")
+    parser.add_argument("--days", type=int, default=7, help="Days to upload")
+    parser.add_argument("--client", choices=("selenium", "http"), default="selenium")
+    parser.add_argument("--latency", type=float, default=80, help="Mock latency per request (ms)")
+    parser.add_argument("--jitter", type=float, default=40, help="Extra random latency per request (ms)")
+    parser.add_argument("--show", action="store_true", help="Show the browser instead of running headless")
+    parser.add_argument("--skip-coolerlog", action="store_true")
+    args = parser.parse_args()
+
+    unitas = mock_unitas.MockUnitas("bench", "bench", days_listed=max(14, args.days + 1))
+    server = mock_unitas.make_server("127.0.0.1", 0, unitas, args.latency, args.jitter)
+    threading.Thread(target=server.serve_forever, name="mock-unitas", daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    db_file = os.path.join(CONFIG_DIR, "bench_unitas.db")
+    config = write_config(db_file, base_url, args.client, "bench", "bench")
+
+    import database_helper as db
+    db.setup_db(db_file)
+    dates = populate(db_file, args.days)
+
+    import unitas_production as production
+    import unitas_coolerlog as coolerlog
+    from unitas_client import make_unitas_client
+    from unitas_session import UnitasSession
+    production.do_unitas_setup(config)
+    coolerlog.do_coolerlog_setup(config, db_file)
+
+    print(f"Mock Unitas at {base_url} ({args.latency:.0f}+{args.jitter:.0f} ms), "
+          f"{args.days} day(s), {args.client} client")
+
+    session = UnitasSession(config, headless=not args.show, idle_timeout=None)
+    client = make_timed_client(make_unitas_client(config, session))
+    startup = None
+    started = time.perf_counter()
+    try:
+        if args.client == "selenium":
+            t = time.perf_counter()
+            session.driver()
+            startup = time.perf_counter() - t
+
+        production.run_unitas_stuff(config, db_file, session=session, client=client)
+        if not args.skip_coolerlog:
+            coolerlog.run_coolerlog_to_unitas(db_file, session=session, client=client)
+        with client:
+            statuses = client.daily_statuses(dates)
+    finally:
+        session.close()
+        server.shutdown()
+    total = time.perf_counter() - started
+
+    received = [d for d in dates if d in unitas.production]
+    logged = [d for d in dates if d in unitas.coolerlog]
+    print("\n" + "=" * 70)
+    print(f"UNITAS UPLOAD BENCHMARK ({client.name} client)")
+    print("=" * 70)
+    if startup is not None:
+        print(f"  {'browser start + login':<22} {startup:6.2f}s")
+    report_line("production per day", client.timings.get("submit_production", []))
+    report_line("cooler log per day", client.timings.get("submit_coolerlog", []))
+    report_line("status check", client.timings.get("daily_statuses", []))
+    print(f"  {'total':<22} {total:6.2f}s for {args.days} day(s)")
+    print(f"  {'mock requests':<22} {unitas.requests}")
+    print(f"  production received for {len(received)}/{len(dates)} day(s)"
+          + ("" if args.skip_coolerlog else f", cooler log for {len(logged)}/{len(dates)}"))
+    not_found = [d for d, status in statuses.items() if status == "Not Found"]
+    if not_found:
+        print(f"  status check could not find: {', '.join(not_found)}")
+
+
+if __name__ == "__main__":
+    main()
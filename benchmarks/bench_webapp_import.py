@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold-start import time and resident memory of the web entry point
+Each run imports the module in a fresh interpreter (like a new mod_wsgi
+process) and reports wall time, peak RSS and whether any browser-automation
+modules were pulled in.
+
+Usage:
+    python benchmarks/bench_webapp_import.py [--runs 5] [--module webapp]
+
+Note: wsgi.py forces DATALOGGER_CONFIG_DIR=/var/lib/datalogger, so
+--module wsgi only works on a production install.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["selenium", "webdriver_manager", "unitas_production", "unitas_coolerlog"]
+
+PROBE = r"""
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = sorted(name for name in sys.modules
+               if any(name == h or name.startswith(h + ".") or name.endswith("." + h) for h in {heavy!r}))
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "heavy": heavy,
+}}))
+"""
+
+
+def run_once(module, env):
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=project_dir, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import of {module} failed:\n{result.stderr}")
+    # The app prints startup messages; the probe's JSON is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark web entry point cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to start")
+    parser.add_argument("--module", default="webapp", help="Module to import (webapp or wsgi)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATALOGGER_CONFIG_DIR", tempfile.mkdtemp(prefix="datalogger_bench_"))
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    samples = [run_once(args.module, env) for _ in range(args.runs)]
+    times = [s["seconds"] * 1000 for s in samples]
+    rss = [s["max_rss_kb"] / 1024 for s in samples]
+
+    print(f"import {args.module} x{args.runs}")
+    print(f"Cold start:  median {statistics.median(times):7.1f} ms  (min {min(times):.1f}, max {max(times):.1f})")
+    print(f"Peak RSS:    median {statistics.median(rss):7.1f} MB")
+    print(f"Modules:     {samples[-1]['modules']}")
+    heavy = samples[-1]["heavy"]
+    if heavy:
+        print(f"WARNING: browser-automation modules loaded: {', '.join(heavy)}")
+        sys.exit(1)
+    print("No browser-automation modules loaded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Load test: several tablets autosaving while the automation service writes
+Runs webapp.py in-process on a threaded werkzeug server against a synthetic
+database, drives it from N concurrent clients with a realistic request mix,
+and runs a background writer that stamps verification/upload timestamps the
+way automation.py does. No Apache needed.
+
+Reports throughput, p50/p95/p99 latency per endpoint and the number of
+SQLite lock-contention errors ("database is locked") seen by clients and by
+the writer.
+
+Usage:
+    python benchmarks/load_test.py [--clients 8] [--duration 20] [--days 365]
+                                   [--writer-interval 0.2] [--seed 1]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import http.client
+from datetime import date, datetime, timedelta
+
+# Keep the load test away from the real config/database
+CONFIG_DIR = tempfile.mkdtemp(prefix="datalogger_load_")
+os.environ['DATALOGGER_CONFIG_DIR'] = CONFIG_DIR
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_dir)
+sys.path.insert(0, os.path.join(project_dir, "server"))
+
+# name -> relative weight; roughly what a handful of open tablets generate
+REQUEST_MIX = {
+    'poll': 40,          # base.html polls /get_last_update_time every 5 s
+    'date_data': 20,     # switching dates / reloading the Today tab
+    'update_user_log': 20,
+    'batch_save': 10,
+    'update_pallet': 10,
+}
+
+
+def write_config(db_file, hatch_date):
+    """Point the app at the synthetic database with no external services"""
+    from server.config import load_config, save_config
+    config = load_config()
+    config["deployment"]["mode"] = "localhost"
+    config["deployment"]["localhost_database"] = str(db_file)
+    config["farm"]["hatch_date"] = hatch_date
+    config["farm"]["nws_station_id"] = ""  # no network calls from the weather refresher
+    config["unitas"]["username"] = "loadtest"
+    config["unitas"]["password"] = "loadtest"
+    save_config(config)
+
+
+def populate(db, db_file, days, pallets):
+    """Insert `days` of user/bot logs ending today plus some pallets"""
+    import sqlite3
+    rng = random.Random(0)
+    today = date.today()
+    conn = sqlite3.connect(db_file)
+    for i in range(days, -1, -1):
+        day = (today - timedelta(days=i)).isoformat()
+        belt = rng.randint(9000, 11000)
+        conn.execute(
+            "INSERT INTO Daily_User_Log (date, belt_eggs, floor_eggs, total_eggs, mortality_indoor, send_to_bot, version) "
+            "VALUES (?, ?, ?, ?, ?, ?, 1)",
+            (day, belt, rng.randint(0, 50), belt, rng.randint(0, 3), 1 if i > 1 else 0),
+        )
+        conn.execute(
+            "INSERT INTO Daily_Bot_Log (date, feed_consumption, water_consumption, body_weight, version) "
+            "VALUES (?, ?, ?, ?, 1)",
+            (day, rng.uniform(900, 1100), rng.uniform(1800, 2200), rng.uniform(3.5, 4.5)),
+        )
+    conn.commit()
+    conn.close()
+
+    pallet_ids = []
+    for n in range(pallets):
+        pallet_ids.append(db.insert_pallet_log(
+            db_file, thedate=today.isoformat(), pallet_id=f"LT{n:04d}", house_id=1,
+            total_pallet_weight=1200, case_weight=33.6, flock_age=30.1, yolk_color="5",
+        ))
+    db.rebuild_summaries(db_file)
+    return pallet_ids
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Stats:
+    """Thread-safe latency and error collection"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.lock_errors = 0
+        self.conflicts = 0
+
+    def record(self, name, seconds, status, body):
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            if status == 409:
+                self.conflicts += 1
+            elif status >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+                if b"database is locked" in body:
+                    self.lock_errors += 1
+
+
+class Client(threading.Thread):
+    """One simulated tablet issuing requests back to back over a keep-alive connection"""
+
+    def __init__(self, index, port, stats, stop, pallet_ids, days, seed):
+        super().__init__(name=f"client-{index}", daemon=True)
+        self.port = port
+        self.stats = stats
+        self.stop = stop
+        self.pallet_ids = pallet_ids
+        self.days = days
+        self.rng = random.Random(seed + index)
+        self.versions = {}
+        self.names = list(REQUEST_MIX)
+        self.weights = [REQUEST_MIX[n] for n in self.names]
+
+    def request(self, conn, name, method, path, payload=None):
+        body = json.dumps(payload) if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        started = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        self.stats.record(name, time.perf_counter() - started, response.status, data)
+        return response.status, data
+
+    def pick_date(self):
+        # Mostly today/yesterday, occasionally an older day
+        if self.rng.random() < 0.8:
+            offset = self.rng.randint(0, 1)
+        else:
+            offset = self.rng.randint(2, self.days)
+        return (date.today() - timedelta(days=offset)).isoformat()
+
+    def run(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+        while not self.stop.is_set():
+            name = self.rng.choices(self.names, self.weights)[0]
+            try:
+                if name == 'poll':
+                    self.request(conn, name, "GET", "/get_last_update_time")
+                elif name == 'date_data':
+                    day = self.pick_date()
+                    status, data = self.request(conn, name, "GET", f"/api/date_data?date={day}")
+                    if status == 200:
+                        user_log = json.loads(data).get("user_log") or {}
+                        self.versions[day] = user_log.get("version")
+                elif name == 'update_user_log':
+                    day = self.pick_date()
+                    self.request(conn, name, "POST", f"/update_user_log?date={day}", {
+                        "belt_eggs": self.rng.randint(9000, 11000),
+                        "floor_eggs": self.rng.randint(0, 50),
+                        "comments": f"load test {self.rng.random():.6f}",
+                    })
+                elif name == 'batch_save':
+                    day = date.today().isoformat()
+                    status, data = self.request(conn, name, "POST", "/api/batch_save", {"changes": [{
+                        "table": "user_log", "date": day, "version": self.versions.get(day),
+                        "fields": {"mortality_indoor": self.rng.randint(0, 3), "comments": "batched"},
+                    }]})
+                    if status == 200:
+                        for entry in json.loads(data).get("versions", []):
+                            self.versions[entry["date"]] = entry["version"]
+                    elif status == 409:
+                        self.versions.pop(day, None)
+                elif name == 'update_pallet':
+                    pallet_id = self.rng.choice(self.pallet_ids)
+                    self.request(conn, name, "POST", f"/update_pallet/{pallet_id}", {
+                        "weight": self.rng.randint(1150, 1250),
+                    })
+            except (OSError, http.client.HTTPException) as e:
+                self.stats.record(name, 0.0, 599, str(e).encode())
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+        conn.close()
+
+
+class AutomationWriter(threading.Thread):
+    """Stands in for automation.py: stamps bookkeeping timestamps on recent days"""
+
+    def __init__(self, db, db_file, interval, stop, days):
+        super().__init__(name="automation-writer", daemon=True)
+        self.db = db
+        self.db_file = db_file
+        self.interval = interval
+        self.stop = stop
+        self.days = days
+        self.writes = 0
+        self.lock_errors = 0
+        self.other_errors = 0
+        self.latencies = []
+
+    def run(self):
+        rng = random.Random(42)
+        while not self.stop.is_set():
+            day = (date.today() - timedelta(days=rng.randint(1, min(self.days, 14)))).isoformat()
+            now = datetime.now().isoformat()
+            started = time.perf_counter()
+            try:
+                self.db.update_daily_user_log(self.db_file, day, {"verified_at": now, "sent_to_unitas_at": now})
+                self.db.update_daily_bot_log(self.db_file, day, {"cooler_logged_at": now})
+                self.writes += 1
+            except Exception as e:
+                if "database is locked" in str(e):
+                    self.lock_errors += 1
+                else:
+                    self.other_errors += 1
+            self.latencies.append(time.perf_counter() - started)
+            self.stop.wait(self.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test for webapp.py")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent simulated tablets")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run")
+    parser.add_argument("--days", type=int, default=365, help="Days of synthetic history")
+    parser.add_argument("--pallets", type=int, default=30, help="Synthetic pallets")
+    parser.add_argument("--writer-interval", type=float, default=0.2,
+                        help="Seconds between automation writes (0 disables the writer)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    db_file = os.path.join(CONFIG_DIR, "load_test.db")
+    hatch_date = (date.today() - timedelta(days=args.days + 140)).isoformat()
+    write_config(db_file, hatch_date)
+
+    import database_helper as db
+    db.setup_db(db_file)
+    pallet_ids = populate(db, db_file, args.days, args.pallets)
+
+    # Importing the app runs its startup (setup_db, config checks) against the synthetic DB
+    import webapp
+    if webapp.STARTUP_ERROR:
+        print(f"Web app failed to start: {webapp.STARTUP_ERROR}")
+        sys.exit(1)
+
+    from werkzeug.serving import make_server
+    server = make_server("127.0.0.1", 0, webapp.app, threaded=True)
+    port = server.server_port
+    server_thread = threading.Thread(target=server.serve_forever, name="werkzeug", daemon=True)
+    server_thread.start()
+
+    stats = Stats()
+    stop = threading.Event()
+    clients = [Client(i, port, stats, stop, pallet_ids, args.days, args.seed) for i in range(args.clients)]
+    writer = AutomationWriter(db, db_file, args.writer_interval, stop, args.days) if args.writer_interval > 0 else None
+
+    print(f"Database: {db_file} ({args.days} days, {args.pallets} pallets)")
+    print(f"Running {args.clients} clients for {args.duration:.0f}s against 127.0.0.1:{port}"
+          + (f" with an automation write every {args.writer_interval}s" if writer else ""))
+
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    if writer:
+        writer.start()
+    time.sleep(args.duration)
+    stop.set()
+    for client in clients:
+        client.join(timeout=35)
+    if writer:
+        writer.join(timeout=35)
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    total = sum(len(v) for v in stats.latencies.values())
+    print()
+    print(f"{'endpoint':<18}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in REQUEST_MIX:
+        values = stats.latencies.get(name, [])
+        print(f"{name:<18}{len(values):>8}{stats.errors.get(name, 0):>8}"
+              f"{percentile(values, 50) * 1000:>10.1f}{percentile(values, 95) * 1000:>10.1f}"
+              f"{percentile(values, 99) * 1000:>10.1f}")
+    all_values = [v for values in stats.latencies.values() for v in values]
+    print(f"{'all':<18}{total:>8}{sum(stats.errors.values()):>8}"
+          f"{percentile(all_values, 50) * 1000:>10.1f}{percentile(all_values, 95) * 1000:>10.1f}"
+          f"{percentile(all_values, 99) * 1000:>10.1f}")
+    print()
+    print(f"Throughput:          {total / elapsed:8.1f} req/s")
+    print(f"Client lock errors:  {stats.lock_errors:8d}")
+    print(f"Version conflicts:   {stats.conflicts:8d}  (expected: tablets editing the same day)")
+    if writer:
+        print(f"Automation writes:   {writer.writes:8d}  (p95 {percentile(writer.latencies, 95) * 1000:.1f} ms)")
+        print(f"Writer lock errors:  {writer.lock_errors:8d}")
+        if writer.other_errors:
+            print(f"Writer other errors: {writer.other_errors:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Mock Unitas server
+A local stand-in for the parts of Unitas the datalogger touches, so the
+uploads can be run, timed and optimised without the live site:
+
+  - the pages the Selenium automation drives: login form, production list
+    (data-cy='title' dates with daily status spans), daily production form
+    (V*-H1 fields, time pickers, reason pickers) and the cooler log form with
+    its rdp date picker
+  - the JSON endpoints UnitasHttpClient talks to
+    (server/unitas_manager/unitas_http.py)
+
+Pages are rendered from the fixtures in benchmarks/fixtures/unitas/ (or
+--fixtures DIR): saved Unitas pages trimmed down to the elements and
+behaviour the automation relies on. Submissions are kept in memory, and every
+request can be slowed down by --latency/--jitter milliseconds to look like
+the real network.
+
+Point the datalogger at it with unitas.base_url = "http://127.0.0.1:8765"
+(and unitas.client = "http" for the HTTP client).
+
+Usage:
+    python benchmarks/mock_unitas.py [--port 8765] [--latency 80] [--jitter 40]
+                                     [--username demo --password demo]
+"""
+import os
+import re
+import json
+import time
+import random
+import argparse
+import threading
+import secrets as token_source
+from string import Template
+from datetime import date, datetime, timedelta
+from http.cookies import SimpleCookie
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "unitas")
+FIXTURE_NAMES = ("login", "home", "production_list", "production_day", "production_form", "coolerlog_form")
+
+SESSION_COOKIE = "unitas_session"
+
+HOUSE_PATH = r"/api/farms/(?P<farm_id>[^/]+)/houses/(?P<house_id>[^/]+)"
+PRODUCTION_LIST = re.compile(HOUSE_PATH + r"/production$")
+PRODUCTION_DAILY = re.compile(HOUSE_PATH + r"/production/(?P<date>\d{4}-\d{2}-\d{2})/daily$")
+COOLERLOG = re.compile(HOUSE_PATH + r"/coolerlog$")
+
+# Options of the cull/mortality reason pickers
+REASONS = ['Unknown', 'N Natural', 'PR Predator', 'PC Pecking', 'S Sick', 'PL Prolapse', 'C Cull',
+           'B Broody', 'O Other', 'PI Piling', 'SO Starveout', 'I Injured']
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """{name: Template} for every page the mock serves"""
+    fixtures = {}
+    for name in FIXTURE_NAMES:
+        with open(os.path.join(directory, f"{name}.html"), encoding="utf-8") as f:
+            fixtures[name] = Template(f.read())
+    return fixtures
+
+
+def unitas_title(day):
+    """Date as the production list shows it: "Thu, 02 Oct 2025" """
+    return datetime.fromisoformat(day).strftime("%a, %d %b %Y")
+
+
+class MockUnitas:
+    """In-memory Unitas: sessions, daily production forms and cooler logs"""
+
+    def __init__(self, username="demo", password="demo", days_listed=14):
+        self.username = username
+        self.password = password
+        self.days_listed = days_listed
+        self.lock = threading.Lock()
+        self.tokens = set()
+        self.production = {}   # date -> {field id: value}
+        self.completed = set()  # dates saved (not just drafted)
+        self.coolerlog = {}    # date -> {field id: value}
+        self.requests = 0
+
+    def login(self, username, password):
+        if username != self.username or password != self.password:
+            return None
+        token = token_source.token_hex(16)
+        with self.lock:
+            self.tokens.add(token)
+        return token
+
+    def is_valid(self, token):
+        with self.lock:
+            return token in self.tokens
+
+    def save_production(self, day, fields, draft=False):
+        with self.lock:
+            self.production.setdefault(day, {}).update(fields)
+            if not draft:
+                self.completed.add(day)
+
+    def production_fields(self, day):
+        with self.lock:
+            return dict(self.production.get(day, {}))
+
+    def save_coolerlog(self, day, fields):
+        with self.lock:
+            self.coolerlog[day] = fields
+
+    def status(self, day):
+        with self.lock:
+            return "complete" if day in self.completed else "overdue"
+
+    def listed_dates(self):
+        """Dates on the production list: the last days_listed days plus any with data, newest first"""
+        today = date.today()
+        days = {(today - timedelta(days=i)).isoformat() for i in range(1, self.days_listed + 1)}
+        with self.lock:
+            days.update(self.production)
+        return sorted(days, reverse=True)
+
+    def daily_list(self, date_from, date_to):
+        return [
+            {"date": d, "type": "daily", "status": self.status(d)}
+            for d in sorted(self.listed_dates())
+            if (not date_from or d >= date_from) and (not date_to or d <= date_to)
+        ]
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Set by make_server()
+    unitas = None
+    fixtures = None
+    latency = 0.0
+    jitter = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    # ---------- responses ----------
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload, headers=None):
+        self._send(status, json.dumps(payload).encode(), "application/json", headers)
+
+    def _send_page(self, name, **values):
+        html = self.fixtures[name].safe_substitute(**values)
+        self._send(200, html.encode(), "text/html; charset=utf-8")
+
+    def _redirect(self, location, headers=None):
+        self.send_response(303 if self.command == "POST" else 302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    # ---------- requests ----------
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _json_body(self):
+        try:
+            return json.loads(self._body() or b"{}")
+        except ValueError:
+            return None
+
+    def _logged_in(self):
+        auth = self.headers.get("Authorization", "")
+        if auth.startswith("Bearer ") and self.unitas.is_valid(auth[len("Bearer "):]):
+            return True
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return SESSION_COOKIE in cookie and self.unitas.is_valid(cookie[SESSION_COOKIE].value)
+
+    def _simulate_latency(self):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _route(self):
+        self._simulate_latency()
+        with self.unitas.lock:
+            self.unitas.requests += 1
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.startswith("/api/"):
+            return self._api(url.path, query)
+        return self._page(url.path, query)
+
+    def _page(self, path, query):
+        if path == "/favicon.ico":
+            return self._send(200, b"", "image/x-icon")
+
+        if path == "/login":
+            if self.command == "POST":
+                form = {k: v[0] for k, v in parse_qs(self._body().decode()).items()}
+                token = self.unitas.login(form.get("username"), form.get("password"))
+                if token is None:
+                    return self._send_page("login", error="Invalid username or password")
+                cookie = f"{SESSION_COOKIE}={token}; Path=/; HttpOnly; SameSite=Lax"
+                return self._redirect("/", {"Set-Cookie": cookie})
+            return self._send_page("login", error="")
+
+        if self.command != "GET":
+            return self._send(405, b"", "text/plain")
+        if not self._logged_in():
+            return self._redirect("/login")
+
+        farm_id, house_id = query.get("farmId", ""), query.get("houseId", "")
+        ids = {"farm_id": farm_id, "house_id": house_id}
+
+        if path == "/":
+            return self._send_page("home", **ids)
+
+        if path == "/farm/production":
+            days = []
+            for day in self.unitas.listed_dates():
+                complete = self.unitas.status(day) == "complete"
+                days.append(self.fixtures["production_day"].safe_substitute(
+                    title=unitas_title(day),
+                    form_url=f"/farm/production/daily?farmId={farm_id}&houseId={house_id}&date={day}",
+                    status_class="text-success-500" if complete else "text-danger-500",
+                    status_text="Complete" if complete else "Overdue",
+                ))
+            return self._send_page("production_list", days="\n".join(days), **ids)
+
+        if path == "/farm/production/daily":
+            day = query.get("date", "")
+            try:
+                title = unitas_title(day)
+            except ValueError:
+                return self._send(404, b"", "text/plain")
+            return self._send_page(
+                "production_form", date=day, title=title,
+                saved=json.dumps(self.unitas.production_fields(day)), reasons=json.dumps(REASONS), **ids,
+            )
+
+        if path == "/farm/coolerlog/coolerlog/new":
+            return self._send_page("coolerlog_form", **ids)
+
+        return self._send(404, b"", "text/plain")
+
+    def _api(self, path, query):
+        body = self._json_body() if self.command in ("POST", "PUT") else {}
+        if body is None:
+            return self._send_json(400, {"error": "invalid JSON"})
+
+        if self.command == "POST" and path == "/api/auth/login":
+            token = self.unitas.login(body.get("username"), body.get("password"))
+            if token is None:
+                return self._send_json(401, {"error": "invalid credentials"})
+            return self._send_json(200, {"token": token})
+
+        if not self._logged_in():
+            return self._send_json(401, {"error": "not logged in"})
+
+        if self.command == "GET" and PRODUCTION_LIST.match(path):
+            return self._send_json(200, self.unitas.daily_list(query.get("from"), query.get("to")))
+
+        match = PRODUCTION_DAILY.match(path)
+        if self.command == "PUT" and match:
+            draft = bool(body.get("draft"))
+            self.unitas.save_production(match["date"], body.get("fields", {}), draft=draft)
+            return self._send_json(200, {"status": "draft" if draft else "complete"})
+
+        if self.command == "POST" and COOLERLOG.match(path):
+            if not body.get("date"):
+                return self._send_json(400, {"error": "date required"})
+            self.unitas.save_coolerlog(body["date"], body.get("fields", {}))
+            return self._send_json(201, {"status": "saved"})
+
+        return self._send_json(404, {"error": "not found"})
+
+    def do_GET(self):
+        self._route()
+
+    def do_POST(self):
+        self._route()
+
+    def do_PUT(self):
+        self._route()
+
+
+def make_server(host="127.0.0.1", port=8765, unitas=None, latency_ms=0, jitter_ms=0, fixtures_dir=FIXTURES_DIR):
+    """A ThreadingHTTPServer serving a MockUnitas (port 0 = any free port)"""
+    handler = type("MockUnitasHandler", (Handler,), {
+        "unitas": unitas or MockUnitas(),
+        "fixtures": load_fixtures(fixtures_dir),
+        "latency": latency_ms / 1000,
+        "jitter": jitter_ms / 1000,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Unitas server for the upload automation")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--username", default="demo")
+    parser.add_argument("--password", default="demo")
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0, help="Up to this many extra random milliseconds")
+    parser.add_argument("--days", type=int, default=14, help="Days shown on the production list")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory with the page fixtures")
+    args = parser.parse_args()
+
+    unitas = MockUnitas(args.username, args.password, days_listed=args.days)
+    server = make_server(args.host, args.port, unitas, args.latency, args.jitter, args.fixtures)
+    print(f"Mock Unitas on http://{args.host}:{server.server_address[1]} (user {args.username}, "
+          f"{args.latency:.0f}+{args.jitter:.0f} ms latency)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
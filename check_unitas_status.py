@@ -13,108 +13,11 @@ from datetime import datetime, timedelta
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "server"))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "server/unitas_manager"))
 
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from webdriver_manager.firefox import GeckoDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-
 from server.config import load_config, get_flat_config
-from unitas_login import login
+from unitas_session import UnitasSession
+from unitas_client import make_unitas_client
 import unitas_helper
 
-def make_driver(headless: bool = False):
-    """Create Firefox webdriver"""
-    options = webdriver.FirefoxOptions()
-    if headless:
-        options.add_argument("--headless")
-    return webdriver.Firefox(
-        service=Service(GeckoDriverManager().install()),
-        options=options
-    )
-
-def open_production_page(driver, farm_id: int, house_id: int, timeout: int):
-    """Navigate to Unitas production page"""
-    url = f"https://vitalfarms.poultrycloud.com/farm/production?farmId={farm_id}&houseId={house_id}"
-    driver.get(url)
-    # Wait until page loaded
-    WebDriverWait(driver, timeout).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, ".px-4.py-5"))
-    )
-    print(f"Production page opened")
-
-def check_date_status(driver, target_date_str: str, timeout: int = 10):
-    """
-    Check if a date's production form is Complete or Overdue
-
-    Returns:
-        str: "Complete", "Overdue", or "Unknown"
-    """
-    # Parse date and try different formats
-    target_date = datetime.fromisoformat(target_date_str)
-
-    # Unitas uses format like "Thu, 02 Oct 2025"
-    date_formats = [
-        target_date.strftime("%a, %d %b %Y"),    # "Thu, 02 Oct 2025"
-        target_date.strftime("%a, %-d %b %Y"),   # "Thu, 2 Oct 2025" (no leading zero)
-    ]
-
-    print(f"Checking status for date: {target_date_str}")
-
-    for date_fmt in date_formats:
-        try:
-            # Find the title div containing the date
-            title_xpath = f"//div[@data-cy='title' and contains(., '{date_fmt}')]"
-            title_elem = driver.find_element(By.XPATH, title_xpath)
-            print(f"Found date with format: {date_fmt}")
-
-            # The status is in the same list item, look for the Daily entry following the date
-            # Navigate to the li containing the daily entry
-            daily_li_xpath = f"//div[@data-cy='title' and contains(., '{date_fmt}')]/following-sibling::ul//li[@data-cy='list-item' and @aria-label='daily']"
-
-            try:
-                daily_elem = driver.find_element(By.XPATH, daily_li_xpath)
-                print(f"Found Daily entry")
-
-                # Now look for status within this daily element
-                # Try to find Complete status
-                try:
-                    complete_elem = daily_elem.find_element(By.XPATH, ".//span[contains(@class, 'text-success-500')]")
-                    status_text = complete_elem.text.strip()
-                    print(f"Status found: {status_text}")
-                    return "Complete"
-                except NoSuchElementException:
-                    pass
-
-                # Try to find Overdue status
-                try:
-                    overdue_elem = daily_elem.find_element(By.XPATH, ".//span[contains(@class, 'text-danger-500')]")
-                    status_text = overdue_elem.text.strip()
-                    print(f"Status found: {status_text}")
-                    return "Overdue"
-                except NoSuchElementException:
-                    pass
-
-                # If we found the daily entry but no status, return Unknown
-                print("Daily entry found but no status indicator detected")
-                return "Unknown"
-
-            except NoSuchElementException:
-                print("Could not find Daily entry for this date")
-                return "Unknown"
-
-        except NoSuchElementException:
-            # Try next format
-            continue
-        except Exception as e:
-            print(f"Error checking format {date_fmt}: {e}")
-            continue
-
-    print(f"Could not find date {target_date_str} on the page")
-    return "Not Found"
-
 def main():
     parser = argparse.ArgumentParser(
         description="Check Unitas production form status. Checks last 7 days by default, or a specific date if provided."
@@ -151,30 +54,18 @@ def main():
 
     # Load config
     config = get_flat_config()
-    FARM_ID = config["Farm_ID"]
-    HOUSE_ID = config["House_ID"]
     TIMEOUT = int(config["Timeout"])
 
     # Set timeout for unitas_helper module
     unitas_helper.set_timeout(TIMEOUT)
 
-    # Create driver and login
-    print(f"Starting browser...")
-    driver = make_driver(headless=args.headless)
+    # Browser is only started if the client needs it (unitas.client "selenium", or as the fallback)
+    session = UnitasSession(config, headless=args.headless, idle_timeout=0)
 
     try:
-        print("Logging into Unitas...")
-        login(driver, config)
-
-        print("Opening production page...")
-        open_production_page(driver, FARM_ID, HOUSE_ID, TIMEOUT)
-
-        # Check status for all dates
-        results = {}
-        for date in dates_to_check:
-            status = check_date_status(driver, date, TIMEOUT)
-            results[date] = status
-            print("")  # Add blank line between checks
+        print(f"Checking {len(dates_to_check)} date(s) on Unitas...")
+        with make_unitas_client(config, session) as client:
+            results = client.daily_statuses(dates_to_check)
 
         # Display summary
         print("\n" + "="*50)
@@ -211,8 +102,7 @@ def main():
         traceback.print_exc()
         sys.exit(2)
     finally:
-        print("\nClosing browser...")
-        driver.quit()
+        session.close()
 
 if __name__ == "__main__":
     main()
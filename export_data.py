@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Export Farm Data
+Streams Daily_User_Log, Daily_Bot_Log, Pallet_Log or the cooler backup log
+to CSV or NDJSON (stdout by default), optionally limited to a date range
+and a subset of columns.
+"""
+import sys
+import argparse
+
+from server.config import get_database_path
+from server.export import DATASETS, FORMATS, stream_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export farm data as CSV or NDJSON")
+    parser.add_argument("dataset", choices=list(DATASETS), help="Which table to export")
+    parser.add_argument("--format", "-f", choices=list(FORMATS), default="csv", help="Output format (default: csv)")
+    parser.add_argument("--start", "-s", type=str, help="First date to include (YYYY-MM-DD)")
+    parser.add_argument("--end", "-e", type=str, help="Last date to include (YYYY-MM-DD)")
+    parser.add_argument("--columns", "-c", type=str, help="Comma-separated list of columns (default: all)")
+    parser.add_argument("--output", "-o", type=str, help="Output file (default: stdout)")
+    parser.add_argument("--db", type=str, help="Database file (default: configured database)")
+    args = parser.parse_args()
+
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()] if args.columns else None
+    db_file = args.db or get_database_path()
+
+    try:
+        chunks = stream_export(db_file, args.dataset, args.format, args.start, args.end, columns)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        print(f"Exported {args.dataset} to {args.output}", file=sys.stderr)
+    else:
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Downsampled time series for the History charts
+Daily log columns are read once per (metric, date range), reduced to a fixed
+number of points for every zoom level, and cached until the database changes.
+The browser never receives more than ZOOM_LEVELS[-1] points per metric.
+
+Only the daily logs are charted: raw XML controller readings are rolled up
+into Daily_Bot_Log by xml_processing and are not kept in the database.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+from server.database_helper import _connect
+
+# metric name -> (table, column)
+METRICS = {
+    'feed_consumption': ('Daily_Bot_Log', 'feed_consumption'),
+    'water_consumption': ('Daily_Bot_Log', 'water_consumption'),
+    'body_weight': ('Daily_Bot_Log', 'body_weight'),
+    'inside_low_temp': ('Daily_Bot_Log', 'inside_low_temp'),
+    'inside_high_temp': ('Daily_Bot_Log', 'inside_high_temp'),
+    'outside_low_temp': ('Daily_Bot_Log', 'outside_low_temp'),
+    'outside_high_temp': ('Daily_Bot_Log', 'outside_high_temp'),
+    'cooler_temp_am': ('Daily_Bot_Log', 'cooler_temp_am'),
+    'cooler_temp_pm': ('Daily_Bot_Log', 'cooler_temp_pm'),
+    'total_eggs': ('Daily_User_Log', 'total_eggs'),
+    'belt_eggs': ('Daily_User_Log', 'belt_eggs'),
+    'floor_eggs': ('Daily_User_Log', 'floor_eggs'),
+    'mortality_indoor': ('Daily_User_Log', 'mortality_indoor'),
+    'mortality_outdoor': ('Daily_User_Log', 'mortality_outdoor'),
+    'euthanized_indoor': ('Daily_User_Log', 'euthanized_indoor'),
+    'euthanized_outdoor': ('Daily_User_Log', 'euthanized_outdoor'),
+}
+
+# Point budgets the client can ask for; requests snap up to the next level
+ZOOM_LEVELS = (100, 250, 500, 1000)
+METHODS = ('lttb', 'minmax')
+CACHE_SIZE = 128
+
+
+# ─── Downsampling ───
+def lttb(points, threshold):
+    """Largest-Triangle-Three-Buckets downsampling of [(x, y), ...] sorted by x
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with its neighbours - preserving the
+    visual shape of the series.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Average of the next bucket is the third vertex
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            avg_x, avg_y = points[-1]
+        else:
+            span = next_end - next_start
+            avg_x = sum(p[0] for p in points[next_start:next_end]) / span
+            avg_y = sum(p[1] for p in points[next_start:next_end]) / span
+
+        ax, ay = points[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def minmax(points, threshold):
+    """Min/max bucket downsampling of [(x, y), ...] sorted by x
+
+    Splits the series into threshold // 2 buckets and keeps each bucket's
+    minimum and maximum (in x order), so spikes are never averaged away.
+    """
+    n = len(points)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return list(points)
+
+    sampled = []
+    bucket_size = n / buckets
+    for i in range(buckets):
+        bucket = points[int(i * bucket_size):int((i + 1) * bucket_size)]
+        if not bucket:
+            continue
+        low = min(bucket, key=lambda p: p[1])
+        high = max(bucket, key=lambda p: p[1])
+        if low is high:
+            sampled.append(low)
+        else:
+            sampled.extend(sorted((low, high), key=lambda p: p[0]))
+    return sampled
+
+
+DOWNSAMPLERS = {'lttb': lttb, 'minmax': minmax}
+
+
+def zoom_level(points):
+    """Smallest zoom level that holds at least `points` points"""
+    for level in ZOOM_LEVELS:
+        if points <= level:
+            return level
+    return ZOOM_LEVELS[-1]
+
+
+# ─── Loading and caching ───
+def _db_signature(db_file):
+    try:
+        st = os.stat(db_file)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _load_series(db_file, metric, start_date, end_date):
+    """Return [(date ordinal, value), ...] for one metric, skipping blanks"""
+    table, column = METRICS[metric]
+    query = f"SELECT date, {column} FROM {table} WHERE {column} IS NOT NULL AND {column} != ''"
+    params = []
+    if start_date:
+        query += " AND date >= ?"
+        params.append(start_date)
+    if end_date:
+        query += " AND date <= ?"
+        params.append(end_date)
+    query += " ORDER BY date ASC"
+
+    conn = _connect(db_file)
+    try:
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+    series = []
+    for day, value in rows:
+        try:
+            series.append((date.fromisoformat(str(day)[:10]).toordinal(), float(value)))
+        except (TypeError, ValueError):
+            continue
+    return series
+
+
+class ChartCache:
+    """LRU cache of downsampled series keyed by DB state, metric, range and method
+
+    A miss loads the raw series once and precomputes every zoom level, so
+    zooming in or out on the same range is served from memory.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_levels(self, db_file, metric, start_date, end_date, method):
+        key = (str(db_file), _db_signature(db_file), metric, start_date, end_date, method)
+        with self._lock:
+            levels = self._entries.get(key)
+            if levels is not None:
+                self._entries.move_to_end(key)
+                return levels
+
+        raw = _load_series(db_file, metric, start_date, end_date)
+        downsample = DOWNSAMPLERS[method]
+        levels = {level: downsample(raw, level) for level in ZOOM_LEVELS}
+        levels['raw_count'] = len(raw)
+
+        with self._lock:
+            self._entries[key] = levels
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return levels
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+chart_cache = ChartCache()
+
+
+def _validate_date(value, name):
+    if not value:
+        return None
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value} (expected YYYY-MM-DD)")
+    return value
+
+
+def get_chart_data(db_file, metrics, start_date=None, end_date=None, points=500, method='lttb'):
+    """Downsampled series for each requested metric
+
+    Returns {"points": level, "method": method, "series": {metric: {"dates",
+    "values", "raw_count"}}}. Raises ValueError for unknown metrics or methods
+    and malformed dates.
+    """
+    if not metrics:
+        raise ValueError("No metrics requested")
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown)}")
+    if method not in METHODS:
+        raise ValueError(f"Unknown method: {method} (choose from {', '.join(METHODS)})")
+    start_date = _validate_date(start_date, "start_date")
+    end_date = _validate_date(end_date, "end_date")
+    level = zoom_level(int(points))
+
+    series = {}
+    for metric in metrics:
+        levels = chart_cache.get_levels(db_file, metric, start_date, end_date, method)
+        sampled = levels[level]
+        series[metric] = {
+            "dates": [date.fromordinal(x).isoformat() for x, _ in sampled],
+            "values": [y for _, y in sampled],
+            "raw_count": levels['raw_count'],
+        }
+    return {"points": level, "method": method, "series": series}
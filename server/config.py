@@ -2,9 +2,12 @@
 Configuration management for datalogger
 Loads config from ~/.datalogger/config.json
 """
+import copy
 import json
 import os
 import pathlib
+import tempfile
+import threading
 from typing import Any, Dict
 
 # Production config location
@@ -40,7 +43,13 @@ DEFAULT_CONFIG = {
         "farm_id": "",
         "house_id": "",
         "cooler_log_enabled": True,
-        "cooler_log_initials": ""
+        "cooler_log_initials": "",
+        "session_idle_minutes": 10,
+        "base_url": "https://vitalfarms.poultrycloud.com",
+        "auto_save": False,
+        "warm_browser": False,
+        "warm_browser_max_jobs": 50,
+        "warm_browser_max_minutes": 120
     },
     "xml": {
         "path": "/srv/ftp/upload/",
@@ -54,8 +63,11 @@ DEFAULT_CONFIG = {
     },
     "system": {
         "time_zone": "America/Chicago",
-        "timeout": 30
+        "timeout": 30,
+        "metrics_enabled": False,
+        "max_open_houses": 8
     },
+    "houses": {},
     "telegram": {
         "bot_token": "",
         "chat_id": ""
@@ -85,53 +97,89 @@ DEFAULT_CONFIG = {
 }
 
 
-def ensure_config_exists():
-    """Create config file with defaults if it doesn't exist
+class ConfigFile:
+    """One config.json on disk with an in-memory cache
 
-    Raises RuntimeError with helpful message if config cannot be created due to permissions.
+    load() is called several times per web request. The parsed config is kept
+    in memory and only re-read when the file's stat signature changes, so hot
+    paths cost one os.stat() instead of a read + json.loads + migration pass.
+    The module-level functions below use the instance for CONFIG_DIR; the web
+    app creates one per house when serving several (see server/tenants.py).
     """
-    try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
-        if not CONFIG_FILE.exists():
-            print(f"Creating default config at {CONFIG_FILE}")
-            print("Please edit this file with your settings.")
-            CONFIG_FILE.write_text(json.dumps(DEFAULT_CONFIG, indent=2))
-            return False
-        return True
-    except (PermissionError, OSError) as e:
-        error_msg = f"""
+    def __init__(self, config_dir):
+        self.config_dir = pathlib.Path(config_dir)
+        self.config_file = self.config_dir / "config.json"
+        self._lock = threading.RLock()
+        self._cache = None
+        self._signature = None
+        self._generation = 0
+        # New files get their own dev database next to them, not the main one
+        self._defaults = copy.deepcopy(DEFAULT_CONFIG)
+        self._defaults["deployment"]["localhost_database"] = str(self.config_dir / "dev_database.db")
+
+    def ensure_exists(self):
+        """Create config file with defaults if it doesn't exist
+
+        Raises RuntimeError with helpful message if config cannot be created due to permissions.
+        """
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+
+            if not self.config_file.exists():
+                print(f"Creating default config at {self.config_file}")
+                print("Please edit this file with your settings.")
+                self.config_file.write_text(json.dumps(self._defaults, indent=2))
+                return False
+            return True
+        except (PermissionError, OSError) as e:
+            error_msg = f"""
 Config file not found and cannot be created due to permission error.
 
-Location: {CONFIG_FILE}
+Location: {self.config_file}
 Error: {e}
 
 To fix this, run these commands:
 
-sudo mkdir -p {CONFIG_DIR}
-sudo chown apache:apache {CONFIG_DIR}
-sudo chmod 755 {CONFIG_DIR}
+sudo mkdir -p {self.config_dir}
+sudo chown apache:apache {self.config_dir}
+sudo chmod 755 {self.config_dir}
 sudo systemctl restart httpd
 
 The config file will be created automatically on restart.
 """
-        raise RuntimeError(error_msg)
-
-
-def load_config() -> Dict[str, Any]:
-    """Load configuration from file"""
-    if not ensure_config_exists():
-        print(f"Config file created at {CONFIG_FILE} with default values.")
-        print("Please edit the settings through the web UI Settings page.")
-
-    try:
-        config = json.loads(CONFIG_FILE.read_text())
+            raise RuntimeError(error_msg)
+
+    def _stat_signature(self):
+        """Return (mtime_ns, size, inode) for the config file, or None if missing"""
+        try:
+            st = os.stat(self.config_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _store_in_cache(self, config: Dict[str, Any]):
+        """Replace the cached config and bump the generation counter"""
+        self._cache = copy.deepcopy(config)
+        self._signature = self._stat_signature()
+        self._generation += 1
+
+    def _read_from_disk(self) -> Dict[str, Any]:
+        """Read, parse and auto-migrate the config file"""
+        if not self.ensure_exists():
+            print(f"Config file created at {self.config_file} with default values.")
+            print("Please edit the settings through the web UI Settings page.")
+
+        try:
+            config = json.loads(self.config_file.read_text())
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Invalid JSON in config file {self.config_file}: {e}")
 
         # Auto-migrate: add missing sections from DEFAULT_CONFIG
         needs_save = False
-        for section, defaults in DEFAULT_CONFIG.items():
+        for section, defaults in self._defaults.items():
             if section not in config:
-                config[section] = defaults
+                config[section] = copy.deepcopy(defaults)
                 needs_save = True
                 print(f"Added missing config section: {section}")
             elif isinstance(defaults, dict):
@@ -144,32 +192,115 @@ def load_config() -> Dict[str, Any]:
 
         # Save if we added anything
         if needs_save:
-            save_config(config)
-            print(f"Config auto-migrated and saved to {CONFIG_FILE}")
+            self.save(config)
+            print(f"Config auto-migrated and saved to {self.config_file}")
 
         return config
-    except json.JSONDecodeError as e:
-        raise RuntimeError(f"Invalid JSON in config file {CONFIG_FILE}: {e}")
 
-
-def save_config(config: Dict[str, Any]):
-    """Save configuration to file"""
-    try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        CONFIG_FILE.write_text(json.dumps(config, indent=2))
-    except (PermissionError, OSError) as e:
-        error_msg = f"""
+    def _refresh_cache(self):
+        """Re-read the config file if it changed on disk (caller holds the lock)"""
+        if self._cache is None or self._stat_signature() != self._signature:
+            self._store_in_cache(self._read_from_disk())
+
+    def load(self) -> Dict[str, Any]:
+        """Load configuration, served from the in-memory cache when the file is unchanged
+
+        Returns a copy, so callers may modify it freely before passing it to save().
+        """
+        with self._lock:
+            self._refresh_cache()
+            return copy.deepcopy(self._cache)
+
+    def generation(self) -> int:
+        """Return a counter that increases every time the cached config changes"""
+        with self._lock:
+            self._refresh_cache()
+            return self._generation
+
+    def invalidate(self):
+        """Drop the cached config so the next load() re-reads the file"""
+        with self._lock:
+            self._cache = None
+            self._signature = None
+
+    def save(self, config: Dict[str, Any]):
+        """Save configuration to file atomically and update the in-memory cache
+
+        The new contents are written to a temporary file in the config directory
+        and then renamed over config.json, so readers never see a half-written file.
+        """
+        tmp_path = None
+        try:
+            with self._lock:
+                self.config_dir.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix=".config.", suffix=".tmp", dir=self.config_dir)
+                with os.fdopen(fd, "w") as f:
+                    f.write(json.dumps(config, indent=2))
+                    f.flush()
+                    os.fsync(f.fileno())
+                # mkstemp creates the file 0600; keep the permissions of the existing config
+                try:
+                    os.chmod(tmp_path, os.stat(self.config_file).st_mode & 0o777)
+                except FileNotFoundError:
+                    os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.config_file)
+                tmp_path = None
+                self._store_in_cache(config)
+        except (PermissionError, OSError) as e:
+            error_msg = f"""
 Cannot save configuration file due to permission error.
 
-Location: {CONFIG_FILE}
+Location: {self.config_file}
 Error: {e}
 
 To fix this, run:
 
-sudo chown apache:apache {CONFIG_FILE}
-sudo chmod 644 {CONFIG_FILE}
+sudo chown apache:apache {self.config_dir}
+sudo chown apache:apache {self.config_file}
+sudo chmod 644 {self.config_file}
 """
-        raise RuntimeError(error_msg)
+            raise RuntimeError(error_msg)
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+
+default_config_file = ConfigFile(CONFIG_DIR)
+
+
+def ensure_config_exists():
+    """Create config file with defaults if it doesn't exist"""
+    return default_config_file.ensure_exists()
+
+
+def get_config_generation() -> int:
+    """Return a counter that increases every time the cached config changes.
+
+    Lets other modules cheaply rebuild state derived from the config
+    (e.g. the flock calendar) only when it actually changed.
+    """
+    return default_config_file.generation()
+
+
+def invalidate_config_cache():
+    """Drop the cached config so the next load_config() re-reads the file"""
+    default_config_file.invalidate()
+
+
+def load_config() -> Dict[str, Any]:
+    """Load configuration, served from the in-memory cache when the file is unchanged
+
+    Returns a copy, so callers may modify it freely before passing it to save_config().
+    """
+    return default_config_file.load()
+
+
+def save_config(config: Dict[str, Any]):
+    """Save configuration to file atomically and update the in-memory cache"""
+    default_config_file.save(config)
 
 
 def get_flat_config() -> Dict[str, Any]:
@@ -196,6 +327,14 @@ def get_flat_config() -> Dict[str, Any]:
     flat["House_ID"] = config["unitas"]["house_id"]
     flat["Cooler_Log_To_Unitas"] = config["unitas"]["cooler_log_enabled"]
     flat["Cooler_Log_Initials"] = config["unitas"]["cooler_log_initials"]
+    flat["Unitas_Session_Idle_Minutes"] = config["unitas"]["session_idle_minutes"]
+    # Not a documented setting: "http" selects the experimental client (unitas_http.py)
+    flat["Unitas_Client"] = config["unitas"].get("client", "selenium")
+    flat["Unitas_Base_URL"] = config["unitas"]["base_url"]
+    flat["Unitas_Auto_Save"] = config["unitas"]["auto_save"]
+    flat["Unitas_Warm_Browser"] = config["unitas"]["warm_browser"]
+    flat["Unitas_Warm_Browser_Max_Jobs"] = config["unitas"]["warm_browser_max_jobs"]
+    flat["Unitas_Warm_Browser_Max_Minutes"] = config["unitas"]["warm_browser_max_minutes"]
 
     # XML settings
     flat["path_to_xmls"] = config["xml"]["path"]
@@ -234,9 +373,10 @@ def get_deployment_mode() -> str:
     return config["deployment"]["mode"]
 
 
-def get_database_path() -> str:
-    """Get database path based on deployment mode"""
-    config = load_config()
+def get_database_path(config: Dict[str, Any] = None) -> str:
+    """Get database path based on deployment mode (of the given config, default: ours)"""
+    if config is None:
+        config = load_config()
     mode = config["deployment"]["mode"]
 
     if mode == "production":
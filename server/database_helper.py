@@ -1,13 +1,48 @@
+import os
+import json
 import sqlite3
 import shutil
 import pathlib
-from datetime import datetime
+from datetime import datetime, timedelta
 from server.config import get_backup_dir, get_coolerlog_dir
-from server.helpers import get_bird_age
+from server.helpers import get_flock_calendar
+from server import metrics
+
+# ------------------- CONNECTIONS -------------------
+def _connect(db_file):
+    """Open a connection to db_file, instrumented when metrics are enabled"""
+    factory = metrics.connection_factory()
+    if factory is None:
+        return sqlite3.connect(db_file)
+    return sqlite3.connect(db_file, factory=factory)
+
+# ------------------- FLOCK CALENDARS -------------------
+# Each house served by the web app (see server/tenants.py) has its own
+# database and hatch date. Without registrations everything uses the main
+# config's calendar, as before.
+_calendar_sources = {}
+
+def register_flock_calendar(db_file, source):
+    """Use source() -> FlockCalendar for bird ages and summaries in db_file"""
+    _calendar_sources[os.path.abspath(str(db_file))] = source
+
+def unregister_flock_calendar(db_file):
+    """Go back to the main config's calendar for db_file (its house was closed)"""
+    _calendar_sources.pop(os.path.abspath(str(db_file)), None)
+
+def _db_file_of(conn):
+    """Main database file of an open connection (only looked up when houses are registered)"""
+    if not _calendar_sources:
+        return None
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+def _flock_calendar(db_file=None):
+    source = _calendar_sources.get(os.path.abspath(str(db_file))) if db_file and _calendar_sources else None
+    return source() if source else get_flock_calendar()
 
 # ------------------- DATABASE SETUP -------------------
 def setup_db(db_file):
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     curr = conn.cursor()
 
     # Data_Log table
@@ -103,6 +138,7 @@ def migrate_schema(conn):
         'sent_to_unitas_at': 'TIMESTAMP',
         'verified_at': 'TIMESTAMP',
         'total_eggs': 'INTEGER DEFAULT 0',
+        'version': 'INTEGER DEFAULT 0',
     }
 
     # Add missing columns to Daily_User_Log
@@ -122,6 +158,7 @@ def migrate_schema(conn):
     expected_bot_columns = {
         'cooler_logged_at': 'TIMESTAMP',
         'cooler_to_db_at': 'TIMESTAMP',
+        'version': 'INTEGER DEFAULT 0',
     }
 
     # Add missing columns to Daily_Bot_Log
@@ -151,6 +188,50 @@ def migrate_schema(conn):
             except Exception as e:
                 print(f"Error adding column '{col_name}': {e}")
 
+    # Indexes for date lookups and range scans
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_daily_user_log_date ON Daily_User_Log(date, send_to_bot)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_daily_bot_log_date ON Daily_Bot_Log(date)")
+
+    # Outcomes of offline edits replayed through /api/sync, keyed by client op_id
+    cur.execute('''CREATE TABLE IF NOT EXISTS Sync_Operations (
+        op_id TEXT PRIMARY KEY,
+        applied_at TIMESTAMP,
+        result TEXT
+    )''')
+
+    # Unitas uploads waiting to run (or retry); see UPLOAD QUEUE below
+    cur.execute('''CREATE TABLE IF NOT EXISTS Upload_Jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_type TEXT NOT NULL,
+        date TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_run_at TIMESTAMP NOT NULL,
+        last_error TEXT,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    )''')
+    # At most one waiting job per upload; re-queuing the same date just moves it up
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_upload_jobs_pending "
+                "ON Upload_Jobs(job_type, date) WHERE status = 'pending'")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_upload_jobs_due ON Upload_Jobs(status, next_run_at)")
+
+    # What was last submitted to each Unitas form per date; see UNITAS SUBMISSIONS below
+    cur.execute('''CREATE TABLE IF NOT EXISTS Unitas_Submissions (
+        date TEXT NOT NULL,
+        form TEXT NOT NULL,
+        snapshot TEXT NOT NULL,
+        submitted_at TIMESTAMP,
+        PRIMARY KEY (date, form)
+    )''')
+
+    # Production summaries; backfill the current flock the first time
+    if _create_summary_tables(cur):
+        hatch = _summary_hatch_date(_db_file_of(conn))
+        weeks = _rebuild_summaries(cur, hatch) if hatch is not None else 0
+        if weeks:
+            print(f"Built {weeks} weekly summaries for flock {hatch.isoformat()}")
+
     conn.commit()
 
 
@@ -161,11 +242,13 @@ def _insert_into_table(db_file, table, data_dict):
     cols = ", ".join(data_dict.keys())
     placeholders = ", ".join("?" for _ in data_dict)
     sql = f"INSERT INTO {table} ({cols}) VALUES ({placeholders})"
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute(sql, tuple(data_dict.values()))
-    conn.commit()
     lastrowid = cur.lastrowid
+    if table in ('Daily_User_Log', 'Daily_Bot_Log'):
+        _refresh_summaries(cur, [data_dict.get('date')])
+    conn.commit()
     conn.close()
     return lastrowid
 
@@ -256,7 +339,7 @@ def insert_daily_user_log(
 # ------------------- FETCH FUNCTIONS -------------------
 
 def get_daily_user_log(db_file, date_str=None):
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
     if date_str:
@@ -268,7 +351,7 @@ def get_daily_user_log(db_file, date_str=None):
     return dict(row) if row else None
 
 def get_daily_bot_log(db_file, date_str=None):
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
     if date_str:
@@ -280,7 +363,7 @@ def get_daily_bot_log(db_file, date_str=None):
     return dict(row) if row else None
 
 def get_all_user_logs(db_file):
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
     cur.execute("SELECT * FROM Daily_User_Log ORDER BY date DESC")
@@ -289,7 +372,7 @@ def get_all_user_logs(db_file):
     return [dict(row) for row in rows]
 
 def get_all_bot_logs(db_file):
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
     cur.execute("SELECT * FROM Daily_Bot_Log ORDER BY date DESC")
@@ -299,7 +382,7 @@ def get_all_bot_logs(db_file):
 
 def get_recent_pallet_logs(db_file, limit=10):
     """Get recent completed pallet log entries, most recent first"""
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
     cur.execute("SELECT * FROM Pallet_Log WHERE completed = 1 ORDER BY id DESC LIMIT ?", (limit,))
@@ -309,7 +392,7 @@ def get_recent_pallet_logs(db_file, limit=10):
 
 def get_most_recent_pallet(db_file):
     """Get the most recent pallet entry"""
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
     cur.execute("SELECT * FROM Pallet_Log ORDER BY id DESC LIMIT 1")
@@ -319,7 +402,7 @@ def get_most_recent_pallet(db_file):
 
 def get_pallets_by_date(db_file, date_str):
     """Get all completed pallet entries for a specific date"""
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
     cur.execute("SELECT * FROM Pallet_Log WHERE thedate = ? AND completed = 1 ORDER BY id DESC", (date_str,))
@@ -336,7 +419,7 @@ def create_new_pallet_entry(db_file, pallet_id=None, yolk_color=None):
 
     # Calculate flock age from hatch date
     try:
-        flock_age = float(get_bird_age())
+        flock_age = float(_flock_calendar(db_file).age())
     except Exception as e:
         print(f"Error calculating bird age: {e}")
         flock_age = 0.0
@@ -354,36 +437,247 @@ def create_new_pallet_entry(db_file, pallet_id=None, yolk_color=None):
 
     return _insert_into_table(db_file, "Pallet_Log", payload)
 
+# INSERT ... RETURNING needs SQLite 3.35; older system libraries read the row back instead
+_SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+def _next_pallet_id(last_pallet_id):
+    """Pallet number after last_pallet_id, or "" when that isn't a number"""
+    try:
+        return str(int(last_pallet_id) + 1)
+    except (TypeError, ValueError):
+        return ""
+
+def create_pallet_with_next_id(db_file, yolk_color=None):
+    """Allocate the next pallet number and insert the new pallet in one transaction
+
+    The most recent pallet is read and its successor inserted under BEGIN
+    IMMEDIATE on a single connection, so two simultaneous "new pallet" taps
+    get consecutive numbers rather than the same one. yolk_color defaults to
+    the previous pallet's.
+
+    Returns:
+        The new Pallet_Log row as a dict
+    """
+    thedate = datetime.now().date().isoformat()
+    try:
+        flock_age = float(_flock_calendar(db_file).age())
+    except Exception as e:
+        print(f"Error calculating bird age: {e}")
+        flock_age = 0.0
+
+    insert = (
+        "INSERT INTO Pallet_Log (thedate, pallet_id, house_id, total_pallet_weight, case_weight, "
+        "flock_age, yolk_color, completed) VALUES (?, ?, 1, 0, 0, ?, ?, 0)"
+    )
+    conn = _connect(db_file)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute("SELECT pallet_id, yolk_color FROM Pallet_Log ORDER BY id DESC LIMIT 1")
+        recent = cur.fetchone()
+        pallet_id = _next_pallet_id(recent["pallet_id"]) if recent else ""
+        if not yolk_color and recent:
+            yolk_color = recent["yolk_color"]
+        values = (thedate, pallet_id, flock_age, yolk_color or "")
+
+        if _SQLITE_HAS_RETURNING:
+            cur.execute(insert + " RETURNING *", values)
+            row = cur.fetchall()[0]
+        else:
+            cur.execute(insert, values)
+            cur.execute("SELECT * FROM Pallet_Log WHERE id = ?", (cur.lastrowid,))
+            row = cur.fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return dict(row)
+
 # ------------------- UPDATE FUNCTIONS -------------------
+# Columns written by the automation service for its own bookkeeping. Updating
+# only these does not bump the row version, so uploads/verification running in
+# the background never cause edit conflicts on the tablets.
+BOOKKEEPING_COLUMNS = {'sent_to_unitas_at', 'verified_at', 'cooler_logged_at', 'cooler_to_db_at'}
+
+def _set_clause(data):
+    """Build the SET clause for an update, bumping version for user-visible changes"""
+    set_clause = ", ".join([f"{k} = ?" for k in data.keys()])
+    if not set(data.keys()) <= BOOKKEEPING_COLUMNS and 'version' not in data:
+        set_clause += ", version = COALESCE(version, 0) + 1"
+    return set_clause
+
 def update_daily_user_log(db_file, date_str, data):
     if not data:
         raise ValueError("No data provided to update.")
-    set_clause = ", ".join([f"{k} = ?" for k in data.keys()])
+    set_clause = _set_clause(data)
     sql = f"UPDATE Daily_User_Log SET {set_clause} WHERE date = ?"
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute(sql, tuple(data.values()) + (date_str,))
+    if set(data) & SUMMARY_SOURCE_COLUMNS:
+        _refresh_summaries(cur, [date_str, data.get('date')])
     conn.commit()
     conn.close()
 
 def update_daily_bot_log(db_file, date, data):
     if not data:
         raise ValueError("No data provided to update.")
-    set_clause = ", ".join([f"{k} = ?" for k in data.keys()])
+    set_clause = _set_clause(data)
     sql = f"UPDATE Daily_Bot_Log SET {set_clause} WHERE date = ?"
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute(sql, tuple(data.values()) + (date,))
+    if set(data) & SUMMARY_SOURCE_COLUMNS:
+        _refresh_summaries(cur, [date, data.get('date')])
     conn.commit()
     conn.close()
 
+# Tables that accept batched edits: request name -> (table, columns that may not be written)
+BATCH_TABLES = {
+    'user_log': ('Daily_User_Log', {'id', 'date', 'version'}),
+    'bot_log': ('Daily_Bot_Log', {'id', 'date', 'version'}),
+}
+
+def apply_log_changes(db_file, changes, floor_eggs_through_belt=None):
+    """
+    Apply a batch of field changes to the daily logs in one transaction.
+
+    Each change is a dict:
+        {"table": "user_log" | "bot_log", "date": "YYYY-MM-DD",
+         "version": <row version the client last saw, or None>, "fields": {...}}
+
+    Changes to the same (table, date) are coalesced in order (later fields win),
+    keeping the version of the first one. If any row's current version differs
+    from the version the client sent, nothing is written and the conflicts are
+    returned. Missing user_log rows are created; missing bot_log rows are an error.
+
+    If floor_eggs_through_belt is not None, total_eggs is recomputed for user_log
+    rows whose belt_eggs or floor_eggs change.
+
+    Returns:
+        dict with keys:
+          "versions": list of {"table", "date", "version"} for rows written
+          "conflicts": list of {"table", "date", "version", "row"} (empty on success)
+          "send_to_bot_set": dates whose send_to_bot changed from unset to set
+    """
+    conn = _connect(db_file)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    try:
+        # Take the write lock up front so version checks and writes are atomic
+        cur.execute("BEGIN IMMEDIATE")
+        result = _apply_log_changes(cur, changes, floor_eggs_through_belt)
+        if result['conflicts']:
+            conn.rollback()
+        else:
+            conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def _apply_log_changes(cur, changes, floor_eggs_through_belt=None):
+    """apply_log_changes() on an open cursor inside a transaction; the caller commits
+
+    When conflicts are returned nothing has been written yet.
+    """
+    # Coalesce changes per (table, date), preserving first-seen order
+    merged = {}
+    for change in changes:
+        table_key = change.get('table')
+        date_str = change.get('date')
+        fields = change.get('fields') or {}
+        if table_key not in BATCH_TABLES:
+            raise ValueError(f"Unknown table: {table_key}")
+        if not date_str:
+            raise ValueError("Each change needs a date.")
+        key = (table_key, date_str)
+        if key not in merged:
+            merged[key] = {'version': change.get('version'), 'fields': {}}
+        merged[key]['fields'].update(fields)
+
+    result = {'versions': [], 'conflicts': [], 'send_to_bot_set': []}
+
+    allowed_columns = {}
+    for table_key, (table, protected) in BATCH_TABLES.items():
+        cur.execute(f"PRAGMA table_info({table})")
+        allowed_columns[table_key] = {row[1] for row in cur.fetchall()} - protected
+
+    pending_writes = []
+    for (table_key, date_str), change in merged.items():
+        table = BATCH_TABLES[table_key][0]
+        fields = dict(change['fields'])
+        unknown = set(fields) - allowed_columns[table_key]
+        if unknown:
+            raise ValueError(f"Unknown or read-only fields for {table_key}: {', '.join(sorted(unknown))}")
+
+        cur.execute(f"SELECT * FROM {table} WHERE date = ? ORDER BY id LIMIT 1", (date_str,))
+        row = cur.fetchone()
+        current_version = (row['version'] or 0) if row else None
+        client_version = change['version']
+
+        if row is None and table_key == 'bot_log':
+            raise ValueError(f"No bot log for {date_str}.")
+        if client_version is not None and row is not None and int(client_version) != current_version:
+            result['conflicts'].append({
+                'table': table_key, 'date': date_str,
+                'version': current_version, 'row': dict(row),
+            })
+            continue
+
+        if table_key == 'user_log':
+            if floor_eggs_through_belt is not None and ('belt_eggs' in fields or 'floor_eggs' in fields):
+                belt_eggs = int((fields['belt_eggs'] if 'belt_eggs' in fields else (row['belt_eggs'] if row else 0)) or 0)
+                floor_eggs = int((fields['floor_eggs'] if 'floor_eggs' in fields else (row['floor_eggs'] if row else 0)) or 0)
+                fields['total_eggs'] = belt_eggs if floor_eggs_through_belt else belt_eggs + floor_eggs
+            if 'send_to_bot' in fields:
+                old_send_to_bot = row['send_to_bot'] if row else 0
+                if not old_send_to_bot and fields['send_to_bot'] and str(fields['send_to_bot']) != '0':
+                    result['send_to_bot_set'].append(date_str)
+
+        pending_writes.append((table_key, table, date_str, row, fields))
+
+    if result['conflicts']:
+        result['send_to_bot_set'] = []
+        return result
+
+    for table_key, table, date_str, row, fields in pending_writes:
+        if row is None:
+            fields = dict(fields, date=date_str, version=1)
+            cols = ", ".join(fields.keys())
+            placeholders = ", ".join("?" for _ in fields)
+            cur.execute(f"INSERT INTO {table} ({cols}) VALUES ({placeholders})", tuple(fields.values()))
+            new_version = 1
+        else:
+            new_version = (row['version'] or 0) + 1
+            if fields:
+                set_clause = ", ".join([f"{k} = ?" for k in fields.keys()])
+                cur.execute(
+                    f"UPDATE {table} SET {set_clause}, version = ? WHERE date = ?",
+                    tuple(fields.values()) + (new_version, date_str)
+                )
+            else:
+                new_version -= 1
+        result['versions'].append({'table': table_key, 'date': date_str, 'version': new_version})
+
+    _refresh_summaries(cur, [
+        date_str for _, _, date_str, row, fields in pending_writes
+        if row is None or set(fields) & SUMMARY_SOURCE_COLUMNS
+    ])
+    return result
+
 def clear_unitas_send_timestamp(db_file, date_str):
     """
     Clear the sent_to_unitas_at timestamp for a given date.
     This marks the date as not yet sent to Unitas, making it eligible for upload.
     Used by manual send to re-trigger upload for a previously sent date.
     """
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute("UPDATE Daily_User_Log SET sent_to_unitas_at = NULL WHERE date = ?", (date_str,))
     conn.commit()
@@ -397,7 +691,7 @@ def update_pallet_log(db_file, pallet_id, data):
         raise ValueError("No data provided to update.")
     set_clause = ", ".join([f"{k} = ?" for k in data.keys()])
     sql = f"UPDATE Pallet_Log SET {set_clause} WHERE id = ?"
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute(sql, tuple(data.values()) + (pallet_id,))
     conn.commit()
@@ -407,7 +701,7 @@ def mark_pallet_completed(db_file, pallet_id):
     """Mark a pallet as completed and set the date to today"""
     from datetime import date
     today = date.today().strftime('%Y-%m-%d')
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute("UPDATE Pallet_Log SET completed = 1, thedate = ? WHERE id = ?", (today, pallet_id))
     conn.commit()
@@ -415,10 +709,133 @@ def mark_pallet_completed(db_file, pallet_id):
     conn.close()
     return rows_updated
 
+# ------------------- OFFLINE SYNC -------------------
+# Tablets queue edits locally while the barn Wi-Fi is down and replay them
+# through /api/sync. Every operation carries a client-generated op_id; its
+# outcome is stored in Sync_Operations so a replayed operation (e.g. after a
+# request that timed out but was applied) returns the stored result instead of
+# being applied twice.
+SYNC_RETENTION_DAYS = 30
+
+# Pallet_Log columns a sync operation may write
+PALLET_SYNC_COLUMNS = {'pallet_id', 'total_pallet_weight', 'case_weight', 'yolk_color'}
+
+def _stored_sync_result(cur, op_id):
+    cur.execute("SELECT result FROM Sync_Operations WHERE op_id = ?", (op_id,))
+    row = cur.fetchone()
+    return json.loads(row[0]) if row else None
+
+def _apply_sync_operation(cur, op, floor_eggs_through_belt):
+    """Apply one queued operation; returns (result dict, dates whose send_to_bot was set)"""
+    op_id = op['op_id']
+    kind = op.get('kind')
+
+    if kind == 'log':
+        version = op.get('version')
+        base_op_id = op.get('base_op_id')
+        if base_op_id:
+            # Queued behind an earlier edit of the same row: expect the version that edit produced
+            base = _stored_sync_result(cur, base_op_id)
+            if base is not None:
+                version = base.get('version') if base.get('status') == 'applied' else -1
+        change = {'table': op.get('table'), 'date': op.get('date'), 'version': version, 'fields': op.get('fields') or {}}
+        applied = _apply_log_changes(cur, [change], floor_eggs_through_belt)
+        if applied['conflicts']:
+            conflict = applied['conflicts'][0]
+            return {'op_id': op_id, 'status': 'conflict', 'table': conflict['table'], 'date': conflict['date'],
+                    'version': conflict['version'], 'row': conflict['row']}, []
+        written = applied['versions'][0]
+        return {'op_id': op_id, 'status': 'applied', 'table': written['table'], 'date': written['date'],
+                'version': written['version']}, applied['send_to_bot_set']
+
+    if kind == 'pallet':
+        fields = op.get('fields') or {}
+        unknown = set(fields) - PALLET_SYNC_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown or read-only pallet fields: {', '.join(sorted(unknown))}")
+        if fields:
+            set_clause = ", ".join([f"{k} = ?" for k in fields.keys()])
+            cur.execute(f"UPDATE Pallet_Log SET {set_clause} WHERE id = ?", tuple(fields.values()) + (op.get('pallet_id'),))
+            if cur.rowcount == 0:
+                raise ValueError(f"Pallet {op.get('pallet_id')} not found.")
+        return {'op_id': op_id, 'status': 'applied', 'pallet_id': op.get('pallet_id')}, []
+
+    raise ValueError(f"Unknown operation kind: {kind}")
+
+def apply_sync_operations(db_file, operations, floor_eggs_through_belt=None, prepare=None):
+    """
+    Apply queued offline edits in order, idempotently, in one transaction.
+
+    Each operation is a dict with a client-generated "op_id" and a "kind":
+        {"op_id", "kind": "log", "table": "user_log" | "bot_log", "date",
+         "version" or "base_op_id", "fields": {...}}
+        {"op_id", "kind": "pallet", "pallet_id": <Pallet_Log.id>, "fields": {...}}
+
+    "base_op_id" names an earlier operation on the same row; the version it
+    produced is used as the expected version. Operations that conflict or are
+    invalid are skipped (their partial writes rolled back to a savepoint) and
+    reported; the rest are applied. Each outcome is recorded under its op_id,
+    so replaying an operation returns the stored result with "duplicate": True.
+
+    prepare, if given, is called with each new operation before it is applied
+    and may rewrite it in place; a ValueError from it rejects that operation.
+    An operation without an op_id is rejected without being recorded.
+
+    Returns:
+        dict with "results" (one per operation, in order) and "send_to_bot_set"
+    """
+    conn = _connect(db_file)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    results = []
+    send_to_bot_set = []
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        now = datetime.now()
+        cur.execute("DELETE FROM Sync_Operations WHERE applied_at < ?",
+                    ((now - timedelta(days=SYNC_RETENTION_DAYS)).isoformat(),))
+
+        for op in operations:
+            op_id = op.get('op_id')
+            if not op_id:
+                results.append({'op_id': None, 'status': 'rejected', 'message': "Each operation needs an op_id."})
+                continue
+
+            stored = _stored_sync_result(cur, op_id)
+            if stored is not None:
+                stored['duplicate'] = True
+                results.append(stored)
+                continue
+
+            cur.execute("SAVEPOINT sync_op")
+            try:
+                if prepare is not None:
+                    prepare(op)
+                result, dates = _apply_sync_operation(cur, op, floor_eggs_through_belt)
+                if result['status'] != 'applied':
+                    cur.execute("ROLLBACK TO sync_op")
+                send_to_bot_set.extend(dates)
+            except ValueError as e:
+                cur.execute("ROLLBACK TO sync_op")
+                result = {'op_id': op_id, 'status': 'rejected', 'message': str(e)}
+            cur.execute("RELEASE sync_op")
+
+            cur.execute("INSERT INTO Sync_Operations (op_id, applied_at, result) VALUES (?, ?, ?)",
+                        (op_id, now.isoformat(), json.dumps(result)))
+            results.append(result)
+
+        conn.commit()
+        return {'results': results, 'send_to_bot_set': send_to_bot_set}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
 # ------------------- DELETE FUNCTIONS -------------------
 def delete_pallet_log(db_file, pallet_id):
     """Delete a pallet log entry by its ID"""
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute("DELETE FROM Pallet_Log WHERE id = ?", (pallet_id,))
     conn.commit()
@@ -440,7 +857,7 @@ def get_unuploaded_days(db_file, days=7):
         for i in range(1, days + 1)
     ]
 
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
 
     # Find which of those dates have been uploaded
@@ -472,7 +889,7 @@ def get_failed_verification_days(db_file, days=14):
         for i in range(1, days + 1)
     ]
 
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
 
     placeholders = ",".join("?" for _ in dates_to_check)
@@ -513,7 +930,7 @@ def get_uploaded_days_last_week(db_file, days=7):
         for i in range(1, days + 1)
     ]
 
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
 
     placeholders = ",".join("?" for _ in dates_to_check)
@@ -537,7 +954,7 @@ def get_dates_pending_unitas_upload(db_file):
     3. Have corresponding bot_log data
     Returns list of date strings in ISO format
     """
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
 
     # Join user_log with bot_log to ensure both exist
@@ -564,7 +981,7 @@ def get_dates_pending_coolerlog_upload(db_file):
     3. Have valid cooler temperature data (not NULL or empty)
     Returns list of date strings in ISO format
     """
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
 
     sql = """
@@ -582,13 +999,342 @@ def get_dates_pending_coolerlog_upload(db_file):
 
     return [row[0] for row in results]
 
+def find_editable_date(db_file, start_date, direction='prev', max_days=365, min_date="2020-01-01", max_date=None):
+    """
+    Find the nearest date after/before start_date (exclusive) that is still editable,
+    i.e. has no Daily_User_Log row or has send_to_bot unset.
+
+    Uses a single indexed range query for the dates in the search window that are
+    locked (send_to_bot set) and walks the window in memory to find the first gap.
+
+    Args:
+        db_file: Path to database file
+        start_date: date object or ISO date string to search from
+        direction: 'prev' to search backwards, 'next' to search forwards
+        max_days: Maximum number of days to search
+        min_date: Earliest date (ISO string) to consider
+        max_date: Latest date (ISO string) to consider (default: today)
+
+    Returns:
+        ISO date string of the editable date, or None if none found in the window
+    """
+    from datetime import date, timedelta
+    if isinstance(start_date, str):
+        start_date = date.fromisoformat(start_date)
+    lower = date.fromisoformat(min_date)
+    upper = date.fromisoformat(max_date) if max_date else date.today()
+    step = timedelta(days=-1 if direction == 'prev' else 1)
+
+    if direction == 'prev':
+        window_start = max(start_date - timedelta(days=max_days), lower)
+        window_end = min(start_date + step, upper)
+    else:
+        window_start = max(start_date + step, lower)
+        window_end = min(start_date + timedelta(days=max_days), upper)
+
+    if window_start > window_end:
+        return None
+
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT DISTINCT date FROM Daily_User_Log
+        WHERE date BETWEEN ? AND ?
+        AND send_to_bot IN (1, '1')
+    """, (window_start.isoformat(), window_end.isoformat()))
+    locked = {row[0] for row in cur.fetchall()}
+    conn.close()
+
+    check_date = start_date + step
+    while window_start <= check_date <= window_end:
+        check_date_str = check_date.isoformat()
+        if check_date_str not in locked:
+            return check_date_str
+        check_date += step
+
+    return None
+
+# ------------------- PRODUCTION SUMMARIES -------------------
+# Weekly (by bird-age week) and flock-to-date production totals. The write
+# functions above refresh the one affected week and its flock row, so reports
+# read a single row instead of scanning the daily logs. A flock is identified
+# by its hatch_date.
+
+# Daily log columns that feed the summaries; writes touching none of these skip the refresh
+SUMMARY_SOURCE_COLUMNS = {
+    'date', 'total_eggs', 'belt_eggs', 'floor_eggs',
+    'mortality_indoor', 'mortality_outdoor', 'euthanized_indoor', 'euthanized_outdoor', 'depop',
+    'feed_consumption', 'water_consumption', 'body_weight',
+}
+
+def _create_summary_tables(cur):
+    """Create the summary tables; returns True if they did not exist yet"""
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Flock_Summary'")
+    existed = cur.fetchone() is not None
+
+    cur.execute('''CREATE TABLE IF NOT EXISTS Weekly_Summary (
+        flock_id TEXT,
+        age_week INTEGER,
+        first_date DATE,
+        last_date DATE,
+        days_logged INTEGER DEFAULT 0,
+        total_eggs INTEGER DEFAULT 0,
+        mortality INTEGER DEFAULT 0,
+        euthanized INTEGER DEFAULT 0,
+        depop INTEGER DEFAULT 0,
+        feed_consumption REAL DEFAULT 0,
+        water_consumption REAL DEFAULT 0,
+        avg_daily_eggs REAL,
+        avg_daily_feed REAL,
+        avg_daily_water REAL,
+        avg_body_weight REAL,
+        water_feed_ratio REAL,
+        updated_at TIMESTAMP,
+        PRIMARY KEY (flock_id, age_week)
+    )''')
+
+    cur.execute('''CREATE TABLE IF NOT EXISTS Flock_Summary (
+        flock_id TEXT PRIMARY KEY,
+        first_date DATE,
+        last_date DATE,
+        weeks_logged INTEGER DEFAULT 0,
+        days_logged INTEGER DEFAULT 0,
+        total_eggs INTEGER DEFAULT 0,
+        mortality INTEGER DEFAULT 0,
+        euthanized INTEGER DEFAULT 0,
+        depop INTEGER DEFAULT 0,
+        feed_consumption REAL DEFAULT 0,
+        water_consumption REAL DEFAULT 0,
+        avg_daily_eggs REAL,
+        avg_daily_feed REAL,
+        avg_daily_water REAL,
+        latest_body_weight REAL,
+        water_feed_ratio REAL,
+        updated_at TIMESTAMP
+    )''')
+    return not existed
+
+def _summary_hatch_date(db_file=None):
+    """Current flock's hatch date for db_file, or None if it is not configured"""
+    try:
+        return _flock_calendar(db_file).hatch_date
+    except ValueError:
+        return None
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else None
+
+def _refresh_week(cur, flock_id, hatch, week):
+    """Recompute one Weekly_Summary row from the (at most 7) days it covers"""
+    week_start = (hatch + timedelta(days=week * 7)).isoformat()
+    week_end = (hatch + timedelta(days=week * 7 + 6)).isoformat()
+
+    cur.execute("""
+        SELECT COUNT(*), MIN(date), MAX(date) FROM (
+            SELECT date FROM Daily_User_Log WHERE date BETWEEN ? AND ?
+            UNION
+            SELECT date FROM Daily_Bot_Log WHERE date BETWEEN ? AND ?
+        )
+    """, (week_start, week_end, week_start, week_end))
+    days_logged, first_date, last_date = cur.fetchone()
+
+    if not days_logged:
+        cur.execute("DELETE FROM Weekly_Summary WHERE flock_id = ? AND age_week = ?", (flock_id, week))
+        return
+
+    cur.execute("""
+        SELECT
+            COALESCE(SUM(NULLIF(total_eggs, '')), 0),
+            COALESCE(SUM(COALESCE(NULLIF(mortality_indoor, ''), 0) + COALESCE(NULLIF(mortality_outdoor, ''), 0)), 0),
+            COALESCE(SUM(COALESCE(NULLIF(euthanized_indoor, ''), 0) + COALESCE(NULLIF(euthanized_outdoor, ''), 0)), 0),
+            COALESCE(SUM(NULLIF(depop, '')), 0)
+        FROM Daily_User_Log WHERE date BETWEEN ? AND ?
+    """, (week_start, week_end))
+    total_eggs, mortality, euthanized, depop = cur.fetchone()
+
+    cur.execute("""
+        SELECT
+            COALESCE(SUM(NULLIF(feed_consumption, '')), 0),
+            COALESCE(SUM(NULLIF(water_consumption, '')), 0),
+            AVG(NULLIF(body_weight, ''))
+        FROM Daily_Bot_Log WHERE date BETWEEN ? AND ?
+    """, (week_start, week_end))
+    feed, water, avg_body_weight = cur.fetchone()
+
+    cur.execute("""
+        INSERT OR REPLACE INTO Weekly_Summary (
+            flock_id, age_week, first_date, last_date, days_logged,
+            total_eggs, mortality, euthanized, depop, feed_consumption, water_consumption,
+            avg_daily_eggs, avg_daily_feed, avg_daily_water, avg_body_weight, water_feed_ratio, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        flock_id, week, first_date, last_date, days_logged,
+        total_eggs, mortality, euthanized, depop, feed, water,
+        _ratio(total_eggs, days_logged), _ratio(feed, days_logged), _ratio(water, days_logged),
+        avg_body_weight, _ratio(water, feed), datetime.now().isoformat(),
+    ))
+
+def _refresh_flock(cur, flock_id):
+    """Recompute the Flock_Summary row from its Weekly_Summary rows"""
+    cur.execute("""
+        SELECT COUNT(*), MIN(first_date), MAX(last_date), SUM(days_logged),
+               SUM(total_eggs), SUM(mortality), SUM(euthanized), SUM(depop),
+               SUM(feed_consumption), SUM(water_consumption)
+        FROM Weekly_Summary WHERE flock_id = ?
+    """, (flock_id,))
+    weeks, first_date, last_date, days, total_eggs, mortality, euthanized, depop, feed, water = cur.fetchone()
+
+    if not weeks:
+        cur.execute("DELETE FROM Flock_Summary WHERE flock_id = ?", (flock_id,))
+        return
+
+    cur.execute("""
+        SELECT avg_body_weight FROM Weekly_Summary
+        WHERE flock_id = ? AND avg_body_weight IS NOT NULL
+        ORDER BY age_week DESC LIMIT 1
+    """, (flock_id,))
+    row = cur.fetchone()
+    latest_body_weight = row[0] if row else None
+
+    cur.execute("""
+        INSERT OR REPLACE INTO Flock_Summary (
+            flock_id, first_date, last_date, weeks_logged, days_logged,
+            total_eggs, mortality, euthanized, depop, feed_consumption, water_consumption,
+            avg_daily_eggs, avg_daily_feed, avg_daily_water, latest_body_weight, water_feed_ratio, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        flock_id, first_date, last_date, weeks, days,
+        total_eggs, mortality, euthanized, depop, feed, water,
+        _ratio(total_eggs, days), _ratio(feed, days), _ratio(water, days),
+        latest_body_weight, _ratio(water, feed), datetime.now().isoformat(),
+    ))
+
+def _refresh_summaries(cur, dates):
+    """Refresh the weeks containing `dates` and their flock row on an open cursor
+
+    Summary failures are logged, never raised, so they can't block a save.
+    """
+    hatch = _summary_hatch_date(_db_file_of(cur.connection))
+    if hatch is None:
+        return
+    flock_id = hatch.isoformat()
+    try:
+        weeks = set()
+        for date_str in dates:
+            if not date_str:
+                continue
+            days = (datetime.strptime(str(date_str)[:10], "%Y-%m-%d").date() - hatch).days
+            if days >= 0:
+                weeks.add(days // 7)
+        if not weeks:
+            return
+        for week in sorted(weeks):
+            _refresh_week(cur, flock_id, hatch, week)
+        _refresh_flock(cur, flock_id)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"[Summaries] Failed to refresh summaries for {sorted(dates)}: {e}")
+
+def _rebuild_summaries(cur, hatch):
+    flock_id = hatch.isoformat()
+    cur.execute("DELETE FROM Weekly_Summary WHERE flock_id = ?", (flock_id,))
+    cur.execute("""
+        SELECT date FROM Daily_User_Log WHERE date >= ?
+        UNION
+        SELECT date FROM Daily_Bot_Log WHERE date >= ?
+    """, (flock_id, flock_id))
+    weeks = set()
+    for (date_str,) in cur.fetchall():
+        try:
+            weeks.add((datetime.strptime(str(date_str)[:10], "%Y-%m-%d").date() - hatch).days // 7)
+        except ValueError:
+            continue
+    for week in sorted(weeks):
+        _refresh_week(cur, flock_id, hatch, week)
+    _refresh_flock(cur, flock_id)
+    return len(weeks)
+
+def refresh_summaries(db_file, dates):
+    """Refresh the weekly and flock summaries covering the given dates"""
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    _refresh_summaries(cur, dates)
+    conn.commit()
+    conn.close()
+
+def rebuild_summaries(db_file, hatch_date=None):
+    """
+    Recompute every weekly summary (and the flock row) for a flock from scratch.
+
+    Args:
+        db_file: Path to database file
+        hatch_date: Flock hatch date (YYYY-MM-DD); defaults to the configured one
+
+    Returns:
+        Number of weeks summarised
+    """
+    hatch = datetime.strptime(hatch_date, "%Y-%m-%d").date() if hatch_date else _summary_hatch_date(db_file)
+    if hatch is None:
+        raise ValueError("hatch_date is not configured")
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        weeks = _rebuild_summaries(cur, hatch)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    print(f"[Summaries] Rebuilt {weeks} weekly summaries for flock {hatch.isoformat()}")
+    return weeks
+
+def _current_flock_id(flock_id, db_file=None):
+    if flock_id:
+        return flock_id
+    hatch = _summary_hatch_date(db_file)
+    return hatch.isoformat() if hatch else None
+
+def get_weekly_summary(db_file, age_week, flock_id=None):
+    """Summary row for one bird-age week of a flock (default: current flock), or None"""
+    flock_id = _current_flock_id(flock_id, db_file)
+    conn = _connect(db_file)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM Weekly_Summary WHERE flock_id = ? AND age_week = ?", (flock_id, int(age_week)))
+    row = cur.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def get_weekly_summaries(db_file, flock_id=None):
+    """All weekly summary rows for a flock (default: current flock), oldest week first"""
+    flock_id = _current_flock_id(flock_id, db_file)
+    conn = _connect(db_file)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM Weekly_Summary WHERE flock_id = ? ORDER BY age_week ASC", (flock_id,))
+    rows = cur.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def get_flock_summary(db_file, flock_id=None):
+    """Flock-to-date summary row (default: current flock), or None"""
+    flock_id = _current_flock_id(flock_id, db_file)
+    conn = _connect(db_file)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM Flock_Summary WHERE flock_id = ?", (flock_id,))
+    row = cur.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
 # ------------------- JOB STATUS FUNCTIONS -------------------
 def has_xml_been_processed_today(db_file, date_str):
     """
     Check if XML has been processed for a given date.
     Returns True if bot_log entry exists for the date.
     """
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute("SELECT 1 FROM Daily_Bot_Log WHERE date = ? LIMIT 1", (date_str,))
     result = cur.fetchone()
@@ -600,7 +1346,7 @@ def has_production_been_sent_today(db_file, date_str):
     Check if production data has been sent to Unitas for a given date.
     Returns True if sent_to_unitas_at is not NULL for the date.
     """
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute("SELECT 1 FROM Daily_User_Log WHERE date = ? AND sent_to_unitas_at IS NOT NULL LIMIT 1", (date_str,))
     result = cur.fetchone()
@@ -612,13 +1358,263 @@ def has_cooler_been_logged_today(db_file, date_str):
     Check if cooler log has been sent to Unitas for a given date.
     Returns True if cooler_logged_at is not NULL for the date.
     """
-    conn = sqlite3.connect(db_file)
+    conn = _connect(db_file)
     cur = conn.cursor()
     cur.execute("SELECT 1 FROM Daily_Bot_Log WHERE date = ? AND cooler_logged_at IS NOT NULL LIMIT 1", (date_str,))
     result = cur.fetchone()
     conn.close()
     return result is not None
 
+# ------------------- UPLOAD QUEUE -------------------
+# Unitas uploads are queued in Upload_Jobs and run by the automation service's
+# worker. A failed job goes back to 'pending' with an exponentially growing
+# delay, so a flaky connection is retried within minutes instead of at the
+# next 3 AM sweep; after max_attempts it stays 'failed'. A job re-queued while
+# it was running ends as 'superseded' if that run fails. A 'verify' job checks
+# the last week's uploads against Unitas; its date is the day it was queued.
+# Finished jobs are pruned after a retention window.
+UPLOAD_JOB_TYPES = ("production", "coolerlog", "verify")
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+def enqueue_upload_job(db_file, job_type, date_str, delay_seconds=0):
+    """Queue an upload of date_str, or move an already waiting one up
+
+    Returns:
+        The job id
+    """
+    if job_type not in UPLOAD_JOB_TYPES:
+        raise ValueError(f"Unknown upload job type: {job_type}")
+    now = _now()
+    run_at = (datetime.now() + timedelta(seconds=delay_seconds)).isoformat(timespec="seconds")
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute(
+            "SELECT id FROM Upload_Jobs WHERE job_type = ? AND date = ? AND status = 'pending'",
+            (job_type, date_str),
+        )
+        row = cur.fetchone()
+        if row:
+            # Asked again (e.g. a manual re-send): run it now, with a fresh retry budget
+            job_id = row[0]
+            cur.execute(
+                "UPDATE Upload_Jobs SET next_run_at = MIN(next_run_at, ?), attempts = 0, updated_at = ? WHERE id = ?",
+                (run_at, now, job_id),
+            )
+        else:
+            cur.execute(
+                "INSERT INTO Upload_Jobs (job_type, date, status, attempts, next_run_at, created_at, updated_at) "
+                "VALUES (?, ?, 'pending', 0, ?, ?, ?)",
+                (job_type, date_str, run_at, now, now),
+            )
+            job_id = cur.lastrowid
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return job_id
+
+def claim_upload_job(db_file):
+    """Take the most overdue pending job and mark it running
+
+    Returns:
+        The job as a dict (attempts already counting this run), or None if nothing is due
+    """
+    conn = _connect(db_file)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute(
+            "SELECT * FROM Upload_Jobs WHERE status = 'pending' AND next_run_at <= ? "
+            "ORDER BY next_run_at, id LIMIT 1",
+            (_now(),),
+        )
+        row = cur.fetchone()
+        if row is None:
+            conn.rollback()
+            return None
+        cur.execute(
+            "UPDATE Upload_Jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+            (_now(), row["id"]),
+        )
+        conn.commit()
+        job = dict(row)
+        job["status"] = "running"
+        job["attempts"] += 1
+        return job
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def complete_upload_job(db_file, job_id):
+    conn = _connect(db_file)
+    conn.execute(
+        "UPDATE Upload_Jobs SET status = 'done', last_error = NULL, updated_at = ? WHERE id = ?",
+        (_now(), job_id),
+    )
+    conn.commit()
+    conn.close()
+
+def fail_upload_job(db_file, job_id, error, max_attempts=8, base_delay=60, max_delay=3600):
+    """Record a failed run and schedule the retry: base_delay * 2^(attempts-1), capped at max_delay
+
+    Returns:
+        Seconds until the retry, or None if the job has given up (status 'failed')
+    """
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute("SELECT job_type, date, attempts FROM Upload_Jobs WHERE id = ?", (job_id,))
+        row = cur.fetchone()
+        if row is None:
+            conn.rollback()
+            return None
+        job_type, date_str, attempts = row
+        cur.execute(
+            "SELECT 1 FROM Upload_Jobs WHERE job_type = ? AND date = ? AND status = 'pending' AND id != ?",
+            (job_type, date_str, job_id),
+        )
+        superseded = cur.fetchone() is not None
+        if superseded or attempts >= max_attempts:
+            # Re-queued while running (the newer job carries on), or out of attempts
+            delay = None
+            cur.execute(
+                "UPDATE Upload_Jobs SET status = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                ("superseded" if superseded else "failed", str(error), _now(), job_id),
+            )
+        else:
+            delay = min(max_delay, base_delay * 2 ** (attempts - 1))
+            run_at = (datetime.now() + timedelta(seconds=delay)).isoformat(timespec="seconds")
+            cur.execute(
+                "UPDATE Upload_Jobs SET status = 'pending', next_run_at = ?, last_error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (run_at, str(error), _now(), job_id),
+            )
+        conn.commit()
+        return delay
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def requeue_running_upload_jobs(db_file):
+    """Put jobs left 'running' by a crash or restart back in the queue; returns how many"""
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute("SELECT id, job_type, date FROM Upload_Jobs WHERE status = 'running'")
+        count = 0
+        for job_id, job_type, date_str in cur.fetchall():
+            cur.execute(
+                "SELECT 1 FROM Upload_Jobs WHERE job_type = ? AND date = ? AND status = 'pending'",
+                (job_type, date_str),
+            )
+            status = "superseded" if cur.fetchone() else "pending"
+            cur.execute(
+                "UPDATE Upload_Jobs SET status = ?, last_error = 'interrupted', next_run_at = ?, updated_at = ? "
+                "WHERE id = ?",
+                (status, _now(), _now(), job_id),
+            )
+            count += status == "pending"
+        conn.commit()
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def seconds_until_next_upload_job(db_file):
+    """Seconds until the next pending job is due (0 if one is due now), or None if the queue is empty"""
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    cur.execute("SELECT MIN(next_run_at) FROM Upload_Jobs WHERE status = 'pending'")
+    next_run_at = cur.fetchone()[0]
+    conn.close()
+    if next_run_at is None:
+        return None
+    return max(0.0, (datetime.fromisoformat(next_run_at) - datetime.now()).total_seconds())
+
+def prune_upload_jobs(db_file, keep_days=30):
+    """Delete done, failed and superseded jobs last updated more than keep_days ago; returns how many"""
+    cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat(timespec="seconds")
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    cur.execute(
+        "DELETE FROM Upload_Jobs WHERE status IN ('done', 'failed', 'superseded') AND updated_at < ?",
+        (cutoff,),
+    )
+    deleted = cur.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+def get_upload_jobs(db_file, statuses=("pending", "running", "failed"), limit=50):
+    """Recent jobs in the given states, newest first"""
+    placeholders = ",".join("?" for _ in statuses)
+    conn = _connect(db_file)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT * FROM Upload_Jobs WHERE status IN ({placeholders}) ORDER BY updated_at DESC, id DESC LIMIT ?",
+        (*statuses, limit),
+    )
+    jobs = [dict(row) for row in cur.fetchall()]
+    conn.close()
+    return jobs
+
+# ------------------- UNITAS SUBMISSIONS -------------------
+# A snapshot of the values Unitas last confirmed saving on a form, per date, so
+# a re-send can fill in only what changed since (or skip the browser entirely).
+# A fill that was not confirmed as saved removes the snapshot.
+def get_unitas_submission(db_file, date_str, form="production"):
+    """Last submission of form for date_str as {date, form, snapshot, submitted_at}, or None"""
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT snapshot, submitted_at FROM Unitas_Submissions WHERE date = ? AND form = ?",
+        (date_str, form),
+    )
+    row = cur.fetchone()
+    conn.close()
+    if row is None:
+        return None
+    try:
+        snapshot = json.loads(row[0])
+    except ValueError:
+        return None
+    return {"date": date_str, "form": form, "snapshot": snapshot, "submitted_at": row[1]}
+
+def save_unitas_submission(db_file, date_str, form, snapshot):
+    """Record snapshot (a dict of values Unitas confirmed saving) as the latest submission of form for date_str"""
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT OR REPLACE INTO Unitas_Submissions (date, form, snapshot, submitted_at) VALUES (?, ?, ?, ?)",
+        (date_str, form, json.dumps(snapshot, sort_keys=True), _now()),
+    )
+    conn.commit()
+    conn.close()
+
+def delete_unitas_submission(db_file, date_str, form="production"):
+    """Forget what was submitted for date_str, so the next upload fills the whole form"""
+    conn = _connect(db_file)
+    cur = conn.cursor()
+    cur.execute("DELETE FROM Unitas_Submissions WHERE date = ? AND form = ?", (date_str, form))
+    conn.commit()
+    conn.close()
+
 # ------------------- DATABASE BACKUP -------------------
 def backup_database(db_file, backup_dir=None):
     """
@@ -667,7 +1663,7 @@ def setup_coolerlog_db(coolerlog_db_file):
     Args:
         coolerlog_db_file: Path to the cooler log backup database
     """
-    conn = sqlite3.connect(coolerlog_db_file)
+    conn = _connect(coolerlog_db_file)
     cur = conn.cursor()
 
     cur.execute('''CREATE TABLE IF NOT EXISTS Cooler_Log (
@@ -707,7 +1703,7 @@ def backup_cooler_logs(db_file, coolerlog_dir=None):
     setup_coolerlog_db(coolerlog_db_file)
 
     # Get records that haven't been backed up yet
-    main_conn = sqlite3.connect(db_file)
+    main_conn = _connect(db_file)
     main_conn.row_factory = sqlite3.Row
     main_cur = main_conn.cursor()
 
@@ -727,7 +1723,7 @@ def backup_cooler_logs(db_file, coolerlog_dir=None):
         return 0
 
     # Insert into cooler log database
-    cooler_conn = sqlite3.connect(coolerlog_db_file)
+    cooler_conn = _connect(coolerlog_db_file)
     cooler_cur = cooler_conn.cursor()
 
     now = datetime.now().isoformat()
@@ -0,0 +1,153 @@
+"""
+Streaming CSV / NDJSON export of farm data
+Rows are read from an open cursor in batches and written out chunk by chunk,
+so memory use stays flat no matter how much history is exported.
+"""
+import csv
+import io
+import json
+import pathlib
+from datetime import datetime
+
+from server.config import get_coolerlog_dir
+from server.database_helper import _connect
+
+# dataset name -> (table, date column, lives in the cooler backup DB)
+DATASETS = {
+    'user': ('Daily_User_Log', 'date', False),
+    'bot': ('Daily_Bot_Log', 'date', False),
+    'pallet': ('Pallet_Log', 'thedate', False),
+    'cooler': ('Cooler_Log', 'date', True),
+}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+BATCH_SIZE = 500
+
+
+def _validate_date(value, name):
+    if value is None or value == "":
+        return None
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value} (expected YYYY-MM-DD)")
+    return value
+
+
+def get_coolerlog_db_file(coolerlog_dir=None):
+    """Path of the cooler log backup database"""
+    return pathlib.Path(coolerlog_dir or get_coolerlog_dir()) / "coolerlog.db"
+
+
+def export_filename(dataset, fmt, start_date=None, end_date=None):
+    """Suggested download filename, e.g. bot_2024-01-01_to_2024-03-31.csv"""
+    parts = [dataset]
+    if start_date or end_date:
+        parts.append(f"{start_date or 'start'}_to_{end_date or 'end'}")
+    return "_".join(parts) + f".{fmt}"
+
+
+def iter_rows(db_file, dataset, start_date=None, end_date=None, columns=None,
+              coolerlog_dir=None, batch_size=BATCH_SIZE):
+    """Validate an export and return (column names, row generator)
+
+    Validation happens before this returns, so callers can report bad input
+    (unknown dataset or column, malformed date) before streaming starts.
+    The generator holds the connection open and closes it when exhausted or
+    closed. Rows are tuples ordered like the returned column names.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset} (choose from {', '.join(DATASETS)})")
+    table, date_column, in_cooler_db = DATASETS[dataset]
+    start_date = _validate_date(start_date, "start_date")
+    end_date = _validate_date(end_date, "end_date")
+
+    if in_cooler_db:
+        db_file = get_coolerlog_db_file(coolerlog_dir)
+        if not db_file.exists():
+            raise FileNotFoundError(f"Cooler log database not found: {db_file}")
+
+    conn = _connect(db_file)
+    try:
+        available = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if columns:
+            unknown = [c for c in columns if c not in available]
+            if unknown:
+                raise ValueError(f"Unknown column(s) for {dataset}: {', '.join(unknown)}")
+            selected = list(columns)
+        else:
+            selected = available
+
+        where = []
+        params = []
+        if start_date:
+            where.append(f"{date_column} >= ?")
+            params.append(start_date)
+        if end_date:
+            where.append(f"{date_column} <= ?")
+            params.append(end_date)
+        query = f"SELECT {', '.join(selected)} FROM {table}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" ORDER BY {date_column} ASC, id ASC"
+
+        cur = conn.execute(query, params)
+    except Exception:
+        conn.close()
+        raise
+
+    def rows():
+        try:
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            conn.close()
+
+    return selected, rows()
+
+
+def stream_csv(columns, rows, batch_size=BATCH_SIZE):
+    """Yield CSV text chunks: a header line, then up to batch_size rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def stream_ndjson(columns, rows, batch_size=BATCH_SIZE):
+    """Yield NDJSON text chunks, one JSON object per row"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row))))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def stream_export(db_file, dataset, fmt='csv', start_date=None, end_date=None, columns=None,
+                  coolerlog_dir=None):
+    """Validate an export and return a generator of text chunks in the given format"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (choose from {', '.join(FORMATS)})")
+    selected, rows = iter_rows(db_file, dataset, start_date, end_date, columns, coolerlog_dir)
+    if fmt == 'csv':
+        return stream_csv(selected, rows)
+    return stream_ndjson(selected, rows)
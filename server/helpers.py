@@ -1,7 +1,8 @@
 import json
 import os
+import threading
 from datetime import datetime, timedelta, date
-from server.config import load_config
+from server.config import load_config, get_config_generation
 
 def check_all_settings_there(config):
     LOGIN_URL = "https://vitalfarms.poultrycloud.com/login"  # confirm this
@@ -14,16 +15,94 @@ def check_all_settings_there(config):
         raise SystemExit("Set Unitas_Username and Unitas_Password in config!")
 
 
+class FlockCalendar:
+    """Bird age arithmetic for one flock, built from its hatch date
+
+    Ages are whole days since hatch, shown as "week.day" (e.g. "22.3").
+    All lookups are O(1) date arithmetic; ages_for_range() and annotate()
+    label whole date ranges or row lists in one pass.
+    """
+
+    def __init__(self, hatch_date):
+        if isinstance(hatch_date, str):
+            hatch_date = datetime.strptime(hatch_date, "%Y-%m-%d").date()
+        self.hatch_date = hatch_date
+        self._hatch_ordinal = hatch_date.toordinal()
+
+    @staticmethod
+    def _to_date(target_date):
+        if target_date is None:
+            return date.today()
+        if isinstance(target_date, str):
+            return datetime.strptime(target_date[:10], "%Y-%m-%d").date()
+        if isinstance(target_date, datetime):
+            return target_date.date()
+        return target_date
+
+    def age_days(self, target_date=None):
+        """Days since hatch (negative before hatch)"""
+        return self._to_date(target_date).toordinal() - self._hatch_ordinal
+
+    def age_week(self, target_date=None):
+        """Bird-age week (days since hatch // 7)"""
+        return self.age_days(target_date) // 7
+
+    def age(self, target_date=None):
+        """Bird age in "week.day" format"""
+        days = self.age_days(target_date)
+        return f"{days // 7}.{days % 7}"
+
+    def ages_for_range(self, start_date, end_date):
+        """Return [(YYYY-MM-DD, "week.day"), ...] for every day from start_date to end_date inclusive"""
+        start = self._to_date(start_date).toordinal()
+        end = self._to_date(end_date).toordinal()
+        return [
+            (date.fromordinal(ordinal).isoformat(), f"{(ordinal - self._hatch_ordinal) // 7}.{(ordinal - self._hatch_ordinal) % 7}")
+            for ordinal in range(start, end + 1)
+        ]
+
+    def annotate(self, rows, date_key="date", age_key="bird_age"):
+        """Set rows[i][age_key] from rows[i][date_key] in place (rows without a valid date are skipped)"""
+        for row in rows:
+            value = row.get(date_key)
+            if not value:
+                continue
+            try:
+                row[age_key] = self.age(value)
+            except (TypeError, ValueError):
+                continue
+        return rows
+
+
+# Rebuilt only when the config changes, so age lookups don't touch the config file
+_calendar_lock = threading.Lock()
+_calendar = None
+_calendar_generation = None
+
+
+def get_flock_calendar():
+    """Return the FlockCalendar for the configured hatch_date
+
+    Raises ValueError if hatch_date is missing or malformed.
+    """
+    global _calendar, _calendar_generation
+    generation = get_config_generation()
+    with _calendar_lock:
+        if _calendar is None or generation != _calendar_generation:
+            hatch_date = load_config()["farm"].get("hatch_date")
+            if not hatch_date:
+                raise ValueError("Failed to load hatch_date from config: hatch_date not found in config")
+            try:
+                _calendar = FlockCalendar(hatch_date)
+            except ValueError as e:
+                raise ValueError(f"Invalid hatch_date in config: {e}")
+            _calendar_generation = generation
+        return _calendar
+
+
 def get_hatch_date():
     """Read hatch_date from config."""
-    try:
-        config = load_config()
-        hatch_date = config["farm"].get("hatch_date")
-        if not hatch_date:
-            raise ValueError("hatch_date not found in config")
-        return hatch_date
-    except Exception as e:
-        raise ValueError(f"Failed to load hatch_date from config: {e}")
+    return get_flock_calendar().hatch_date.isoformat()
 
 def get_bird_age(target_date=None):
     """Calculate bird age in week.day format.
@@ -37,14 +116,4 @@ def get_bird_age(target_date=None):
     Returns:
         str: Bird age in "week.day" format (e.g., "22.3")
     """
-    if target_date is None:
-        target_date = date.today()
-    elif isinstance(target_date, str):
-        target_date = datetime.strptime(target_date, "%Y-%m-%d").date()
-
-    hatch_date_str = get_hatch_date()
-    hatch_date = datetime.strptime(hatch_date_str, "%Y-%m-%d").date()
-    days_diff = (target_date - hatch_date).days
-    week = days_diff // 7
-    day = days_diff % 7
-    return f"{week}.{day}"
+    return get_flock_calendar().age(target_date)
@@ -0,0 +1,249 @@
+"""
+Lightweight request/DB/outbound-call metrics in Prometheus text format
+
+Disabled by default. Enable with the DATALOGGER_METRICS=1 environment variable
+or "system": {"metrics_enabled": true} in config.json. When disabled every
+hook returns immediately, so instrumented code paths cost one attribute check.
+
+Metrics are per process: under Apache mod_wsgi with several processes each
+process reports its own numbers.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get('DATALOGGER_METRICS', '').lower() in ('1', 'true', 'yes')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def configure(enabled):
+    """Turn metrics collection on or off for this process"""
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class Histogram:
+    """Cumulative histogram with a fixed label set"""
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            for label_values, series in items:
+                for i, bound in enumerate(self.buckets):
+                    labels = _format_labels(self.label_names, label_values, ("le", repr(float(bound))))
+                    lines.append(f"{self.name}_bucket{labels} {series[i]}")
+                labels = _format_labels(self.label_names, label_values, ("le", "+Inf"))
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {series[-2]}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with a fixed label set"""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "datalogger_http_request_duration_seconds",
+    "HTTP request latency by endpoint",
+    ("method", "endpoint", "status"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "datalogger_http_request_db_queries",
+    "Number of SQLite statements executed per HTTP request",
+    ("endpoint",),
+    buckets=COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "datalogger_http_request_db_seconds",
+    "Total SQLite time per HTTP request",
+    ("endpoint",),
+)
+DB_QUERY_LATENCY = Histogram(
+    "datalogger_db_query_duration_seconds",
+    "SQLite statement latency",
+    buckets=QUERY_BUCKETS,
+)
+OUTBOUND_LATENCY = Histogram(
+    "datalogger_outbound_call_duration_seconds",
+    "Latency of calls to external services (NWS, systemctl)",
+    ("target", "outcome"),
+)
+REQUEST_ERRORS = Counter(
+    "datalogger_http_request_exceptions_total",
+    "Unhandled exceptions raised by HTTP handlers",
+    ("endpoint",),
+)
+
+ALL_METRICS = [REQUEST_LATENCY, REQUEST_DB_QUERIES, REQUEST_DB_TIME, DB_QUERY_LATENCY, OUTBOUND_LATENCY, REQUEST_ERRORS]
+
+
+# ─── Per-request accounting ───
+_local = threading.local()
+
+
+def begin_request():
+    """Start accounting for the request handled by the current thread"""
+    if not ENABLED:
+        return
+    _local.started = time.perf_counter()
+    _local.db_queries = 0
+    _local.db_seconds = 0.0
+
+
+def end_request(method, endpoint, status):
+    """Record latency and DB usage for the request handled by the current thread"""
+    if not ENABLED:
+        return
+    started = getattr(_local, 'started', None)
+    if started is None:
+        return
+    REQUEST_LATENCY.observe(time.perf_counter() - started, method, endpoint, str(status))
+    REQUEST_DB_QUERIES.observe(_local.db_queries, endpoint)
+    REQUEST_DB_TIME.observe(_local.db_seconds, endpoint)
+    _local.started = None
+
+
+def record_exception(endpoint):
+    if ENABLED:
+        REQUEST_ERRORS.inc(endpoint)
+
+
+def record_db_query(seconds):
+    DB_QUERY_LATENCY.observe(seconds)
+    if getattr(_local, 'started', None) is not None:
+        _local.db_queries += 1
+        _local.db_seconds += seconds
+
+
+@contextmanager
+def time_outbound(target):
+    """Time a call to an external service, e.g. `with time_outbound("nws"): ...`"""
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        OUTBOUND_LATENCY.observe(time.perf_counter() - started, target, outcome)
+
+
+# ─── SQLite instrumentation ───
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports the duration of every statement"""
+
+    def execute(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().execute(*args, **kwargs)
+        finally:
+            record_db_query(time.perf_counter() - started)
+
+    def executemany(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().executemany(*args, **kwargs)
+        finally:
+            record_db_query(time.perf_counter() - started)
+
+    def executescript(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().executescript(*args, **kwargs)
+        finally:
+            record_db_query(time.perf_counter() - started)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors are instrumented
+
+    sqlite3.Connection.execute() and friends make their cursor in C without
+    calling self.cursor(), so they are routed through it here.
+    """
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args, **kwargs):
+        return self.cursor().execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self.cursor().executemany(*args, **kwargs)
+
+    def executescript(self, *args, **kwargs):
+        return self.cursor().executescript(*args, **kwargs)
+
+
+def connection_factory():
+    """Return the sqlite3 connection class to use, or None when metrics are off"""
+    return InstrumentedConnection if ENABLED else None
+
+
+def render():
+    """Render all metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,201 @@
+"""
+Cached systemd service status
+Fetches the state of all watched units with a single `systemctl show` call and
+caches it for a short TTL, so refreshing the Advanced tab doesn't fork one
+systemctl per service per request.
+"""
+import subprocess
+import threading
+import time
+
+from server import metrics
+
+PROPERTIES = "Id,ActiveState,SubState"
+
+
+class SubprocessBackend:
+    """Runs systemctl for real"""
+
+    def run(self, args, timeout):
+        """Run a command and return (returncode, stdout, stderr)"""
+        result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+        return result.returncode, result.stdout, result.stderr
+
+
+class FakeBackend:
+    """In-memory stand-in for systemctl, for tests and development machines
+
+    states maps unit name (e.g. "datalogger.service") to a dict with
+    ActiveState/SubState. Every call is recorded in .calls.
+    """
+
+    def __init__(self, states=None, delay=0.0):
+        self.states = dict(states or {})
+        self.delay = delay
+        self.calls = []
+
+    def set_state(self, unit, active_state, sub_state):
+        self.states[unit] = {"ActiveState": active_state, "SubState": sub_state}
+
+    def run(self, args, timeout):
+        self.calls.append(list(args))
+        if self.delay:
+            if self.delay > timeout:
+                raise subprocess.TimeoutExpired(args, timeout)
+            time.sleep(self.delay)
+        units = [a for a in args[2:] if not a.startswith("--")]
+        blocks = []
+        for unit in units:
+            state = self.states.get(unit, {"ActiveState": "inactive", "SubState": "dead"})
+            blocks.append(f"Id={unit}\nActiveState={state['ActiveState']}\nSubState={state['SubState']}")
+        return 0, "\n\n".join(blocks) + "\n", ""
+
+
+def parse_systemctl_show(output, units):
+    """Parse multi-unit `systemctl show` output into {unit: {'active', 'sub_state'}}
+
+    Units are separated by blank lines; the Id property identifies each block,
+    falling back to the order in which the units were requested.
+    """
+    statuses = {}
+    blocks = [b for b in output.strip().split("\n\n") if b.strip()]
+    for index, block in enumerate(blocks):
+        props = {}
+        for line in block.strip().split("\n"):
+            if "=" in line:
+                key, value = line.split("=", 1)
+                props[key] = value
+        unit = props.get("Id") or (units[index] if index < len(units) else None)
+        if unit is None:
+            continue
+        status = {}
+        if "ActiveState" in props:
+            status["active"] = props["ActiveState"]
+        if "SubState" in props:
+            status["sub_state"] = props["SubState"]
+        statuses[unit] = status
+    return statuses
+
+
+class ServiceStatusProvider:
+    """Short-TTL cache of systemd unit states with optional change notifications
+
+    get_status() returns the cached states while they are fresh. When they
+    expire, one caller refreshes them; concurrent callers get the previous
+    states instead of queueing behind a slow systemctl.
+    """
+
+    def __init__(self, services, backend=None, ttl=5.0, timeout=5):
+        self.services = list(services)
+        self.backend = backend or SubprocessBackend()
+        self.ttl = ttl
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._statuses = None
+        self._fetched_at = 0.0
+        self._subscribers = []
+        self._watch_stop = None
+        self._watch_thread = None
+
+    def _units(self):
+        return [f"{name}.service" for name in self.services]
+
+    def _fetch(self):
+        units = self._units()
+        with metrics.time_outbound("systemctl"):
+            returncode, stdout, stderr = self.backend.run(
+                ["systemctl", "show", *units, f"--property={PROPERTIES}"], self.timeout
+            )
+        if returncode != 0:
+            raise RuntimeError(f"systemctl show failed: {stderr.strip()}")
+        by_unit = parse_systemctl_show(stdout, units)
+        return {name: by_unit.get(f"{name}.service", {}) for name in self.services}
+
+    def refresh(self):
+        """Fetch fresh states now, notify subscribers of changes and return them"""
+        with self._refresh_lock:
+            statuses = self._fetch()
+            with self._lock:
+                previous = self._statuses
+                self._statuses = statuses
+                self._fetched_at = time.monotonic()
+                subscribers = list(self._subscribers)
+        if previous is not None:
+            for name, status in statuses.items():
+                if previous.get(name) != status:
+                    for callback in subscribers:
+                        try:
+                            callback(name, previous.get(name), status)
+                        except Exception as e:
+                            print(f"[ServiceStatus] Subscriber error: {e}")
+        return statuses
+
+    def get_status(self):
+        """Return {service: {'active', 'sub_state'}}, from cache when fresh"""
+        with self._lock:
+            statuses = self._statuses
+            fresh = statuses is not None and time.monotonic() - self._fetched_at < self.ttl
+        if fresh:
+            return dict(statuses)
+
+        # Someone else is already refreshing: serve what we have rather than wait
+        if statuses is not None and self._refresh_lock.locked():
+            return dict(statuses)
+
+        try:
+            return dict(self.refresh())
+        except Exception:
+            if statuses is not None:
+                return dict(statuses)
+            raise
+
+    def invalidate(self):
+        """Force the next get_status() to query systemd (e.g. after start/stop)"""
+        with self._lock:
+            self._fetched_at = 0.0
+
+    # ─── Change notifications ───
+    def subscribe(self, callback):
+        """Call callback(service, old_status, new_status) when a refresh sees a change
+
+        Returns a function that removes the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def start_watching(self, interval=10.0):
+        """Poll systemd in a background thread so subscribers hear about changes"""
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+        stop = threading.Event()
+
+        def watch():
+            while not stop.is_set():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"[ServiceStatus] Refresh failed: {e}")
+                stop.wait(interval)
+
+        self._watch_stop = stop
+        self._watch_thread = threading.Thread(target=watch, name="service-status-watcher", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+
+
+# Services the web app shows and controls on the Advanced tab
+MANAGED_SERVICES = ['datalogger', 'xml-watcher']
+
+# Process-wide instance used by the web app
+service_status_provider = ServiceStatusProvider(MANAGED_SERVICES)
@@ -0,0 +1,130 @@
+"""
+House routing for the web app
+One web process can serve several houses (or farms). Each house has its own
+config directory - config.json and database - listed in the main config:
+
+    "houses": {"house2": "/var/lib/datalogger/houses/house2"}
+
+The main config itself is the default house. Houses are opened lazily on
+first request and kept in a small LRU (system.max_open_houses), so startup
+cost and memory do not grow with the number of houses: an idle house costs
+nothing until a tablet asks for it. Database connections stay per call, as
+everywhere else; what is cached per house is its parsed config, database
+path, "schema already migrated" state and flock calendar.
+
+Routing covers the web app only: automation.py (XML import, Unitas uploads)
+runs for the default house alone.
+"""
+import pathlib
+import threading
+from collections import OrderedDict
+
+from server.config import ConfigFile, default_config_file, get_database_path, load_config
+from server.helpers import FlockCalendar
+import database_helper as db
+
+DEFAULT_HOUSE = "default"
+
+
+class House:
+    """Config, database and flock calendar of one house"""
+
+    def __init__(self, name, config_dir, config_file=None):
+        self.name = name
+        self.config_dir = pathlib.Path(config_dir)
+        self.config_file = config_file or ConfigFile(self.config_dir)
+        # Reentrant: setup_db() may ask for the flock calendar while db_file holds it
+        self._lock = threading.RLock()
+        self._db_file = None
+        self._calendar = None
+        self._calendar_generation = None
+
+    def load_config(self):
+        return self.config_file.load()
+
+    def save_config(self, config):
+        self.config_file.save(config)
+
+    @property
+    def db_file(self):
+        """Database path for this house, created and migrated on first use"""
+        path = pathlib.Path(get_database_path(self.load_config()))
+        with self._lock:
+            if path != self._db_file:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if self.name != DEFAULT_HOUSE:
+                    if self._db_file is not None:
+                        db.unregister_flock_calendar(self._db_file)
+                    db.register_flock_calendar(path, self.flock_calendar)
+                db.setup_db(path)
+                self._db_file = path
+        return path
+
+    def close(self):
+        """Forget this house's database registration (called when it is evicted)"""
+        with self._lock:
+            if self._db_file is not None and self.name != DEFAULT_HOUSE:
+                db.unregister_flock_calendar(self._db_file)
+            self._db_file = None
+
+    def flock_calendar(self):
+        """FlockCalendar for this house's hatch_date, rebuilt only when its config changes"""
+        generation = self.config_file.generation()
+        with self._lock:
+            if self._calendar is None or generation != self._calendar_generation:
+                hatch_date = self.config_file.load()["farm"].get("hatch_date")
+                if not hatch_date:
+                    raise ValueError(f"hatch_date not found in config for house {self.name}")
+                try:
+                    self._calendar = FlockCalendar(hatch_date)
+                except ValueError as e:
+                    raise ValueError(f"Invalid hatch_date in config for house {self.name}: {e}")
+                self._calendar_generation = generation
+            return self._calendar
+
+
+class HouseRegistry:
+    """Bounded LRU of open houses, keyed by name
+
+    The default house (the main config) is always open and never evicted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._houses = OrderedDict()
+        # Shares the module-level config cache used by load_config()/save_config()
+        self.default = House(DEFAULT_HOUSE, default_config_file.config_dir, default_config_file)
+
+    def names(self):
+        """Configured house names, default first"""
+        return [DEFAULT_HOUSE] + sorted(load_config().get("houses", {}))
+
+    def get(self, name=None):
+        """Return the House for name (None = default)
+
+        Raises KeyError for houses that are not configured.
+        """
+        if not name or name == DEFAULT_HOUSE:
+            return self.default
+        config = load_config()
+        houses = config.get("houses", {})
+        if name not in houses:
+            raise KeyError(name)
+        config_dir = pathlib.Path(houses[name])
+
+        with self._lock:
+            house = self._houses.get(name)
+            if house is not None and house.config_dir == config_dir:
+                self._houses.move_to_end(name)
+                return house
+            house = House(name, config_dir)
+            self._houses[name] = house
+            limit = max(1, int(config["system"].get("max_open_houses", 8)))
+            while len(self._houses) > limit:
+                evicted, evicted_house = self._houses.popitem(last=False)
+                evicted_house.close()
+                print(f"[Houses] Closed idle house {evicted}")
+            return house
+
+
+house_registry = HouseRegistry()
@@ -0,0 +1,202 @@
+"""
+Unitas client interface
+The upload jobs only need four things from Unitas, behind one interface:
+
+    with client:
+        statuses = client.daily_statuses(["2025-10-03", "2025-10-04"])
+        client.submit_production("2025-10-04", production_values)
+        client.submit_coolerlog("2025-10-04", coolerlog_values)
+
+SeleniumUnitasClient drives Firefox through the Unitas web pages - the
+original implementation, and the only one for real uploads.
+UnitasHttpClient (unitas_http.py) is experimental: it sends the same data to
+JSON endpoints that have not been checked against the live site yet, and is
+meant for development against benchmarks/mock_unitas.py. Setting
+"client": "http" under unitas in config.json (not one of the documented
+settings) selects it, with Selenium retrying anything it can't do.
+"""
+from abc import ABC, abstractmethod
+
+from selenium.webdriver.common.by import By
+
+import unitas_waits as waits
+
+
+class UnitasClientError(Exception):
+    """Unitas refused or didn't understand a request"""
+
+
+class UnitasClient(ABC):
+    """Base class; subclasses implement the three operations"""
+
+    name = "unitas"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    @abstractmethod
+    def daily_statuses(self, dates):
+        """Return {date: "Complete" | "Overdue" | "Unknown" | "Not Found"} for YYYY-MM-DD dates"""
+
+    @abstractmethod
+    def submit_production(self, date_str, values, previous=None):
+        """
+        Fill the daily production form; values are fill_production_form()'s keyword arguments.
+        previous is the snapshot of the last submission for the date (None = send everything);
+        when given, only the fields that differ from it need to be sent.
+
+        Returns True when Unitas confirmed the form as saved, False when it was
+        filled and left open for a person to look over and Save.
+        """
+
+    @abstractmethod
+    def submit_coolerlog(self, date_str, values):
+        """Submit the cooler log; values are [row, date] as built by coolerlog_values()"""
+
+
+class SeleniumUnitasClient(UnitasClient):
+    """Fills the Unitas web pages in a browser borrowed from a UnitasSession
+
+    With unitas.auto_save (always, in a headless browser nobody can look at)
+    a filled production form is saved and must be confirmed by Unitas.
+    Otherwise the browser holding it is handed over to the person - detached
+    from the session, so it is neither reused nor closed - and the next date
+    gets a browser of its own.
+    """
+
+    name = "selenium"
+
+    def __init__(self, secrets, session):
+        # Imported here: both modules import this one
+        import unitas_production
+        import unitas_coolerlog
+        self.production = unitas_production
+        self.coolerlog = unitas_coolerlog
+        self.production.do_unitas_setup(secrets)
+        self.coolerlog.do_coolerlog_setup(secrets)
+        self.session = session
+        self.auto_save = bool(secrets.get("Unitas_Auto_Save")) or session.headless
+
+    def __enter__(self):
+        self.session.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self.session.__exit__(exc_type, exc, tb)
+
+    @property
+    def driver(self):
+        # A new browser after the last one was handed over with a form to review
+        return self.session.driver()
+
+    def _open_production_page(self, driver):
+        self.production.open_production_page(driver, self.production.FARM_ID, self.production.HOUSE_ID)
+
+    def daily_statuses(self, dates):
+        driver = self.driver
+        self._open_production_page(driver)
+        return self.production.check_dates_status(driver, dates)
+
+    def submit_production(self, date_str, values, previous=None):
+        production = self.production
+        driver = self.driver
+        try:
+            # The list stays up while a form is open; reopen it only after a navigation away
+            if not driver.find_elements(By.CSS_SELECTOR, "[data-cy='title']"):
+                self._open_production_page(driver)
+            production.get_form_by_date(driver, production.TIMEOUT, date_str)
+            production.fill_production_form(driver, previous=previous, **values)
+
+            # Scroll back to top and let the form's own requests finish
+            waits.scroll_into_view(driver, driver.find_element(By.ID, "V33-H1"))
+            waits.network_settled(driver)
+
+            if self.auto_save:
+                production.save_production_form(driver)
+                return True
+        except Exception:
+            # Leave the browser on the production list for the next date
+            try:
+                self._open_production_page(driver)
+            except Exception:
+                print("Warning: Could not return to production page")
+            raise
+
+        # Leave this window for a person to look over and Save
+        self.session.detach()
+        return False
+
+    def submit_coolerlog(self, date_str, values):
+        driver = self.driver
+        self.coolerlog.open_coolerlog_page(driver)
+        self.coolerlog.fill_coolerlog_values(driver, values)
+
+
+class FallbackUnitasClient(UnitasClient):
+    """Use primary; once it fails with UnitasClientError, switch to the fallback for the rest of the run"""
+
+    def __init__(self, primary, make_fallback):
+        self.primary = primary
+        self.make_fallback = make_fallback
+        self.fallback = None
+        self._entered = False
+
+    @property
+    def name(self):
+        return self.fallback.name if self.fallback else self.primary.name
+
+    def __enter__(self):
+        self.primary.__enter__()
+        self._entered = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._entered = False
+        try:
+            if self.fallback is not None:
+                self.fallback.__exit__(exc_type, exc, tb)
+        finally:
+            self.primary.__exit__(exc_type, exc, tb)
+        return False
+
+    def _call(self, method, *args):
+        if self.fallback is None:
+            try:
+                return getattr(self.primary, method)(*args)
+            except UnitasClientError as e:
+                print(f"[Unitas] {self.primary.name} client failed ({e}); falling back to Selenium")
+                self.fallback = self.make_fallback()
+                if self._entered:
+                    self.fallback.__enter__()
+        return getattr(self.fallback, method)(*args)
+
+    def daily_statuses(self, dates):
+        return self._call("daily_statuses", dates)
+
+    def submit_production(self, date_str, values, previous=None):
+        return self._call("submit_production", date_str, values, previous)
+
+    def submit_coolerlog(self, date_str, values):
+        return self._call("submit_coolerlog", date_str, values)
+
+
+def make_unitas_client(secrets, session):
+    """Client selected by unitas.client ("selenium" or "http"), with Selenium as the fallback"""
+    kind = (secrets.get("Unitas_Client") or "selenium").lower()
+    if kind == "http":
+        from unitas_http import UnitasHttpClient, is_production_host, DEFAULT_BASE_URL
+        if is_production_host(secrets.get("Unitas_Base_URL") or DEFAULT_BASE_URL):
+            print("[Unitas] The experimental HTTP client only runs against a test server "
+                  "(unitas.base_url), using selenium")
+            return SeleniumUnitasClient(secrets, session)
+        print("[Unitas] Using the experimental HTTP client (endpoints not verified against Unitas)")
+        return FallbackUnitasClient(
+            UnitasHttpClient(secrets),
+            lambda: SeleniumUnitasClient(secrets, session),
+        )
+    if kind != "selenium":
+        print(f"Unknown unitas.client '{kind}', using selenium")
+    return SeleniumUnitasClient(secrets, session)
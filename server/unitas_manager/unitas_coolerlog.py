@@ -1,13 +1,12 @@
-from unitas_login import login
-from webdriver_manager.firefox import GeckoDriverManager
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
+from unitas_session import UnitasSession
+from unitas_client import make_unitas_client
+from unitas_login import base_url
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from datetime import date, timedelta, datetime
 import unitas_helper as helper
-import time
+import unitas_waits as waits
 import database_helper as db
 
 FARM_ID = None
@@ -25,20 +24,11 @@ def do_coolerlog_setup(secrets, db_file=None):
     HOUSE_ID = secrets["House_ID"]
     TIMEOUT = secrets["Timeout"]
     INITIALS = secrets["Cooler_Log_Initials"]
-    COOLERLOG_URL = f"https://vitalfarms.poultrycloud.com/farm/coolerlog/coolerlog/new?farmId={FARM_ID}&houseId={HOUSE_ID}"
+    COOLERLOG_URL = f"{base_url(secrets)}/farm/coolerlog/coolerlog/new?farmId={FARM_ID}&houseId={HOUSE_ID}"
     SECRETS = secrets
     if db_file:
         DB_FILE = db_file
 
-def make_driver(headless: bool = False):
-    options = webdriver.FirefoxOptions()
-    if headless:
-        options.add_argument("--headless")
-    # GeckoDriverManager caches driver automatically
-    return webdriver.Firefox(
-        service=Service(GeckoDriverManager().install()),
-        options=options
-    )
 def open_coolerlog_page(driver):
     driver.get(COOLERLOG_URL)
 
@@ -47,34 +37,26 @@ def fill_coolerlog_values(driver, data):
     def pick_date(driver, date_picker_button, target_date: date):
         # 1. Open the date picker by clicking the button
         date_picker_button.click()
-        time.sleep(0.5)  # let popup render
 
-        # 2. Select month using dropdown
-        month_dropdown = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "select.rdp-months_dropdown"))
-        )
+        # 2. Select month using dropdown once the popup has rendered it
         from selenium.webdriver.support.ui import Select
-        select_month = Select(month_dropdown)
-        select_month.select_by_value(str(target_date.month - 1))  # Month is 0-indexed in dropdown
-        time.sleep(0.3)
+        month_locator = (By.CSS_SELECTOR, "select.rdp-months_dropdown")
+        month_dropdown = waits.dropdown_rendered(driver, month_locator, timeout=10)
+        Select(month_dropdown).select_by_value(str(target_date.month - 1))  # Month is 0-indexed in dropdown
 
         # 3. Select year using dropdown
-        year_dropdown = driver.find_element(By.CSS_SELECTOR, "select.rdp-years_dropdown")
-        select_year = Select(year_dropdown)
-        select_year.select_by_value(str(target_date.year))
-        time.sleep(0.3)
+        year_locator = (By.CSS_SELECTOR, "select.rdp-years_dropdown")
+        year_dropdown = waits.option_available(driver, year_locator, str(target_date.year), timeout=10)
+        Select(year_dropdown).select_by_value(str(target_date.year))
 
-        # 4. Click the day button - data-day format is "M/D/YYYY"
+        # 4. Click the day button - data-day format is "M/D/YYYY"; it only
+        # exists once the calendar has re-rendered for the chosen month/year
         day_selector = f"button[data-day='{target_date.month}/{target_date.day}/{target_date.year}']"
         day_button = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.CSS_SELECTOR, day_selector))
         )
         day_button.click()
-        time.sleep(0.3)
-
-
-
-    
+        waits.gone(driver, month_locator, timeout=10)
 
     # wait until the date picker button is present and clickable
     date_picker_button = WebDriverWait(driver, 10).until(
@@ -125,20 +107,73 @@ def fill_coolerlog_values(driver, data):
 
 
 
-    # wait for the Save button to be clickable
-    save_btn = driver.find_element(By.XPATH, ".//button[normalize-space()='Save']")
+    # wait for the form to finish validating/talking to the server and Save to be clickable
+    waits.network_settled(driver)
+    save_btn = WebDriverWait(driver, TIMEOUT).until(
+        EC.element_to_be_clickable((By.XPATH, ".//button[normalize-space()='Save']"))
+    )
+    if not waits.click_save(driver, save_btn):
+        raise RuntimeError("Unitas did not confirm the cooler log save")
+
+
+def coolerlog_values(db_file, upload_date):
+    """
+    The cooler log form's values for a date as [data_row, date_object], or None
+    when there is no bot log for it
+    """
+    # Get bot log data for this date
+    bot_log = db.get_daily_bot_log(db_file, upload_date)
+    if not bot_log:
+        return None
+
+    # Get user log for eggs_picked_up and comments
+    user_log = db.get_daily_user_log(db_file, upload_date)
+
+    # Format data for coolerlog form
+    cooler_time_am = bot_log.get('cooler_time_am', '')
+    cooler_temp_am = bot_log.get('cooler_temp_am', '')
+    cooler_time_pm = bot_log.get('cooler_time_pm', '')
+    cooler_temp_pm = bot_log.get('cooler_temp_pm', '')
+
+    # Parse time strings (format: "HH:MM:SS" or "HH:MM")
+    am_hour, am_minute = '', ''
+    if cooler_time_am:
+        parts = str(cooler_time_am).split(':')
+        am_hour = parts[0] if len(parts) > 0 else ''
+        am_minute = parts[1] if len(parts) > 1 else ''
+
+    pm_hour, pm_minute = '', ''
+    if cooler_time_pm:
+        parts = str(cooler_time_pm).split(':')
+        pm_hour = parts[0] if len(parts) > 0 else ''
+        pm_minute = parts[1] if len(parts) > 1 else ''
 
-    time.sleep(4)
-    save_btn.click()
+    eggs_picked_up = user_log.get('eggs_picked_up', '') if user_log else ''
+    comments = user_log.get('coolerlog_comments', '') if user_log else ''
 
+    # Round temperatures to integers for Unitas form
+    temp_am_str = str(round(cooler_temp_am)) if cooler_temp_am else ''
+    temp_pm_str = str(round(cooler_temp_pm)) if cooler_temp_pm else ''
 
-def run_coolerlog_to_unitas(db_file=None, target_date=None):
+    # Convert upload_date string to date object for date picker
+    date_obj = datetime.strptime(upload_date, '%Y-%m-%d').date()
+
+    # valuesToSend: [data_row, date_object]
+    return [[am_hour, am_minute, temp_am_str, pm_hour, pm_minute, temp_pm_str, str(eggs_picked_up), comments], date_obj]
+
+
+def run_coolerlog_to_unitas(db_file=None, target_date=None, session=None, client=None):
     """
     Send cooler log data to Unitas from database
 
     Args:
         db_file: Path to database file (uses global DB_FILE if None)
         target_date: Specific date to upload (YYYY-MM-DD format), or None to upload all pending dates
+        session: Shared UnitasSession to run in (None = a browser of its own, quit afterwards)
+        client: UnitasClient to upload through (None = the one unitas.client selects, on top of session)
+
+    Returns:
+        (dates uploaded, {date: error} for the dates that failed)
     """
     if db_file is None:
         db_file = DB_FILE
@@ -155,18 +190,19 @@ def run_coolerlog_to_unitas(db_file=None, target_date=None):
             print("="*60)
             print("No dates pending coolerlog upload. All caught up!")
             print("="*60)
-            return
+            return [], {}
         print(f"Found {len(dates_to_upload)} date(s) pending coolerlog upload: {dates_to_upload}")
 
-    # Now that we know we have work to do, start the browser and login
-    driver = make_driver(False)
-
-    try:
-        login(driver, SECRETS)
+    # Now that we know we have work to do, get a client (Selenium logs in here)
+    if session is None:
+        session = UnitasSession(SECRETS, headless=False, idle_timeout=0)
+    if client is None:
+        client = make_unitas_client(SECRETS, session)
 
+    with client:
         # Upload each date
         successful_uploads = []
-        failed_uploads = []
+        failed_uploads = {}  # date -> error
 
         for upload_date in dates_to_upload:
             print(f"\n{'='*60}")
@@ -174,54 +210,19 @@ def run_coolerlog_to_unitas(db_file=None, target_date=None):
             print(f"{'='*60}")
 
             try:
-                # Get bot log data for this date
-                bot_log = db.get_daily_bot_log(db_file, upload_date)
-                if not bot_log:
+                valuesToSend = coolerlog_values(db_file, upload_date)
+                if valuesToSend is None:
                     print(f"No bot log data found for {upload_date}, skipping")
-                    failed_uploads.append(upload_date)
+                    failed_uploads[upload_date] = "no bot log data"
                     continue
 
-                # Get user log for eggs_picked_up and comments
-                user_log = db.get_daily_user_log(db_file, upload_date)
-
-                # Format data for coolerlog form
-                cooler_time_am = bot_log.get('cooler_time_am', '')
-                cooler_temp_am = bot_log.get('cooler_temp_am', '')
-                cooler_time_pm = bot_log.get('cooler_time_pm', '')
-                cooler_temp_pm = bot_log.get('cooler_temp_pm', '')
-
-                # Parse time strings (format: "HH:MM:SS" or "HH:MM")
-                am_hour, am_minute = '', ''
-                if cooler_time_am:
-                    parts = str(cooler_time_am).split(':')
-                    am_hour = parts[0] if len(parts) > 0 else ''
-                    am_minute = parts[1] if len(parts) > 1 else ''
-
-                pm_hour, pm_minute = '', ''
-                if cooler_time_pm:
-                    parts = str(cooler_time_pm).split(':')
-                    pm_hour = parts[0] if len(parts) > 0 else ''
-                    pm_minute = parts[1] if len(parts) > 1 else ''
-
-                eggs_picked_up = user_log.get('eggs_picked_up', '') if user_log else ''
-                comments = user_log.get('coolerlog_comments', '') if user_log else ''
-
-                # Round temperatures to integers for Unitas form
-                temp_am_str = str(round(cooler_temp_am)) if cooler_temp_am else ''
-                temp_pm_str = str(round(cooler_temp_pm)) if cooler_temp_pm else ''
-
-                # Convert upload_date string to date object for date picker
-                from datetime import datetime as dt
-                date_obj = dt.strptime(upload_date, '%Y-%m-%d').date()
-
-                # valuesToSend: [data_row, date_object]
-                valuesToSend = [[am_hour, am_minute, temp_am_str, pm_hour, pm_minute, temp_pm_str, str(eggs_picked_up), comments], date_obj]
-
-                # Open coolerlog page and fill form
-                open_coolerlog_page(driver)
+                # Open the form, fill and save it (or send it, over HTTP)
+                timer = waits.StepTimer(f"coolerlog {upload_date}")
                 print(f"Sending coolerlog data for {upload_date}:")
                 print(valuesToSend[0])  # Print just the data row
-                fill_coolerlog_values(driver, valuesToSend)
+                with timer.step(f"submit ({client.name})"):
+                    client.submit_coolerlog(upload_date, valuesToSend)
+                timer.report()
 
                 # Update database with timestamp
                 db.update_daily_bot_log(db_file, upload_date, {'cooler_logged_at': datetime.now().isoformat()})
@@ -230,7 +231,7 @@ def run_coolerlog_to_unitas(db_file=None, target_date=None):
 
             except Exception as e:
                 print(f"✗ Error uploading coolerlog for {upload_date}: {e}")
-                failed_uploads.append(upload_date)
+                failed_uploads[upload_date] = str(e) or e.__class__.__name__
                 # Continue with next date even if one fails
 
         # Summary
@@ -244,8 +245,4 @@ def run_coolerlog_to_unitas(db_file=None, target_date=None):
         if failed_uploads:
             print(f"  {', '.join(failed_uploads)}")
         print("="*60)
-
-    finally:
-        print("Quitting browser.")
-        driver.quit()
-    
+        return successful_uploads, failed_uploads
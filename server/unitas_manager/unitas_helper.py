@@ -5,6 +5,7 @@ import os
 import re
 from selenium.webdriver.common.by import By
 import database_helper
+import unitas_waits
 
 TIMEOUT = None
 
@@ -31,10 +32,11 @@ def fill_input_by_datacy_and_id(driver, data_cy: str, element_id: str, value):
             ))
         )
 
-        # Scroll element into view to avoid obstruction
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", el)
-        import time
-        time.sleep(0.3)  # Brief pause for smooth scroll to complete
+        # Scroll element into view to avoid obstruction, then wait for it to settle
+        unitas_waits.scroll_into_view(driver, el)
+        el = unitas_waits.element_stable(
+            driver, (By.XPATH, f"//select[@data-cy='{data_cy}' and @id='{element_id}']"), timeout=TIMEOUT
+        )
 
         # Use Select class for proper dropdown selection
         from selenium.webdriver.support.ui import Select
@@ -99,3 +101,141 @@ def fill_multiselect_box(driver, label, items):
 
     # Close the dropdown again
     dropdown.click()
+
+
+# ---------- bulk form fill ----------
+# Sets every field in one execute_script round trip. Values go through the
+# native value setter (so React-style frameworks notice the change) followed
+# by input/change/blur events, as if typed.
+BULK_FILL_SCRIPT = """
+var fields = arguments[0];
+var missing = [];
+function find(f) {
+    if (f.data_cy) {
+        return document.querySelector("select[data-cy='" + f.data_cy + "'][id='" + f.id + "']");
+    }
+    return document.getElementById(f.id);
+}
+for (var i = 0; i < fields.length; i++) {
+    var f = fields[i];
+    var el = find(f);
+    if (!el) { missing.push(f.key); continue; }
+    var value = f.value;
+    var proto = HTMLInputElement.prototype;
+    if (el.tagName === 'TEXTAREA') {
+        proto = HTMLTextAreaElement.prototype;
+    } else if (el.tagName === 'SELECT') {
+        proto = HTMLSelectElement.prototype;
+        // Match on option value first, then visible text (what send_keys picks)
+        var match = null;
+        for (var j = 0; j < el.options.length; j++) {
+            if (el.options[j].value === value) { match = el.options[j]; break; }
+        }
+        for (var j = 0; !match && j < el.options.length; j++) {
+            if (el.options[j].text.trim() === value) { match = el.options[j]; }
+        }
+        if (!match) { missing.push(f.key); continue; }
+        value = match.value;
+    }
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.dispatchEvent(new FocusEvent('blur'));
+}
+return missing;
+"""
+
+READ_FIELDS_SCRIPT = """
+var fields = arguments[0];
+var values = {};
+for (var i = 0; i < fields.length; i++) {
+    var f = fields[i];
+    var el = f.data_cy
+        ? document.querySelector("select[data-cy='" + f.data_cy + "'][id='" + f.id + "']")
+        : document.getElementById(f.id);
+    if (!el) { values[f.key] = null; continue; }
+    if (el.tagName === 'SELECT') {
+        var opt = el.options[el.selectedIndex];
+        values[f.key] = opt ? [opt.value, opt.text.trim()] : null;
+    } else {
+        values[f.key] = [el.value];
+    }
+}
+return values;
+"""
+
+
+def bulk_field(element_id, value, data_cy=None, clear=False):
+    """Field spec for fill_fields_in_bulk(); empty values are skipped like fill_input_by_id()
+
+    clear: keep an empty value as "" so the field is emptied (a correction
+    that removed a value Unitas already has).
+    """
+    if value is None or value == "":
+        if not clear:
+            return None
+        value = ""
+    key = f"{element_id}:{data_cy}" if data_cy else element_id
+    return {"key": key, "id": element_id, "data_cy": data_cy, "value": str(value)}
+
+
+def read_fields(driver, fields):
+    """Current values of fields in one call: {key: [value] or [value, text] for selects, or None}"""
+    return driver.execute_script(READ_FIELDS_SCRIPT, fields)
+
+
+def fill_fields_in_bulk(driver, fields):
+    """Fill fields (from bulk_field()) with one script call, verify with one read
+
+    Fields the page didn't take - missing element, unknown option, a widget that
+    rewrote the value - are retried one by one through the regular helpers.
+    Returns the keys that still don't match afterwards.
+    """
+    fields = [f for f in fields if f]
+    if not fields:
+        return []
+
+    # The whole form renders at once; wait for it a single time
+    WebDriverWait(driver, TIMEOUT).until(EC.visibility_of_element_located((By.ID, fields[0]["id"])))
+
+    driver.execute_script(BULK_FILL_SCRIPT, fields)
+    readback = read_fields(driver, fields)
+    retry = [f for f in fields if not _field_matches(f, readback.get(f["key"]))]
+
+    for f in retry:
+        print(f"Bulk fill didn't take for {f['key']}, filling it directly")
+        try:
+            if f["value"] == "":
+                clear_field(driver, f["id"], f["data_cy"])
+            elif f["data_cy"]:
+                fill_input_by_datacy_and_id(driver, f["data_cy"], f["id"], f["value"])
+            else:
+                fill_input_by_id(driver, f["id"], f["value"])
+        except Exception as e:
+            print(f"⚠️ Could not fill {f['key']}: {e}")
+
+    if not retry:
+        return []
+    readback = read_fields(driver, retry)
+    return [f["key"] for f in retry if not _field_matches(f, readback.get(f["key"]))]
+
+
+def clear_field(driver, element_id, data_cy=None):
+    """Empty an input, or pick a select's blank option"""
+    if data_cy:
+        locator = (By.XPATH, f"//select[@data-cy='{data_cy}' and @id='{element_id}']")
+    else:
+        locator = (By.ID, element_id)
+    el = WebDriverWait(driver, TIMEOUT).until(EC.visibility_of_element_located(locator))
+    if el.tag_name.lower() == "select":
+        from selenium.webdriver.support.ui import Select
+        Select(el).select_by_value("")
+    else:
+        el.clear()
+
+
+def _field_matches(field, current):
+    if current is None:
+        return False
+    expected = field["value"].strip()
+    return any(str(v).strip() == expected for v in current)
@@ -0,0 +1,255 @@
+"""
+Unitas over plain HTTP (experimental)
+Sends the production and cooler log data to JSON endpoints with a
+requests.Session holding the login - no browser, a few hundred KB of memory
+instead of a Firefox process.
+
+EXPERIMENTAL: the endpoint paths and payload shapes below are placeholders
+that benchmarks/mock_unitas.py implements; they have not been checked
+against traffic captured from the live Unitas pages. Capture that (the
+browser's network tab while saving a form) and update ENDPOINTS and the
+payload builders before using this for real uploads. Any failure raises
+UnitasClientError, which makes the job fall back to Selenium.
+
+Only an explicit acknowledgement counts as success: a JSON body with a login
+token (or a session cookie), and a saved status or id for submissions. A
+200 HTML page - a catch-all route or a login redirect - is an error.
+"""
+from urllib.parse import urlparse
+
+import requests
+
+from unitas_client import UnitasClient, UnitasClientError
+
+DEFAULT_BASE_URL = "https://vitalfarms.poultrycloud.com"
+
+ENDPOINTS = {
+    "login": "/api/auth/login",
+    "production_list": "/api/farms/{farm_id}/houses/{house_id}/production",
+    "production_daily": "/api/farms/{farm_id}/houses/{house_id}/production/{date}/daily",
+    "coolerlog": "/api/farms/{farm_id}/houses/{house_id}/coolerlog",
+}
+
+# fill_production_form() keyword -> Unitas field id
+PRODUCTION_FIELD_IDS = {
+    "mortality_indoor": "V33-H1",
+    "mortality_outdoor": "V35-H1",
+    "euthanized_indoor": "V34-H1",
+    "euthanized_outdoor": "V36-H1",
+    "depop_number": "V101-H1",
+    "cull_reason": "V60-H1",
+    "mortality_reason": "V50-H1",
+    "mortality_comments": "V81-H1",
+    "total_eggs": "V4-H1",
+    "floor_eggs": "V1-H1",
+    "nutritionist": "V32-H1",
+    "ration_used": "V31-H1",
+    "feed_consumption": "V39-H1",
+    "ration_delivered": "V70-H1",
+    "amount_delivered": "V23-H1",
+    "added_supplements": "V25-H1",
+    "water_consumption": "V27-H1",
+    "body_weight": "V37-H1",
+    "case_weight": "V11-H1",
+    "yolk_color": "V98-H1",
+    "birds_restricted": "V92-H1",
+    "birds_restricted_reason": "V97-H1",
+    "inside_high": "V28-H1",
+    "inside_low": "V29-H1",
+    "outside_high": "V72-H1",
+    "outside_low": "V71-H1",
+    "air_sensory": "V89-H1",
+    "weather_conditions": "V90-H1",
+    "outside_drinkers_clean": "V95-H1",
+    "birds_found_under_slats": "V77-H1",
+    "safe_environment_indoors": "V93-H1",
+    "safe_environment_outdoors": "V94-H1",
+    "equipment_functioning": "V91-H1",
+    "predator_activity": "V88-H1",
+    "comment": "Comment-H1",
+}
+
+# Time pickers: field id -> (hour keyword, minute keyword)
+PRODUCTION_TIME_FIELDS = {
+    "V99-H1": ("lights_on_hh", "lights_on_mm"),
+    "V100-H1": ("lights_off_hh", "lights_off_mm"),
+    "V78-H1": ("door_open_hh", "door_open_mm"),
+    "V79-H1": ("door_close_hh", "door_close_mm"),
+}
+
+STATUSES = {"complete": "Complete", "overdue": "Overdue"}
+
+# Statuses in a submit response that mean Unitas stored the form (a draft doesn't count)
+SAVED_STATUSES = {"complete", "saved"}
+
+
+def is_production_host(base_url):
+    """True if base_url is the live Unitas site, which the experimental client must not send to"""
+    return urlparse(base_url).hostname == urlparse(DEFAULT_BASE_URL).hostname
+
+
+def _hh_mm(hour, minute):
+    hour, minute = str(hour or "").strip(), str(minute or "").strip()
+    if not hour and not minute:
+        return None
+    return f"{int(hour or 0):02d}:{int(minute or 0):02d}"
+
+
+def production_payload(values, changed=None):
+    """
+    fill_production_form() keywords -> {field id: value}, leaving out empty fields.
+    changed: keywords to send (None = all); a cleared field is sent as "" then.
+    """
+    fields = {}
+    for keyword, field_id in PRODUCTION_FIELD_IDS.items():
+        if changed is not None and keyword not in changed:
+            continue
+        value = values.get(keyword)
+        if field_id in ("V60-H1", "V50-H1") and isinstance(value, str):
+            value = [item.strip() for item in value.split(",") if item.strip()]
+        if value is None or value == "" or value == []:
+            if changed is not None:
+                fields[field_id] = [] if field_id in ("V60-H1", "V50-H1") else ""
+            continue
+        fields[field_id] = value
+    for field_id, (hour_key, minute_key) in PRODUCTION_TIME_FIELDS.items():
+        if changed is not None and hour_key not in changed and minute_key not in changed:
+            continue
+        time_value = _hh_mm(values.get(hour_key), values.get(minute_key))
+        if time_value or changed is not None:
+            fields[field_id] = time_value or ""
+    return fields
+
+
+def _json(response, what):
+    """Body of a JSON response; UnitasClientError for anything else (an HTML page, say)"""
+    content_type = response.headers.get("Content-Type", "")
+    if "json" not in content_type.split(";")[0]:
+        raise UnitasClientError(f"{what}: expected JSON, got '{content_type or 'no content type'}'")
+    try:
+        return response.json()
+    except ValueError:
+        raise UnitasClientError(f"{what}: response is not valid JSON")
+
+
+def _acknowledged(response, what):
+    """Raise unless a submit response says the form was saved"""
+    body = _json(response, what)
+    if not isinstance(body, dict):
+        raise UnitasClientError(f"{what}: unexpected response")
+    status = str(body.get("status", "")).lower()
+    if status not in SAVED_STATUSES and not body.get("id"):
+        raise UnitasClientError(f"{what}: not saved (status '{status or 'missing'}')")
+
+
+def coolerlog_payload(values, initials):
+    """[row, date] from coolerlog_values() -> {field id: value}"""
+    (am_hour, am_minute, am_temp, pm_hour, pm_minute, pm_temp, eggs_picked_up, comments), _ = values
+    fields = {
+        "AMCheck-H1": _hh_mm(am_hour, am_minute),
+        "AMTemp-H1": am_temp,
+        "AMInitial-H1": initials,
+        "PMCheck-H1": _hh_mm(pm_hour, pm_minute),
+        "PMTemp-H1": pm_temp,
+        "PMInitial-H1": initials,
+        "EggsPick-H1": eggs_picked_up,
+        "Comments-H1": comments,
+    }
+    return {k: v for k, v in fields.items() if v not in (None, "")}
+
+
+class UnitasHttpClient(UnitasClient):
+    """Unitas through its JSON endpoints; logs in on first use"""
+
+    name = "http"
+
+    def __init__(self, secrets, base_url=None):
+        self.secrets = secrets
+        self.base_url = (base_url or secrets.get("Unitas_Base_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.farm_id = secrets["Farm_ID"]
+        self.house_id = secrets["House_ID"]
+        self.timeout = float(secrets.get("Timeout") or 30)
+        self.initials = secrets.get("Cooler_Log_Initials", "")
+        self.http = requests.Session()
+        self.http.headers["Accept"] = "application/json"
+        self._logged_in = False
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        self.http.close()
+        self._logged_in = False
+
+    def _url(self, name, **params):
+        return self.base_url + ENDPOINTS[name].format(farm_id=self.farm_id, house_id=self.house_id, **params)
+
+    def login(self):
+        username = self.secrets["Unitas_Username"]
+        password = self.secrets["Unitas_Password"]
+        if not username or not password:
+            raise UnitasClientError("Unitas username/password not set")
+        try:
+            response = self.http.post(self._url("login"), json={"username": username, "password": password},
+                                      timeout=self.timeout, allow_redirects=False)
+        except requests.RequestException as e:
+            raise UnitasClientError(f"login failed: {e}")
+        if response.status_code != 200:
+            raise UnitasClientError(f"login failed: HTTP {response.status_code}")
+        # Token-based deployments return it in the body; cookie-based ones set it on the session
+        body = _json(response, "login")
+        token = body.get("token") if isinstance(body, dict) else None
+        if token:
+            self.http.headers["Authorization"] = f"Bearer {token}"
+        elif not response.cookies:
+            raise UnitasClientError("login failed: no token or session cookie in the response")
+        self._logged_in = True
+        print("Logged in (HTTP)")
+
+    def _request(self, method, url, **kwargs):
+        """Send a request, logging in first and once more if the session has expired"""
+        if not self._logged_in:
+            self.login()
+        for attempt in (1, 2):
+            try:
+                response = self.http.request(method, url, timeout=self.timeout, allow_redirects=False, **kwargs)
+            except requests.RequestException as e:
+                raise UnitasClientError(f"{method} {url} failed: {e}")
+            if response.status_code == 401 and attempt == 1:
+                self.login()
+                continue
+            # A redirect is the site sending us to its login page, not an answer
+            if response.status_code >= 300:
+                raise UnitasClientError(f"{method} {url} returned HTTP {response.status_code}")
+            return response
+
+    def daily_statuses(self, dates):
+        if not dates:
+            return {}
+        response = self._request("GET", self._url("production_list"),
+                                 params={"from": min(dates), "to": max(dates)})
+        entries = _json(response, "production list")
+        if not isinstance(entries, list):
+            raise UnitasClientError("production list: unexpected response")
+        found = {}
+        for entry in entries:
+            if entry.get("type", "daily") == "daily":
+                found[entry.get("date")] = STATUSES.get(str(entry.get("status", "")).lower(), "Unknown")
+        return {d: found.get(d, "Not Found") for d in dates}
+
+    def submit_production(self, date_str, values, previous=None):
+        changed = None
+        if previous is not None:
+            from unitas_production import production_changes
+            changed = production_changes(previous, values)
+        # A non-draft PUT is the form's Save
+        response = self._request("PUT", self._url("production_daily", date=date_str),
+                                 json={"fields": production_payload(values, changed)})
+        _acknowledged(response, f"production {date_str}")
+        return True
+
+    def submit_coolerlog(self, date_str, values):
+        response = self._request("POST", self._url("coolerlog"),
+                                 json={"date": date_str, "fields": coolerlog_payload(values, self.initials)})
+        _acknowledged(response, f"cooler log {date_str}")
@@ -1,14 +1,43 @@
 from re import L
+import json
+import os
+import time
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from unitas_helper import click_when_clickable
+from server.config import CONFIG_DIR
 
+BASE_URL = "https://vitalfarms.poultrycloud.com"
+LOGIN_PATH = "/login"  # confirm this
+
+# Cookies and localStorage from the last login, so later runs can skip the login form
+SESSION_FILE = CONFIG_DIR / "unitas_session.json"
+PROBE_TIMEOUT = 10
+
+# Keys Selenium's add_cookie() accepts
+COOKIE_KEYS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
 
 
 def login(driver, secrets):
+    """Log in to Unitas, reusing the saved session when it is still valid"""
+    if restore_session(driver, secrets):
+        print("Logged in (restored saved session)")
+        # Keep the saved copy current with any refreshed tokens
+        save_session(driver, secrets)
+        return
+    login_with_form(driver, secrets)
+    save_session(driver, secrets)
+
+
+def base_url(secrets):
+    """Unitas site root from unitas.base_url (a mock server when benchmarking)"""
+    return (secrets.get("Unitas_Base_URL") or BASE_URL).rstrip("/")
+
+
+def login_with_form(driver, secrets):
 
-    LOGIN_URL = "https://vitalfarms.poultrycloud.com/login"  # confirm this
     USERNAME = secrets["Unitas_Username"]
     PASSWORD = secrets["Unitas_Password"]
     TIMEOUT = secrets["Timeout"]
@@ -16,7 +45,7 @@ def login(driver, secrets):
         raise SystemExit("Set Unitas_Username and Unitas_Password in secrets.json!")
 
     wait = WebDriverWait(driver, 10)
-    driver.get(LOGIN_URL)
+    driver.get(base_url(secrets) + LOGIN_PATH)
     username_box = wait.until(EC.visibility_of_element_located((By.ID, "username")))
     password_box = wait.until(EC.visibility_of_element_located((By.ID, "password")))
     username_box.send_keys(USERNAME)
@@ -26,3 +55,115 @@ def login(driver, secrets):
     WebDriverWait(driver, TIMEOUT).until_not(EC.url_contains("/login"))
     print("Logged in")
 
+
+def save_session(driver, secrets):
+    """Write the browser's Unitas cookies and localStorage to SESSION_FILE (mode 0600)"""
+    try:
+        state = {
+            "username": secrets["Unitas_Username"],
+            "saved_at": time.time(),
+            "cookies": driver.get_cookies(),
+            "local_storage": driver.execute_script(
+                "var items = {};"
+                "for (var i = 0; i < localStorage.length; i++) {"
+                "  var key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+                "}"
+                "return items;"
+            ) or {},
+        }
+        SESSION_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = SESSION_FILE.with_name(SESSION_FILE.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, SESSION_FILE)
+    except (OSError, WebDriverException) as e:
+        # Only costs a full login next time
+        print(f"Could not save Unitas session: {e}")
+
+
+def clear_saved_session():
+    try:
+        SESSION_FILE.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _load_saved_session(secrets):
+    try:
+        state = json.loads(SESSION_FILE.read_text())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable Unitas session file: {e}")
+        return None
+    # Credentials changed since it was saved
+    if state.get("username") != secrets["Unitas_Username"]:
+        return None
+    return state
+
+
+def _probe_url(secrets):
+    """A page that needs a login; the production list doubles as the first page most jobs open"""
+    farm_id = secrets.get("Farm_ID")
+    house_id = secrets.get("House_ID")
+    if farm_id and house_id:
+        return f"{base_url(secrets)}/farm/production?farmId={farm_id}&houseId={house_id}"
+    return base_url(secrets) + "/"
+
+
+def is_logged_in(driver, secrets):
+    """Open the probe page; True unless Unitas sends the browser to the login form"""
+    driver.get(_probe_url(secrets))
+    # Either the app renders, or we end up on the login form
+    WebDriverWait(driver, PROBE_TIMEOUT).until(
+        lambda d: "/login" in d.current_url
+        or d.find_elements(By.ID, "username")
+        or d.find_elements(By.CSS_SELECTOR, ".px-4.py-5")
+    )
+    return not ("/login" in driver.current_url or driver.find_elements(By.ID, "username"))
+
+
+def restore_session(driver, secrets):
+    """Load saved cookies/localStorage into the browser and check they still work
+
+    Returns True when the probe page opened without a redirect to the login form.
+    """
+    state = _load_saved_session(secrets)
+    if not state:
+        return False
+
+    now = time.time()
+    try:
+        # Cookies can only be set for the domain currently loaded
+        driver.get(base_url(secrets) + "/favicon.ico")
+        for cookie in state.get("cookies", []):
+            if cookie.get("expiry") and cookie["expiry"] < now:
+                continue
+            cookie = {k: v for k, v in cookie.items() if k in COOKIE_KEYS}
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"])
+            if cookie.get("sameSite") not in (None, "Strict", "Lax", "None"):
+                del cookie["sameSite"]
+            try:
+                driver.add_cookie(cookie)
+            except WebDriverException as e:
+                print(f"Skipping saved cookie {cookie.get('name')}: {e}")
+        local_storage = state.get("local_storage") or {}
+        if local_storage:
+            driver.execute_script(
+                "var items = arguments[0];"
+                "for (var key in items) { localStorage.setItem(key, items[key]); }",
+                local_storage,
+            )
+
+        if not is_logged_in(driver, secrets):
+            print("Saved Unitas session has expired, logging in again")
+            clear_saved_session()
+            driver.delete_all_cookies()
+            return False
+        return True
+    except (TimeoutException, WebDriverException) as e:
+        print(f"Could not restore Unitas session ({e.__class__.__name__}), logging in again")
+        return False
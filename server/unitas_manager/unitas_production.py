@@ -1,15 +1,16 @@
 import os
+import re
 import time
 import unitas_helper as helper
-from unitas_login import login
+import unitas_waits as waits
+from unitas_session import UnitasSession
+from unitas_client import make_unitas_client
+from unitas_login import base_url
 
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from webdriver_manager.firefox import GeckoDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
+from bs4 import BeautifulSoup
 from datetime import date, timedelta, datetime
 import database_helper as db
 
@@ -23,7 +24,7 @@ def do_unitas_setup(secrets):
 # ---------- config ----------
 
     global HEADLESS, FARM_ID, HOUSE_ID, TIMEOUT, PRODUCTION_URL_TMPL
-    PRODUCTION_URL_TMPL = "https://vitalfarms.poultrycloud.com/farm/production?farmId={farm_id}&houseId={house_id}"
+    PRODUCTION_URL_TMPL = base_url(secrets) + "/farm/production?farmId={farm_id}&houseId={house_id}"
 
     HEADLESS = False  # set True for headless mode
 # ----------------------------
@@ -39,6 +40,13 @@ def trigger_fill_production_form(driver, db_file, target_date=None):
     Fetches data from Daily_User_Log and Daily_Bot_Log for the given date (default: yesterday),
     merges them, and calls fill_production_form with named arguments.
     """
+    fill_production_form(driver, **production_values(db_file, target_date))
+
+def production_values(db_file, target_date=None):
+    """
+    The production form's values for the given date (default: yesterday), as the
+    keyword arguments of fill_production_form.
+    """
     if target_date is None:
         target_date = (date.today() - timedelta(days=1)).isoformat()
     user_data = db.get_daily_user_log(db_file, target_date) or {}
@@ -77,8 +85,7 @@ def trigger_fill_production_form(driver, db_file, target_date=None):
         case_weight_val = ''
         yolk_color_val = ''
 
-    fill_production_form(
-        driver,
+    return dict(
         mortality_indoor=merged.get('mortality_indoor', '0'),
         mortality_outdoor=merged.get('mortality_outdoor', '0'),
         euthanized_indoor=merged.get('euthanized_indoor', '0'),
@@ -124,17 +131,6 @@ def trigger_fill_production_form(driver, db_file, target_date=None):
         comment=merged.get('comments', '')
     )
 
-def make_driver(headless: bool = False):
-    options = webdriver.FirefoxOptions()
-    if headless:
-        options.add_argument("--headless")
-    # GeckoDriverManager caches driver automatically
-    return webdriver.Firefox(
-        service=Service(GeckoDriverManager().install()),
-        options=options
-    )
-
-
 def open_production_page(driver, farm_id: int, house_id: int):
     url = PRODUCTION_URL_TMPL.format(farm_id=farm_id, house_id=house_id)
     driver.get(url)
@@ -145,52 +141,69 @@ def open_production_page(driver, farm_id: int, house_id: int):
 
     print("Production page opened")
 
-def check_date_status(driver, target_date_str: str):
+# "Thu, 02 Oct 2025" / "Thu, 2 Oct 2025" as shown in the production list titles
+TITLE_DATE_RE = re.compile(r"[A-Z][a-z]{2}, \d{1,2} [A-Z][a-z]{2} \d{4}")
+
+def parse_daily_statuses(html):
     """
-    Check if a date's production form shows as Complete or Overdue on the Unitas page.
-    Requires the production page to already be open.
+    Map every date on the production page to the status of its daily form.
+    Works on a page_source snapshot, so checking any number of dates costs a
+    single WebDriver round trip.
 
     Returns:
-        str: "Complete", "Overdue", "Unknown", or "Not Found"
+        dict: {"YYYY-MM-DD": "Complete" | "Overdue" | "Unknown"}
     """
-    target_date = datetime.fromisoformat(target_date_str)
-    date_formats = [
-        target_date.strftime("%a, %d %b %Y"),   # "Thu, 02 Oct 2025"
-        target_date.strftime("%a, %-d %b %Y"),  # "Thu, 2 Oct 2025" (no leading zero)
-    ]
-
-    for date_fmt in date_formats:
+    soup = BeautifulSoup(html, "html.parser")
+    statuses = {}
+    for title in soup.find_all("div", attrs={"data-cy": "title"}):
+        match = TITLE_DATE_RE.search(title.get_text(" ", strip=True))
+        if not match:
+            continue
         try:
-            title_xpath = f"//div[@data-cy='title' and contains(., '{date_fmt}')]"
-            driver.find_element(By.XPATH, title_xpath)
-
-            daily_li_xpath = (
-                f"//div[@data-cy='title' and contains(., '{date_fmt}')]"
-                f"/following-sibling::ul//li[@data-cy='list-item' and @aria-label='daily']"
-            )
-            try:
-                daily_elem = driver.find_element(By.XPATH, daily_li_xpath)
-            except NoSuchElementException:
-                return "Unknown"
-
-            try:
-                daily_elem.find_element(By.XPATH, ".//span[contains(@class, 'text-success-500')]")
-                return "Complete"
-            except NoSuchElementException:
-                pass
-
-            try:
-                daily_elem.find_element(By.XPATH, ".//span[contains(@class, 'text-danger-500')]")
-                return "Overdue"
-            except NoSuchElementException:
-                pass
+            day = datetime.strptime(match.group(0), "%a, %d %b %Y").date().isoformat()
+        except ValueError:
+            continue
+        # First title for a date wins, as with the old XPath lookup
+        statuses.setdefault(day, _daily_status(title))
+    return statuses
+
+def _daily_status(title):
+    """Status of the daily list item under a date title"""
+    for sibling in title.find_next_siblings():
+        if sibling.get("data-cy") == "title":
+            break  # the next date's section
+        if sibling.name != "ul":
+            continue
+        daily = sibling.find("li", attrs={"data-cy": "list-item", "aria-label": "daily"})
+        if daily is None:
+            continue
+        if daily.find("span", class_=lambda c: c and "text-success-500" in c):
+            return "Complete"
+        if daily.find("span", class_=lambda c: c and "text-danger-500" in c):
+            return "Overdue"
+        return "Unknown"
+    return "Unknown"
+
+def check_dates_status(driver, dates):
+    """
+    Status of each date's production form from one snapshot of the production page.
+    Requires the production page to already be open.
 
-            return "Unknown"
+    Returns:
+        dict: {date: "Complete" | "Overdue" | "Unknown" | "Not Found"}
+    """
+    found = parse_daily_statuses(driver.page_source)
+    return {d: found.get(d, "Not Found") for d in dates}
 
-        except NoSuchElementException:
-            continue
+def check_date_status(driver, target_date_str: str):
+    """
+    Check if a date's production form shows as Complete or Overdue on the Unitas page.
+    Requires the production page to already be open.
 
-    return "Not Found"
+    Returns:
+        str: "Complete", "Overdue", "Unknown", or "Not Found"
+    """
+    return check_dates_status(driver, [target_date_str])[target_date_str]
 
 
 def get_form_by_date(driver, timeout, target_date_str):
@@ -237,31 +250,36 @@ def get_form_by_date(driver, timeout, target_date_str):
     print(f"Looking for form with date: {target_date_str}")
 
     # Strategy 1: Try to find by date in the title div, then click the daily li
+    target = None
     for date_fmt in date_formats:
         try:
             # Look for the date in the title div, then find the daily list item after it
             xpath = f"//div[@data-cy='title' and contains(., '{date_fmt}')]/following-sibling::ul//li[@data-cy='list-item' and @aria-label='daily']"
             wait = WebDriverWait(driver, 3)  # Short timeout for each attempt
             target = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            target.click()
-            print(f"Found and clicked form for date: {date_fmt}")
-
-            # Wait for the form to open
-            WebDriverWait(driver, timeout).until(
-                EC.visibility_of_element_located((By.XPATH, "//h3[normalize-space()='House']"))
-            )
-            print(f"Form for {target_date_str} opened successfully.")
-            time.sleep(.5)
-            return
+            break
         except TimeoutException:
             continue
         except Exception as e:
             print(f"Error trying format {date_fmt}: {e}")
             continue
 
-    # If we couldn't find it by any date format, raise an error
-    print(f"ERROR: Could not find form for date {target_date_str}")
-    raise Exception(f"Unable to locate form for date: {target_date_str}")
+    if target is None:
+        # If we couldn't find it by any date format, raise an error
+        print(f"ERROR: Could not find form for date {target_date_str}")
+        raise Exception(f"Unable to locate form for date: {target_date_str}")
+
+    # Only the lookup above may try the next format; once clicked, a timeout is a real failure
+    target.click()
+    print(f"Found and clicked form for date: {date_fmt}")
+
+    # Wait for the form to open
+    WebDriverWait(driver, timeout).until(
+        EC.visibility_of_element_located((By.XPATH, "//h3[normalize-space()='House']"))
+    )
+    print(f"Form for {target_date_str} opened successfully.")
+    # Let the form load its saved values before anything is typed over them
+    waits.network_settled(driver, timeout=timeout)
 
 def get_yesterdays_form(driver, timeout):
     """Backwards compatibility wrapper - selects yesterday's form by position"""
@@ -312,70 +330,158 @@ def fill_production_form(
     safe_environment_outdoors="",
     equipment_functioning="",
     predator_activity="",
-    comment=""
+    comment="",
+    previous=None
 ):
+    """
+    Fill the open daily production form.
+
+    previous: snapshot of the last submission for this date (see
+    previous_submission()). When given, only the fields whose values changed
+    since then are touched, and the reason pickers only toggle the reasons
+    that were added or removed.
+    """
+    # Every keyword argument, to compare against the previous submission
+    values = {k: v for k, v in locals().items() if k not in ("driver", "previous")}
+    changed = production_changes(previous, values) if previous is not None else set(values)
+
+    fields = production_form_fields(values, changed, clear=previous is not None)
+
+    started = time.monotonic()
+    unverified = helper.fill_fields_in_bulk(driver, fields)
 
-    helper.fill_input_by_id(driver, "V33-H1", mortality_indoor or "0")
-    helper.fill_input_by_id(driver, "V35-H1", mortality_outdoor or "0")
-    helper.fill_input_by_id(driver, "V34-H1", euthanized_indoor or "0")
-    helper.fill_input_by_id(driver, "V36-H1", euthanized_outdoor or "0")
-    helper.fill_input_by_id(driver, "V101-H1", depop_number)
-    helper.fill_multiselect_box(driver, "V60-H1", cull_reason)
-    helper.fill_multiselect_box(driver, "V50-H1", mortality_reason)
-    helper.fill_input_by_id(driver, "V81-H1", mortality_comments)
-    helper.fill_input_by_id(driver, "V4-H1", total_eggs)
-    helper.fill_input_by_id(driver, "V1-H1", floor_eggs)
-    helper.fill_input_by_id(driver, "V32-H1", nutritionist)
-    helper.fill_input_by_id(driver, "V31-H1", ration_used)
-    helper.fill_input_by_id(driver, "V39-H1", feed_consumption)
-    helper.fill_input_by_id(driver, "V70-H1", ration_delivered)
-    helper.fill_input_by_id(driver, "V23-H1", amount_delivered)
-    if lights_on_hh.strip() != "":
-        formatted_hour = f"{int(lights_on_hh):02d}"
-        helper.fill_input_by_datacy_and_id(driver, "input-hour", "V99-H1", formatted_hour)
-    if lights_on_mm.strip() != "":
-        formatted_minute = f"{int(lights_on_mm):02d}"
-        helper.fill_input_by_datacy_and_id(driver, "input-minute", "V99-H1", formatted_minute)
-    if lights_off_hh.strip() != "":
-        formatted_hour = f"{int(lights_off_hh):02d}"
-        helper.fill_input_by_datacy_and_id(driver, "input-hour", "V100-H1", formatted_hour)
-    if lights_off_mm.strip() != "":
-        formatted_minute = f"{int(lights_off_mm):02d}"
-        helper.fill_input_by_datacy_and_id(driver, "input-minute", "V100-H1", formatted_minute)
-    helper.fill_input_by_id(driver, "V25-H1", added_supplements)
-    helper.fill_input_by_id(driver, "V27-H1", water_consumption)
-    helper.fill_input_by_id(driver, "V37-H1", body_weight)
-    helper.fill_input_by_id(driver, "V11-H1", case_weight)
-    helper.fill_input_by_id(driver, "V98-H1", yolk_color)
-    if door_open_hh.strip() != "":
-        formatted_hour = f"{int(door_open_hh):02d}"
-        helper.fill_input_by_datacy_and_id(driver, "input-hour", "V78-H1", formatted_hour)
-    if door_open_mm.strip() != "":
-        formatted_minute = f"{int(door_open_mm):02d}"
-        helper.fill_input_by_datacy_and_id(driver, "input-minute", "V78-H1", formatted_minute)
-    if door_close_hh.strip() != "":
-        formatted_hour = f"{int(door_close_hh):02d}"
-        helper.fill_input_by_datacy_and_id(driver, "input-hour", "V79-H1", formatted_hour)
-    if door_close_mm.strip() != "":
-        formatted_minute = f"{int(door_close_mm):02d}"
-        helper.fill_input_by_datacy_and_id(driver, "input-minute", "V79-H1", formatted_minute)
-    helper.fill_input_by_id(driver, "V92-H1", birds_restricted)
-    helper.fill_input_by_id(driver, "V97-H1", birds_restricted_reason)
-    helper.fill_input_by_id(driver, "V28-H1", inside_high)
-    helper.fill_input_by_id(driver, "V29-H1", inside_low)
-    helper.fill_input_by_id(driver, "V72-H1", outside_high)
-    helper.fill_input_by_id(driver, "V71-H1", outside_low)
-    helper.fill_input_by_id(driver, "V89-H1", air_sensory)
-    helper.fill_input_by_id(driver, "V90-H1", weather_conditions)
-    helper.fill_input_by_id(driver, "V95-H1", outside_drinkers_clean)
-    helper.fill_input_by_id(driver, "V77-H1", birds_found_under_slats)
-    helper.fill_input_by_id(driver, "V93-H1", safe_environment_indoors)
-    helper.fill_input_by_id(driver, "V94-H1", safe_environment_outdoors)
-    helper.fill_input_by_id(driver, "V91-H1", equipment_functioning)
-    helper.fill_input_by_id(driver, "V88-H1", predator_activity)
-    helper.fill_input_by_id(driver, "Comment-H1", comment)
-
-def run_unitas_stuff(secrets, db_file, target_date=None, headless=None):
+    # The reason pickers are custom dropdowns and need real clicks; each click toggles a reason
+    for keyword, label in (("cull_reason", "V60-H1"), ("mortality_reason", "V50-H1")):
+        if keyword not in changed:
+            continue
+        reasons = reason_list(values[keyword])
+        if previous is not None:
+            before = reason_list(previous.get(keyword))
+            reasons = [r for r in reasons if r not in before] + [r for r in before if r not in reasons]
+        if reasons:
+            helper.fill_multiselect_box(driver, label, reasons)
+
+    what = "fields" if previous is None else f"{len(changed)} changed field(s)"
+    print(f"Production form filled ({what}) in {time.monotonic() - started:.1f}s")
+    if unverified:
+        raise RuntimeError(f"Fields did not accept their values: {', '.join(unverified)}")
+
+def production_form_fields(values, changed, clear=False):
+    """
+    bulk_field() specs for the production form keywords in changed.
+    clear: send empty values too (as ""), so a field emptied since the last
+    submission is cleared on the loaded form instead of keeping the old value.
+    """
+    def hh(value):
+        return f"{int(value):02d}" if value.strip() != "" else ""
+
+    def field(element_id, value, data_cy=None):
+        return helper.bulk_field(element_id, value, data_cy, clear=clear)
+
+    v = values
+    fields = [
+        ("mortality_indoor", field("V33-H1", v["mortality_indoor"] or "0")),
+        ("mortality_outdoor", field("V35-H1", v["mortality_outdoor"] or "0")),
+        ("euthanized_indoor", field("V34-H1", v["euthanized_indoor"] or "0")),
+        ("euthanized_outdoor", field("V36-H1", v["euthanized_outdoor"] or "0")),
+        ("depop_number", field("V101-H1", v["depop_number"])),
+        ("mortality_comments", field("V81-H1", v["mortality_comments"])),
+        ("total_eggs", field("V4-H1", v["total_eggs"])),
+        ("floor_eggs", field("V1-H1", v["floor_eggs"])),
+        ("nutritionist", field("V32-H1", v["nutritionist"])),
+        ("ration_used", field("V31-H1", v["ration_used"])),
+        ("feed_consumption", field("V39-H1", v["feed_consumption"])),
+        ("ration_delivered", field("V70-H1", v["ration_delivered"])),
+        ("amount_delivered", field("V23-H1", v["amount_delivered"])),
+        ("lights_on_hh", field("V99-H1", hh(v["lights_on_hh"]), data_cy="input-hour")),
+        ("lights_on_mm", field("V99-H1", hh(v["lights_on_mm"]), data_cy="input-minute")),
+        ("lights_off_hh", field("V100-H1", hh(v["lights_off_hh"]), data_cy="input-hour")),
+        ("lights_off_mm", field("V100-H1", hh(v["lights_off_mm"]), data_cy="input-minute")),
+        ("added_supplements", field("V25-H1", v["added_supplements"])),
+        ("water_consumption", field("V27-H1", v["water_consumption"])),
+        ("body_weight", field("V37-H1", v["body_weight"])),
+        ("case_weight", field("V11-H1", v["case_weight"])),
+        ("yolk_color", field("V98-H1", v["yolk_color"])),
+        ("door_open_hh", field("V78-H1", hh(v["door_open_hh"]), data_cy="input-hour")),
+        ("door_open_mm", field("V78-H1", hh(v["door_open_mm"]), data_cy="input-minute")),
+        ("door_close_hh", field("V79-H1", hh(v["door_close_hh"]), data_cy="input-hour")),
+        ("door_close_mm", field("V79-H1", hh(v["door_close_mm"]), data_cy="input-minute")),
+        ("birds_restricted", field("V92-H1", v["birds_restricted"])),
+        ("birds_restricted_reason", field("V97-H1", v["birds_restricted_reason"])),
+        ("inside_high", field("V28-H1", v["inside_high"])),
+        ("inside_low", field("V29-H1", v["inside_low"])),
+        ("outside_high", field("V72-H1", v["outside_high"])),
+        ("outside_low", field("V71-H1", v["outside_low"])),
+        ("air_sensory", field("V89-H1", v["air_sensory"])),
+        ("weather_conditions", field("V90-H1", v["weather_conditions"])),
+        ("outside_drinkers_clean", field("V95-H1", v["outside_drinkers_clean"])),
+        ("birds_found_under_slats", field("V77-H1", v["birds_found_under_slats"])),
+        ("safe_environment_indoors", field("V93-H1", v["safe_environment_indoors"])),
+        ("safe_environment_outdoors", field("V94-H1", v["safe_environment_outdoors"])),
+        ("equipment_functioning", field("V91-H1", v["equipment_functioning"])),
+        ("predator_activity", field("V88-H1", v["predator_activity"])),
+        ("comment", field("Comment-H1", v["comment"])),
+    ]
+    return [f for keyword, f in fields if keyword in changed]
+
+
+def save_production_form(driver):
+    """Click the open form's Save button; raises unless Unitas acknowledges the save"""
+    save_btn = WebDriverWait(driver, TIMEOUT).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[normalize-space()='Save']"))
+    )
+    waits.scroll_into_view(driver, save_btn)
+    if not waits.click_save(driver, save_btn):
+        raise RuntimeError("Unitas did not confirm the save")
+    print("Production form saved")
+
+# ---------- incremental updates ----------
+# What Unitas confirmed saving for each date is kept in Unitas_Submissions. A
+# correction to a day Unitas already has then only touches the fields that
+# changed. Fills that were left for a manual Save, or that failed part way,
+# drop the snapshot: nobody knows what Unitas ended up with.
+
+def reason_list(value):
+    """Cull/mortality reasons as a list, from the comma-separated text in the database"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [item.strip() for item in value if item and item.strip()]
+
+def production_snapshot(values):
+    """production_values() in the form submissions are stored and compared in"""
+    return {k: "" if v is None else str(v) for k, v in values.items()}
+
+def production_changes(previous, values):
+    """Keywords of values that differ from a previous submission's snapshot"""
+    current = production_snapshot(values)
+    changed = {k for k, v in current.items() if previous.get(k, "") != v}
+    # Same reasons in another order is not a change
+    for keyword in ("cull_reason", "mortality_reason"):
+        if keyword in changed and set(reason_list(current[keyword])) == set(reason_list(previous.get(keyword))):
+            changed.discard(keyword)
+    return changed
+
+def previous_submission(db_file, target_date):
+    """
+    Snapshot of the last production submission Unitas confirmed saving for
+    target_date, or None (then the whole form is filled).
+    """
+    submission = db.get_unitas_submission(db_file, target_date, "production")
+    return submission["snapshot"] if submission else None
+
+def _mark_sent(db_file, upload_date):
+    """Mark upload_date as sent to Unitas with timestamp"""
+    user_log = db.get_daily_user_log(db_file, upload_date)
+    if user_log:
+        db.update_daily_user_log(db_file, upload_date, {
+            'sent_to_unitas_at': datetime.now().isoformat()
+        })
+        print(f"✓ Marked {upload_date} as sent to Unitas")
+
+def run_unitas_stuff(secrets, db_file, target_date=None, headless=None, session=None, client=None,
+                     verify=True):
     """
     Upload data to Unitas for dates that are flagged.
 
@@ -390,6 +496,15 @@ def run_unitas_stuff(secrets, db_file, target_date=None, headless=None):
         db_file: Path to database
         target_date: Specific date to upload (None = upload all pending)
         headless: Force headless mode (None = use global HEADLESS setting)
+        session: Shared UnitasSession to run in (None = a browser of its own,
+                 left open afterwards so the forms can be looked over)
+        client: UnitasClient to upload through (None = the one unitas.client
+                selects, on top of session)
+        verify: check last week's uploads against Unitas first (the
+                automation service runs that as a job of its own instead)
+
+    Returns:
+        (dates uploaded, {date: error} for the dates that failed)
     """
     # Determine which dates to upload BEFORE logging in
     if target_date is not None:
@@ -404,84 +519,137 @@ def run_unitas_stuff(secrets, db_file, target_date=None, headless=None):
             print("No dates pending upload. All caught up!")
             print("All data has been sent to Unitas.")
             print("="*60)
-            return
+            return [], {}
         print(f"Found {len(dates_to_upload)} date(s) pending upload: {dates_to_upload}")
 
-    # Now that we know we have work to do, start the browser and login
+    # Dates Unitas already has, unchanged since, need no browser at all
+    skipped = []
+    prepared = {}  # date -> (values, previous snapshot or None)
+    for upload_date in list(dates_to_upload):
+        try:
+            values = production_values(db_file, upload_date)
+        except Exception as e:
+            # Reported (and failed) again when the date is processed below
+            print(f"Could not read values for {upload_date}: {e}")
+            continue
+        previous = previous_submission(db_file, upload_date)
+        if previous is not None and not production_changes(previous, values):
+            print(f"{upload_date} unchanged since its last submission; nothing to send")
+            _mark_sent(db_file, upload_date)
+            skipped.append(upload_date)
+            dates_to_upload.remove(upload_date)
+        else:
+            prepared[upload_date] = (values, previous)
+    if not dates_to_upload:
+        return skipped, {}
+
+    # Now that we know we have work to do, get a client (Selenium logs in here)
     # Use provided headless parameter or fall back to global HEADLESS setting
-    use_headless = headless if headless is not None else HEADLESS
-    driver = make_driver(use_headless)
+    own_session = session is None
+    if own_session:
+        use_headless = headless if headless is not None else HEADLESS
+        session = UnitasSession(secrets, headless=use_headless, idle_timeout=None)
+    if client is None:
+        client = make_unitas_client(secrets, session)
 
     try:
-        login(driver, secrets)
-        open_production_page(driver, FARM_ID, HOUSE_ID)
-
-        # Verify previously uploaded dates from the last week
-        dates_to_verify = db.get_uploaded_days_last_week(db_file, days=7)
-        if dates_to_verify:
-            print(f"\nVerifying {len(dates_to_verify)} uploaded date(s) against Unitas...")
-            for verify_date in dates_to_verify:
-                try:
-                    status = check_date_status(driver, verify_date)
-                    if status == "Complete":
-                        db.update_daily_user_log(db_file, verify_date, {
-                            'verified_at': datetime.now().isoformat()
-                        })
-                        print(f"  ✓ {verify_date} — Complete (verified)")
-                    else:
-                        db.update_daily_user_log(db_file, verify_date, {
-                            'verified_at': status
-                        })
-                        print(f"  ✗ {verify_date} — {status} (not verified)")
-                except Exception as e:
-                    print(f"  ? {verify_date} — error during verification: {e}")
+        return _upload_dates(client, db_file, dates_to_upload, prepared, skipped, verify)
+    finally:
+        if own_session:
+            # Windows with forms to review were handed over and stay open
+            session.close()
+
+def _verify_uploads(client, db_file, days=7):
+    """Record in verified_at whether Unitas shows the last days' uploads as Complete"""
+    dates_to_verify = db.get_uploaded_days_last_week(db_file, days=days)
+    if not dates_to_verify:
+        return
+    print(f"\nVerifying {len(dates_to_verify)} uploaded date(s) against Unitas...")
+    try:
+        statuses = client.daily_statuses(dates_to_verify)
+    except Exception as e:
+        print(f"  ? error during verification: {e}")
+        statuses = {}
+    for verify_date, status in statuses.items():
+        if status == "Complete":
+            db.update_daily_user_log(db_file, verify_date, {
+                'verified_at': datetime.now().isoformat()
+            })
+            print(f"  ✓ {verify_date} — Complete (verified)")
+        else:
+            db.update_daily_user_log(db_file, verify_date, {
+                'verified_at': status
+            })
+            print(f"  ✗ {verify_date} — {status} (not verified)")
+
+def verify_uploads(secrets, db_file, session=None, client=None):
+    """Verify the last week's uploads on their own, without uploading anything"""
+    if not db.get_uploaded_days_last_week(db_file, days=7):
+        print("No uploads from the last week to verify")
+        return
+    own_session = session is None
+    if own_session:
+        session = UnitasSession(secrets, headless=HEADLESS, idle_timeout=None)
+    if client is None:
+        client = make_unitas_client(secrets, session)
+    try:
+        with client:
+            _verify_uploads(client, db_file)
+    finally:
+        if own_session:
+            session.close()
+
+def _upload_dates(client, db_file, dates_to_upload, prepared, skipped, verify=True):
+    """Verify last week's uploads (if verify), then submit each date through client"""
+    with client:
+        if verify:
+            _verify_uploads(client, db_file)
 
         # Upload each date
-        successful_uploads = []
-        failed_uploads = []
+        successful_uploads = list(skipped)
+        failed_uploads = {}  # date -> error
+        left_for_review = []  # filled but not saved
 
         for upload_date in dates_to_upload:
             print(f"\n{'='*60}")
             print(f"Processing date: {upload_date}")
             print(f"{'='*60}")
 
+            timer = waits.StepTimer(upload_date)
             try:
-                # Select the form for this date
-                get_form_by_date(driver, TIMEOUT, upload_date)
-
-                # Fill the form
-                trigger_fill_production_form(driver, db_file, upload_date)
-
-                # Scroll back to top
-                element = driver.find_element(By.ID, "V33-H1")
-                driver.execute_script("arguments[0].scrollIntoView({ behavior: 'smooth', block: 'center' });", element)
-
-                print(f"Form filled for {upload_date}!")
-
-                # Mark as sent to Unitas with timestamp
-                user_log = db.get_daily_user_log(db_file, upload_date)
-                if user_log:
-                    db.update_daily_user_log(db_file, upload_date, {
-                        'sent_to_unitas_at': datetime.now().isoformat()
-                    })
-                    print(f"✓ Marked {upload_date} as sent to Unitas")
+                with timer.step("prepare"):
+                    if upload_date in prepared:
+                        values, previous = prepared[upload_date]
+                    else:
+                        values, previous = production_values(db_file, upload_date), None
+                if previous is not None:
+                    print(f"Updating {len(production_changes(previous, values))} changed field(s) only")
+
+                # Open, fill and settle the form (or send it, over HTTP)
+                with timer.step(f"submit ({client.name})"):
+                    saved = client.submit_production(upload_date, values, previous)
+
+                if saved:
+                    print(f"Form saved for {upload_date}!")
+                    db.save_unitas_submission(db_file, upload_date, "production", production_snapshot(values))
+                else:
+                    print(f"Form filled for {upload_date}!")
+                    left_for_review.append(upload_date)
+                    # Unitas may or may not get these values; fill the whole form next time
+                    db.delete_unitas_submission(db_file, upload_date, "production")
+                _mark_sent(db_file, upload_date)
 
                 successful_uploads.append(upload_date)
-
-                # Small delay between forms
-                if len(dates_to_upload) > 1:
-                    print("Waiting 2 seconds before next form...")
-                    time.sleep(2)
+                timer.report()
 
             except Exception as e:
                 print(f"✗ ERROR processing {upload_date}: {e}")
                 print(f"Skipping {upload_date} and continuing with next date...")
-                failed_uploads.append(upload_date)
-                # Go back to production page to reset for next date
+                failed_uploads[upload_date] = str(e) or e.__class__.__name__
                 try:
-                    open_production_page(driver, FARM_ID, HOUSE_ID)
-                except:
-                    print("Warning: Could not return to production page")
+                    db.delete_unitas_submission(db_file, upload_date, "production")
+                except Exception as db_error:
+                    print(f"Could not clear the saved submission for {upload_date}: {db_error}")
 
         print(f"\n{'='*60}")
         print(f"UPLOAD SUMMARY")
@@ -494,10 +662,11 @@ def run_unitas_stuff(secrets, db_file, target_date=None, headless=None):
         if failed_uploads:
             print(f"  ✗ {', '.join(failed_uploads)}")
         print(f"{'='*60}")
-        time.sleep(1)
 
-    finally:
-        print("\nQuitting. Look over the data and Save.")
-        print("Don't forget to close the browser window when you are done.")
+        if left_for_review:
+            print(f"\nDone. Look over the data and Save: {', '.join(left_for_review)}")
+            print("Each form is in its own browser window; close them when you are done.")
+        else:
+            print("\nDone.")
         print("Goodbye!")
-
+        return successful_uploads, failed_uploads
@@ -0,0 +1,274 @@
+"""
+Shared Unitas browser session
+Booting Firefox and logging in used to happen separately for every production
+upload, cooler log upload and status check. A UnitasSession owns one logged-in
+driver and lends it to each job in turn:
+
+    session = UnitasSession(config, idle_timeout=600)
+    with session as driver:
+        ...  # already logged in
+
+After a job the browser stays open for idle_timeout seconds, so the next job
+(another date, the cooler log a minute later) starts right away. Jobs from
+different threads (scheduler, trigger-file watcher) are run one at a time.
+
+WarmUnitasSession goes further for the automation service's warm browser
+mode: it starts the browser before the first job and keeps it ready.
+"""
+import threading
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.firefox.service import Service
+from webdriver_manager.firefox import GeckoDriverManager
+
+from unitas_login import login, is_logged_in
+
+_geckodriver_path = None
+_geckodriver_lock = threading.Lock()
+
+
+def geckodriver_path():
+    """Path to geckodriver, resolved by GeckoDriverManager once per process"""
+    global _geckodriver_path
+    with _geckodriver_lock:
+        if _geckodriver_path is None:
+            _geckodriver_path = GeckoDriverManager().install()
+        return _geckodriver_path
+
+
+def make_driver(headless: bool = False):
+    options = webdriver.FirefoxOptions()
+    if headless:
+        options.add_argument("--headless")
+    return webdriver.Firefox(
+        service=Service(geckodriver_path()),
+        options=options
+    )
+
+
+class UnitasSession:
+    """One logged-in Firefox shared by the Unitas jobs
+
+    idle_timeout: seconds to keep the browser after a job; 0 quits it as soon
+    as the job ends, None leaves it open until close() (so a person can look
+    over a filled form).
+    """
+
+    def __init__(self, secrets, headless=False, idle_timeout=600):
+        self.secrets = secrets
+        self.headless = headless
+        self.idle_timeout = idle_timeout
+        self._lock = threading.RLock()
+        self._driver = None
+        self._idle_timer = None
+        self._depth = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            self._depth += 1
+            self._cancel_idle_timer()
+            return self.driver()
+        except Exception:
+            self._depth -= 1
+            self._lock.release()
+            raise
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._depth -= 1
+            if isinstance(exc, WebDriverException) and self._driver is not None and not self._alive():
+                # Browser crashed or was closed - start fresh next time
+                self._quit()
+            elif self._depth == 0:
+                self._release()
+        finally:
+            self._lock.release()
+        return False
+
+    def driver(self):
+        """Return the logged-in driver, starting the browser if needed"""
+        with self._lock:
+            if self._driver is not None and not self._alive():
+                print("[Unitas] Browser is gone, starting a new one")
+                self._quit()
+            if self._driver is None:
+                started = time.monotonic()
+                driver = make_driver(self.headless)
+                try:
+                    login(driver, self.secrets)
+                except Exception:
+                    driver.quit()
+                    raise
+                self._driver = driver
+                print(f"[Unitas] Browser ready in {time.monotonic() - started:.1f}s")
+            return self._driver
+
+    def detach(self):
+        """Hand the browser over to a person (a filled form waiting for Save)
+
+        The session forgets it without quitting it: it is not reused for the
+        next job and not closed by the idle timer. The next job starts a new one.
+        """
+        with self._lock:
+            if self._driver is not None:
+                print("[Unitas] Leaving this browser window open for review")
+            self._cancel_idle_timer()
+            self._driver = None
+
+    def close(self):
+        """Quit the browser now"""
+        with self._lock:
+            self._cancel_idle_timer()
+            self._quit()
+
+    def _alive(self):
+        try:
+            self._driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _release(self):
+        if self._driver is None or self.idle_timeout is None:
+            return
+        if self.idle_timeout <= 0:
+            self._quit()
+            return
+        timer = threading.Timer(self.idle_timeout, lambda: self._close_if_idle(timer))
+        timer.daemon = True
+        self._idle_timer = timer
+        timer.start()
+
+    def _close_if_idle(self, timer):
+        with self._lock:
+            # A job may have started (and finished) while this timer waited for the lock
+            if timer is self._idle_timer and self._depth == 0 and self._driver is not None:
+                self._idle_timer = None
+                print(f"[Unitas] Closing browser after {self.idle_timeout}s idle")
+                self._quit()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _quit(self):
+        if self._driver is None:
+            return
+        try:
+            self._driver.quit()
+        except WebDriverException:
+            pass
+        self._driver = None
+
+
+class WarmUnitasSession(UnitasSession):
+    """A UnitasSession that keeps one headless, logged-in browser ready between jobs
+
+    start() runs a background thread that opens the browser up front and,
+    while no job is using it:
+      - every check_interval seconds checks it still responds and is still
+        logged in (logging in again if Unitas dropped the session)
+      - replaces it after max_jobs jobs or max_age seconds, to bound Firefox's
+        memory growth (0 = no limit)
+      - starts a new one right away when it crashed or failed a check
+    so a job normally gets a ready driver instead of waiting for Firefox.
+
+    Nobody can look at a headless browser, so production forms filled in it
+    are always saved and confirmed (see SeleniumUnitasClient); a form is never
+    left waiting for a manual Save.
+    """
+
+    def __init__(self, secrets, max_jobs=50, max_age=7200, check_interval=300):
+        super().__init__(secrets, headless=True, idle_timeout=None)
+        self.max_jobs = max_jobs
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self._jobs = 0
+        self._started_at = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start keeping the browser warm in the background"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._maintain, name="unitas-warm-browser", daemon=True)
+            self._thread.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._depth == 1:
+            self._jobs += 1
+        try:
+            return super().__exit__(exc_type, exc, tb)
+        finally:
+            # Recycle or replace the browser now, not when the next job needs it
+            self._wake.set()
+
+    def driver(self):
+        with self._lock:
+            previous = self._driver
+            driver = super().driver()
+            if driver is not previous:
+                self._jobs = 0
+                self._started_at = time.monotonic()
+            return driver
+
+    def detach(self):
+        # Nobody can review a headless window: drop it and have a fresh one started
+        with self._lock:
+            print("[Unitas] Warm browser can't be handed over for review, replacing it")
+            self._quit()
+        self._wake.set()
+
+    def close(self):
+        self._stopped.set()
+        self._wake.set()
+        super().close()
+
+    def _recycle_due(self):
+        if self.max_jobs and self._jobs >= self.max_jobs:
+            return f"after {self._jobs} jobs"
+        if self.max_age and time.monotonic() - self._started_at >= self.max_age:
+            return f"after {(time.monotonic() - self._started_at) / 60:.0f} min"
+        return None
+
+    def _check(self):
+        """Make sure the browser responds and is logged in; False if it has to be replaced"""
+        if not self._alive():
+            print("[Unitas] Warm browser is gone, starting a new one")
+            return False
+        if not is_logged_in(self._driver, self.secrets):
+            print("[Unitas] Warm browser was logged out, logging in again")
+            login(self._driver, self.secrets)
+        return True
+
+    def _maintain(self):
+        next_check = 0.0
+        while not self._stopped.is_set():
+            # Blocks while a job holds the browser
+            with self._lock:
+                if self._stopped.is_set():
+                    break
+                try:
+                    if self._driver is not None:
+                        reason = self._recycle_due()
+                        if reason:
+                            print(f"[Unitas] Recycling warm browser {reason}")
+                            self._quit()
+                        elif time.monotonic() >= next_check:
+                            if not self._check():
+                                self._quit()
+                            next_check = time.monotonic() + self.check_interval
+                    if self._driver is None:
+                        self.driver()
+                        next_check = time.monotonic() + self.check_interval
+                except Exception as e:
+                    # Try again at the next check; a job in between starts its own browser
+                    print(f"[Unitas] Warm browser not ready: {e}")
+                    self._quit()
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
@@ -0,0 +1,224 @@
+"""
+Condition-based waits for the Unitas pages
+Each wait returns as soon as the page is ready instead of sleeping a fixed
+time, and StepTimer records how long each step of an upload took.
+
+    timer = StepTimer("2025-10-04")
+    with timer.step("open form"):
+        ...
+    timer.report()
+"""
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import unitas_helper
+
+DEFAULT_TIMEOUT = 10
+POLL_INTERVAL = 0.1
+NETWORK_QUIET_MS = 500
+
+# Counts in-flight fetch/XHR requests so network_idle() can tell when the app
+# has finished talking to the server. Installed once per page load.
+NETWORK_TRACKER_SCRIPT = """
+if (!window.__unitasNet) {
+    var net = window.__unitasNet = {pending: 0, last: Date.now()};
+    function done() { net.pending = Math.max(0, net.pending - 1); net.last = Date.now(); }
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function() {
+            net.pending++; net.last = Date.now();
+            return origFetch.apply(this, arguments).then(
+                function(r) { done(); return r; },
+                function(e) { done(); throw e; });
+        };
+    }
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        net.pending++; net.last = Date.now();
+        this.addEventListener('loadend', done);
+        return origSend.apply(this, arguments);
+    };
+}
+"""
+
+NETWORK_STATE_SCRIPT = """
+var net = window.__unitasNet;
+return [document.readyState, net ? net.pending : -1, net ? Date.now() - net.last : 0];
+"""
+
+# Where Unitas reports the outcome of a save
+SAVE_MESSAGE_SELECTOR = "[role='alert'], [role='status'], .toast, [data-cy='toast']"
+# A message whose text or class contains one of these reports a failed save
+SAVE_ERROR_WORDS = ("error", "fail", "invalid", "required", "could not", "unable", "danger")
+
+
+def _timeout(timeout):
+    if timeout is not None:
+        return timeout
+    return unitas_helper.TIMEOUT or DEFAULT_TIMEOUT
+
+
+def _wait(driver, timeout):
+    return WebDriverWait(
+        driver, _timeout(timeout), poll_frequency=POLL_INTERVAL,
+        ignored_exceptions=(StaleElementReferenceException, NoSuchElementException),
+    )
+
+
+def install_network_tracker(driver):
+    """Start counting fetch/XHR requests on the current page"""
+    driver.execute_script(NETWORK_TRACKER_SCRIPT)
+
+
+def network_idle(driver, quiet_ms=NETWORK_QUIET_MS, timeout=None):
+    """Wait until the page is loaded and no request has been in flight for quiet_ms
+
+    Installs the request tracker if this page doesn't have it yet; requests
+    already running at that point are not seen, so the quiet period starts then.
+    """
+    install_network_tracker(driver)
+
+    def idle(d):
+        ready_state, pending, quiet_for = d.execute_script(NETWORK_STATE_SCRIPT)
+        return ready_state == "complete" and pending == 0 and quiet_for >= quiet_ms
+
+    return _wait(driver, timeout).until(idle)
+
+
+def network_settled(driver, quiet_ms=NETWORK_QUIET_MS, timeout=None):
+    """network_idle() for when the page is already usable: returns False instead of raising on timeout
+
+    A page that keeps polling never goes quiet; that should cost the timeout, not fail the step.
+    """
+    try:
+        network_idle(driver, quiet_ms=quiet_ms, timeout=timeout)
+        return True
+    except TimeoutException:
+        print(f"Network still busy after {_timeout(timeout)}s, carrying on")
+        return False
+
+
+def element_stable(driver, locator, timeout=None):
+    """Wait until the element is visible and its position/size stopped changing
+
+    Use after scrolling or when a panel animates open. Returns the element.
+    """
+    last = {}
+
+    def stable(d):
+        el = d.find_element(*locator)
+        if not el.is_displayed():
+            return False
+        rect = el.rect
+        previous, last["rect"] = last.get("rect"), rect
+        return el if rect == previous else False
+
+    return _wait(driver, timeout).until(stable)
+
+
+def dropdown_rendered(driver, locator, timeout=None):
+    """Wait until a <select> has its options (more than a placeholder). Returns the element."""
+    def rendered(d):
+        el = d.find_element(*locator)
+        options = el.find_elements(By.TAG_NAME, "option")
+        return el if el.is_enabled() and len(options) > 1 else False
+
+    return _wait(driver, timeout).until(rendered)
+
+
+def option_available(driver, select_locator, value, timeout=None):
+    """Wait until a <select> offers an option with the given value. Returns the element."""
+    def available(d):
+        el = d.find_element(*select_locator)
+        return el if el.find_elements(By.CSS_SELECTOR, f"option[value='{value}']") else False
+
+    return _wait(driver, timeout).until(available)
+
+
+def gone(driver, locator, timeout=None):
+    """Wait until nothing matches locator (e.g. a popup closed)"""
+    return _wait(driver, timeout).until(EC.invisibility_of_element_located(locator))
+
+
+def _save_message(el):
+    """'saved' or 'error' for a displayed message element with text, else None"""
+    if not el.is_displayed():
+        return None
+    text = el.text.strip()
+    if not text:
+        return None
+    described = " ".join([text, el.get_attribute("class") or "", el.get_attribute("data-cy") or ""]).lower()
+    return "error" if any(word in described for word in SAVE_ERROR_WORDS) else "saved"
+
+
+def click_save(driver, save_button, timeout=None):
+    """Click Save and wait for Unitas to confirm it, then for the network to settle
+
+    Confirmed means the URL changed, the form closed (the Save button went
+    away), or a message that wasn't on the page before the click appeared and
+    doesn't report an error. A Save button that is only disabled while the
+    request runs proves nothing. Returns False on an error message, or if
+    nothing confirmed the save within the timeout.
+    """
+    url_before = driver.current_url
+    shown_before = {el.id for el in driver.find_elements(By.CSS_SELECTOR, SAVE_MESSAGE_SELECTOR)}
+    save_button.click()
+
+    def outcome(d):
+        if d.current_url != url_before:
+            return "saved"
+        for el in d.find_elements(By.CSS_SELECTOR, SAVE_MESSAGE_SELECTOR):
+            if el.id in shown_before:
+                continue
+            result = _save_message(el)
+            if result == "error":
+                print(f"Unitas rejected the save: {el.text.strip()}")
+            if result:
+                return result
+        try:
+            return "saved" if not save_button.is_displayed() else False
+        except StaleElementReferenceException:
+            return "saved"
+
+    try:
+        result = _wait(driver, timeout).until(outcome)
+    except TimeoutException:
+        return False
+    if result != "saved":
+        return False
+    network_settled(driver, timeout=timeout)
+    return True
+
+
+def scroll_into_view(driver, element):
+    """Scroll element to the middle of the viewport without animation"""
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+
+
+class StepTimer:
+    """Wall-clock time per named step of one upload"""
+
+    def __init__(self, label):
+        self.label = label
+        self.steps = []
+
+    @contextmanager
+    def step(self, name):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.monotonic() - started))
+
+    def total(self):
+        return sum(seconds for _, seconds in self.steps)
+
+    def report(self):
+        parts = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.steps)
+        print(f"[Timing] {self.label}: {self.total():.1f}s ({parts})")
+
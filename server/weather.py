@@ -0,0 +1,188 @@
+"""
+NWS weather lookup with a background-refreshed cache
+Request handlers read weather from the cache only; a daemon thread keeps it
+fresh so a slow api.weather.gov never stalls a page load.
+"""
+import threading
+import time
+
+from server import metrics
+
+NWS_BASE_URL = "https://api.weather.gov"
+USER_AGENT = "FarmDataLogger/1.0"
+
+# Map NWS observation text to our weather options (first match wins)
+WEATHER_MAPPING = {
+    'sunny': 'Sunny',
+    'clear': 'Sunny',
+    'fair': 'Sunny',
+    'partly cloudy': 'Partly Cloudy',
+    'partly sunny': 'Partly Sunny',
+    'mostly cloudy': 'Mostly Cloudy',
+    'cloudy': 'Cloudy',
+    'overcast': 'Cloudy',
+    'rain': 'Rain',
+    'showers': 'Rain',
+    'drizzle': 'Rain',
+    'thunderstorm': 'Severe Storm',
+    'storm': 'Severe Storm',
+    'snow': 'Snow',
+    'sleet': 'Sleet',
+    'freezing': 'Freezing Rain',
+    'wind': 'Cloudy/Windy',
+}
+
+
+def map_nws_description(text_description):
+    """Map an NWS textDescription to one of our weather options, or None"""
+    if not text_description:
+        return None
+    text_lower = text_description.lower()
+    for key, value in WEATHER_MAPPING.items():
+        if key in text_lower:
+            return value
+    return None
+
+
+def fetch_nws_weather(station_id, base_url=NWS_BASE_URL, timeout=10):
+    """Fetch current weather from National Weather Service station
+
+    Blocking network call - request handlers should use WeatherService.get() instead.
+    Returns the mapped weather option, or None if unavailable.
+    """
+    # Imported here so the web app doesn't pay for requests at startup;
+    # only the background refresher thread ever calls this.
+    import requests
+
+    try:
+        obs_url = f"{base_url.rstrip('/')}/stations/{station_id}/observations/latest"
+        headers = {'User-Agent': USER_AGENT}
+
+        with metrics.time_outbound("nws"):
+            obs_response = requests.get(obs_url, headers=headers, timeout=timeout)
+        if obs_response.status_code != 200:
+            print(f"[Weather] Bad response code from {obs_url}: {obs_response.status_code}")
+            return None
+
+        text_description = obs_response.json()['properties'].get('textDescription')
+        weather = map_nws_description(text_description)
+        if weather is None:
+            print(f"[Weather] No match found for '{text_description}'")
+        return weather
+
+    except Exception as e:
+        print(f"[Weather] Error fetching weather for {station_id}: {e}")
+        return None
+
+
+class WeatherService:
+    """TTL cache of current weather per station with a background refresher
+
+    get() never blocks on the network: it returns the cached value (even if it
+    is past its TTL, as long as it is younger than max_stale) and asks the
+    refresher thread to revalidate stale or missing entries.
+    """
+
+    def __init__(self, base_url=NWS_BASE_URL, ttl=15 * 60, max_stale=3 * 60 * 60,
+                 retry_interval=60, timeout=10):
+        self.base_url = base_url
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._entries = {}        # station_id -> (weather, fetched_at)
+        self._last_attempt = {}   # station_id -> monotonic time of last fetch attempt
+        self._stations = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ─── Request path ───
+    def get(self, station_id):
+        """Return cached weather for station_id, or None if nothing usable is cached"""
+        if not station_id:
+            return None
+        self.watch(station_id)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(station_id)
+        if entry is None:
+            return None
+
+        weather, fetched_at = entry
+        age = now - fetched_at
+        if age >= self.ttl:
+            self._wake.set()  # stale-while-revalidate
+        if age >= self.max_stale:
+            return None
+        return weather
+
+    def watch(self, station_id):
+        """Register a station for background refresh and make sure the refresher is running"""
+        if not station_id:
+            return
+        with self._lock:
+            is_new = station_id not in self._stations
+            self._stations.add(station_id)
+        self.start()
+        if is_new:
+            self._wake.set()
+
+    # ─── Refresh path ───
+    def refresh(self, station_id):
+        """Fetch weather for station_id now and store it in the cache
+
+        Failed fetches leave the previous value in place so it can keep being
+        served until max_stale.
+        """
+        with self._lock:
+            self._last_attempt[station_id] = time.monotonic()
+        weather = fetch_nws_weather(station_id, base_url=self.base_url, timeout=self.timeout)
+        if weather is not None:
+            with self._lock:
+                self._entries[station_id] = (weather, time.monotonic())
+        return weather
+
+    def _due_stations(self):
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for station_id in self._stations:
+                entry = self._entries.get(station_id)
+                last_attempt = self._last_attempt.get(station_id)
+                if last_attempt is not None and now - last_attempt < self.retry_interval:
+                    continue
+                if entry is None or now - entry[1] >= self.ttl:
+                    due.append(station_id)
+        return due
+
+    def _run(self):
+        while not self._stop.is_set():
+            for station_id in self._due_stations():
+                self.refresh(station_id)
+            self._wake.wait(self.retry_interval)
+            self._wake.clear()
+
+    def start(self):
+        """Start the background refresher thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="weather-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the background refresher thread"""
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+# Process-wide instance used by the web app
+weather_service = WeatherService()
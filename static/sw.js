@@ -0,0 +1,63 @@
+// Service worker: keeps the data-entry page usable when the barn Wi-Fi drops.
+// The page and the read endpoints it needs to render are served network-first
+// with the last good response as fallback. Writes are never handled here -
+// the page queues them locally (window.syncQueue in base.html) and replays
+// them through /api/sync once the network is back.
+const CACHE_NAME = 'datalogger-v1';
+const APP_SHELL = ['/'];
+const CACHED_READS = [
+  '/api/date_data',
+  '/api/today_data',
+  '/get_defaults',
+  '/get_settings',
+  '/config',
+  '/get_current_pallet',
+  '/get_pallet_logs',
+  '/api/unuploaded_days',
+  '/api/failed_verification_days'
+];
+
+self.addEventListener('install', event => {
+  event.waitUntil(
+    caches.open(CACHE_NAME)
+      .then(cache => cache.addAll(APP_SHELL))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(keys.filter(key => key !== CACHE_NAME).map(key => caches.delete(key))))
+      .then(() => self.clients.claim())
+  );
+});
+
+function isCacheable(request) {
+  if (request.method !== 'GET') return false;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return false;
+  if (request.mode === 'navigate' || url.pathname === '/') return true;
+  return CACHED_READS.includes(url.pathname);
+}
+
+async function networkFirst(request) {
+  const cache = await caches.open(CACHE_NAME);
+  try {
+    const response = await fetch(request);
+    if (response.ok) {
+      cache.put(request, response.clone());
+    }
+    return response;
+  } catch (err) {
+    const cached = await cache.match(request) || (request.mode === 'navigate' ? await cache.match('/') : null);
+    if (cached) return cached;
+    throw err;
+  }
+}
+
+self.addEventListener('fetch', event => {
+  if (isCacheable(event.request)) {
+    event.respondWith(networkFirst(event.request));
+  }
+});
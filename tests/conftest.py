@@ -0,0 +1,33 @@
+"""
+Shared test setup
+Points the config directory at a temporary one before anything from server/
+is imported, and puts the directories the modules import each other from on
+sys.path (the same ones automation.py and webapp.py add).
+"""
+import os
+import sys
+import tempfile
+
+CONFIG_DIR = tempfile.mkdtemp(prefix="datalogger_tests_")
+os.environ['DATALOGGER_CONFIG_DIR'] = CONFIG_DIR
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (
+    project_dir,
+    os.path.join(project_dir, "server"),
+    os.path.join(project_dir, "server", "unitas_manager"),
+    os.path.join(project_dir, "benchmarks"),
+):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import pytest
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    """A freshly migrated database"""
+    import database_helper as db
+    path = tmp_path / "test.db"
+    db.setup_db(path)
+    return path
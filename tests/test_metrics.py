@@ -0,0 +1,40 @@
+import sqlite3
+
+import pytest
+
+from server import metrics
+
+
+@pytest.fixture
+def enabled():
+    metrics.configure(True)
+    yield
+    metrics.configure(False)
+
+
+def queries_in_request(run):
+    metrics.begin_request()
+    try:
+        run()
+        return metrics._local.db_queries
+    finally:
+        metrics._local.started = None
+
+
+def test_every_statement_is_counted(enabled):
+    conn = sqlite3.connect(":memory:", factory=metrics.connection_factory())
+
+    def run():
+        conn.executescript("CREATE TABLE t (x INTEGER);")
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(2,), (3,)])
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM t")
+        assert cur.fetchone() == (3,)
+
+    assert queries_in_request(run) == 4
+    conn.close()
+
+
+def test_plain_connection_when_disabled():
+    assert metrics.connection_factory() is None
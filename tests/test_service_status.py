@@ -0,0 +1,52 @@
+from server.service_status import FakeBackend, ServiceStatusProvider, parse_systemctl_show
+
+
+def make_provider(**kwargs):
+    backend = FakeBackend({"datalogger.service": {"ActiveState": "active", "SubState": "running"}})
+    return backend, ServiceStatusProvider(["datalogger", "xml-watcher"], backend=backend, **kwargs)
+
+
+def test_one_systemctl_call_for_all_services():
+    backend, provider = make_provider()
+    statuses = provider.get_status()
+    assert statuses == {
+        "datalogger": {"active": "active", "sub_state": "running"},
+        "xml-watcher": {"active": "inactive", "sub_state": "dead"},
+    }
+    assert len(backend.calls) == 1
+    assert backend.calls[0][:2] == ["systemctl", "show"]
+
+
+def test_cached_until_ttl_or_invalidate():
+    backend, provider = make_provider(ttl=60)
+    provider.get_status()
+    provider.get_status()
+    assert len(backend.calls) == 1
+    provider.invalidate()
+    provider.get_status()
+    assert len(backend.calls) == 2
+
+
+def test_subscribers_hear_about_changes():
+    backend, provider = make_provider()
+    changes = []
+    provider.subscribe(lambda name, old, new: changes.append((name, old["active"], new["active"])))
+    provider.refresh()
+    backend.set_state("xml-watcher.service", "active", "running")
+    provider.refresh()
+    assert changes == [("xml-watcher", "inactive", "active")]
+
+
+def test_serves_previous_states_when_refresh_fails():
+    backend, provider = make_provider(ttl=0)
+    first = provider.get_status()
+    backend.delay = 10  # longer than the timeout: the fake raises TimeoutExpired
+    assert provider.get_status() == first
+
+
+def test_parse_falls_back_to_request_order_without_id():
+    output = "ActiveState=active\nSubState=running\n\nActiveState=failed\nSubState=failed\n"
+    assert parse_systemctl_show(output, ["a.service", "b.service"]) == {
+        "a.service": {"active": "active", "sub_state": "running"},
+        "b.service": {"active": "failed", "sub_state": "failed"},
+    }
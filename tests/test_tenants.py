@@ -0,0 +1,21 @@
+import database_helper as db
+from server.config import load_config, save_config
+from server.tenants import HouseRegistry
+
+
+def test_evicted_house_drops_its_calendar(tmp_path):
+    config = load_config()
+    saved = dict(config)
+    config["houses"] = {f"barn{i}": str(tmp_path / f"barn{i}") for i in range(3)}
+    config["system"] = dict(config["system"], max_open_houses=2)
+    save_config(config)
+    try:
+        registry = HouseRegistry()
+        first = registry.get("barn0").db_file
+        assert str(first) in db._calendar_sources
+        registry.get("barn1").db_file
+        registry.get("barn2").db_file
+        assert str(first) not in db._calendar_sources
+        assert len([path for path in db._calendar_sources if path.startswith(str(tmp_path))]) == 2
+    finally:
+        save_config(saved)
@@ -0,0 +1,177 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+import mock_unitas
+from unitas_client import UnitasClientError, SeleniumUnitasClient, make_unitas_client
+from unitas_http import UnitasHttpClient, production_payload, coolerlog_payload, _acknowledged
+from unitas_production import production_changes, production_snapshot
+from unitas_session import UnitasSession
+
+DAY = "2025-10-02"
+
+VALUES = {
+    "mortality_indoor": "2",
+    "total_eggs": "10250",
+    "cull_reason": "S Sick, N Natural",
+    "mortality_reason": "",
+    "lights_on_hh": "4",
+    "lights_on_mm": "30",
+    "door_open_hh": "",
+    "door_open_mm": "",
+    "comment": "ok",
+}
+
+
+@pytest.fixture
+def unitas():
+    state = mock_unitas.MockUnitas("user", "secret", days_listed=14)
+    server = mock_unitas.make_server("127.0.0.1", 0, state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+class CatchAllHandler(BaseHTTPRequestHandler):
+    """Answers every path with 200 text/html, like an SPA catch-all route"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _page(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", "13")
+        self.end_headers()
+        self.wfile.write(b"<html></html>")
+
+    do_GET = do_POST = do_PUT = _page
+
+
+@pytest.fixture
+def catch_all():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CatchAllHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(unitas, password="secret"):
+    return UnitasHttpClient({
+        "Unitas_Username": "user",
+        "Unitas_Password": password,
+        "Unitas_Base_URL": unitas.base_url,
+        "Farm_ID": "101",
+        "House_ID": "1",
+        "Timeout": "5",
+        "Cooler_Log_Initials": "AB",
+    })
+
+
+def test_production_payload_maps_fields_and_times():
+    assert production_payload(VALUES) == {
+        "V33-H1": "2",
+        "V4-H1": "10250",
+        "V60-H1": ["S Sick", "N Natural"],
+        "Comment-H1": "ok",
+        "V99-H1": "04:30",
+    }
+
+
+def test_production_payload_only_changed_fields():
+    changed = {"lights_on_mm", "comment"}
+    values = dict(VALUES, lights_on_mm="45", comment="")
+    # A cleared field is sent empty so Unitas clears it too
+    assert production_payload(values, changed) == {"Comment-H1": "", "V99-H1": "04:45"}
+
+
+def test_production_changes_ignores_reason_order():
+    previous = production_snapshot(VALUES)
+    assert production_changes(previous, dict(VALUES, cull_reason="N Natural,S Sick")) == set()
+    assert production_changes(previous, dict(VALUES, total_eggs=10251)) == {"total_eggs"}
+
+
+def test_submit_production_saves_the_day(unitas):
+    with make_client(unitas) as client:
+        assert client.submit_production(DAY, VALUES) is True
+    assert unitas.production_fields(DAY)["V4-H1"] == "10250"
+    assert unitas.status(DAY) == "complete"
+
+
+def test_submit_production_sends_only_changes(unitas):
+    with make_client(unitas) as client:
+        client.submit_production(DAY, VALUES)
+        previous = production_snapshot(VALUES)
+        client.submit_production(DAY, dict(VALUES, total_eggs="9999"), previous)
+    fields = unitas.production_fields(DAY)
+    assert fields["V4-H1"] == "9999"
+    assert fields["Comment-H1"] == "ok"
+
+
+def test_daily_statuses(unitas):
+    unitas.save_production(DAY, {"V4-H1": "1"})
+    with make_client(unitas) as client:
+        statuses = client.daily_statuses([DAY, "2025-10-03", "1999-01-01"])
+    assert statuses[DAY] == "Complete"
+    assert statuses["1999-01-01"] == "Not Found"
+
+
+def test_logs_in_again_when_the_session_expires(unitas):
+    with make_client(unitas) as client:
+        client.submit_production(DAY, VALUES)
+        with unitas.lock:
+            unitas.tokens.clear()
+        client.submit_coolerlog(DAY, [("6", "05", 45.1, "18", "10", 44.9, "30", ""), None])
+    assert unitas.coolerlog[DAY]["AMCheck-H1"] == "06:05"
+    assert unitas.coolerlog[DAY]["PMInitial-H1"] == "AB"
+
+
+def test_bad_login_raises_client_error(unitas):
+    with make_client(unitas, password="wrong") as client:
+        with pytest.raises(UnitasClientError):
+            client.daily_statuses([DAY])
+
+
+def test_html_answers_are_not_success(catch_all):
+    client = UnitasHttpClient({"Unitas_Username": "user", "Unitas_Password": "secret",
+                               "Unitas_Base_URL": catch_all, "Farm_ID": "101", "House_ID": "1"})
+    with client:
+        with pytest.raises(UnitasClientError):
+            client.login()
+        # Even past the login, an HTML page is not a saved form
+        client._logged_in = True
+        with pytest.raises(UnitasClientError):
+            client.submit_production(DAY, VALUES)
+        with pytest.raises(UnitasClientError):
+            client.submit_coolerlog(DAY, [("6", "05", 45.1, "", "", None, "30", ""), None])
+
+
+def test_draft_is_not_a_save(unitas):
+    with make_client(unitas) as client:
+        response = client._request("PUT", client._url("production_daily", date=DAY),
+                                   json={"fields": {}, "draft": True})
+        assert response.json() == {"status": "draft"}
+    with pytest.raises(UnitasClientError):
+        _acknowledged(response, "production")
+
+
+def test_http_client_refused_for_the_live_site():
+    from server.config import get_flat_config
+    secrets = dict(get_flat_config(), Unitas_Client="http", Unitas_Base_URL="https://vitalfarms.poultrycloud.com")
+    client = make_unitas_client(secrets, UnitasSession(secrets))
+    assert isinstance(client, SeleniumUnitasClient)
+
+
+def test_coolerlog_payload_drops_empty_fields():
+    values = [("6", "5", 45.0, "", "", None, "30", ""), None]
+    assert coolerlog_payload(values, "AB") == {
+        "AMCheck-H1": "06:05",
+        "AMTemp-H1": 45.0,
+        "AMInitial-H1": "AB",
+        "PMInitial-H1": "AB",
+        "EggsPick-H1": "30",
+    }
@@ -0,0 +1,122 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+import database_helper as db
+import unitas_production as production
+from unitas_client import UnitasClient
+
+DAY = "2025-10-02"
+
+
+class FakeClient(UnitasClient):
+    """Records submissions; saves them (as Unitas would confirm) when saves=True"""
+
+    name = "fake"
+
+    def __init__(self, saves=True):
+        self.saves = saves
+        self.submitted = []
+        self.verified = []
+
+    def daily_statuses(self, dates):
+        self.verified.append(list(dates))
+        return {d: "Complete" for d in dates}
+
+    def submit_production(self, date_str, values, previous=None):
+        self.submitted.append((date_str, previous))
+        return self.saves
+
+    def submit_coolerlog(self, date_str, values):
+        pass
+
+
+@pytest.fixture
+def day_to_send(db_file):
+    conn = sqlite3.connect(db_file)
+    conn.execute("INSERT INTO Daily_User_Log (date, total_eggs, mortality_indoor, send_to_bot, version) "
+                 "VALUES (?, 10000, 1, 1, 1)", (DAY,))
+    conn.execute("INSERT INTO Daily_Bot_Log (date, feed_consumption, lights_on, lights_off, version) "
+                 "VALUES (?, 1000, '04:30', '20:00', 1)", (DAY,))
+    conn.commit()
+    conn.close()
+    return db_file
+
+
+def upload(db_file, client, verify=True):
+    return production.run_unitas_stuff({}, db_file, target_date=DAY, client=client, verify=verify)
+
+
+def resend(db_file, **changes):
+    db.clear_unitas_send_timestamp(db_file, DAY)
+    if changes:
+        db.update_daily_user_log(db_file, DAY, changes)
+
+
+def test_confirmed_save_is_remembered(day_to_send):
+    client = FakeClient()
+    assert upload(day_to_send, client) == ([DAY], {})
+    snapshot = db.get_unitas_submission(day_to_send, DAY)["snapshot"]
+    assert snapshot["total_eggs"] == "10000"
+
+    # A re-send fills only what changed since
+    resend(day_to_send, total_eggs=10100)
+    upload(day_to_send, client)
+    assert client.submitted[-1] == (DAY, snapshot)
+
+
+def test_unchanged_day_skips_the_client(day_to_send):
+    upload(day_to_send, FakeClient())
+    resend(day_to_send)
+    client = FakeClient()
+    assert upload(day_to_send, client) == ([DAY], {})
+    assert client.submitted == []
+    conn = sqlite3.connect(day_to_send)
+    (sent_at,) = conn.execute("SELECT sent_to_unitas_at FROM Daily_User_Log WHERE date = ?", (DAY,)).fetchone()
+    conn.close()
+    assert sent_at is not None
+
+
+def test_form_left_for_review_is_filled_in_full_next_time(day_to_send):
+    upload(day_to_send, FakeClient())
+    resend(day_to_send, total_eggs=10100)
+    upload(day_to_send, FakeClient(saves=False))
+    assert db.get_unitas_submission(day_to_send, DAY) is None
+
+    client = FakeClient()
+    resend(day_to_send)
+    upload(day_to_send, client)
+    assert client.submitted == [(DAY, None)]
+
+
+def test_cleared_field_is_emptied_on_the_form(day_to_send):
+    db.update_daily_user_log(day_to_send, DAY, {"comments": "x"})
+    before = production.production_values(day_to_send, DAY)
+    previous = production.production_snapshot(before)
+    db.update_daily_user_log(day_to_send, DAY, {"comments": ""})
+    values = production.production_values(day_to_send, DAY)
+
+    changed = production.production_changes(previous, values)
+    assert changed == {"comment"}
+    fields = production.production_form_fields(values, changed, clear=True)
+    assert fields == [{"key": "Comment-H1", "id": "Comment-H1", "data_cy": None, "value": ""}]
+    # A full fill leaves empty fields alone
+    assert production.production_form_fields(values, {"comment"}) == [None]
+
+
+def test_verification_only_when_asked(day_to_send):
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    conn = sqlite3.connect(day_to_send)
+    conn.execute("INSERT INTO Daily_User_Log (date, sent_to_unitas_at, version) VALUES (?, '2025-01-01', 1)",
+                 (yesterday,))
+    conn.commit()
+    conn.close()
+
+    client = FakeClient()
+    upload(day_to_send, client, verify=False)
+    assert client.submitted and client.verified == []
+
+    production.verify_uploads({}, day_to_send, client=client)
+    assert client.verified == [[yesterday]]
+    assert db.get_daily_user_log(day_to_send, yesterday)["verified_at"]
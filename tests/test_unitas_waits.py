@@ -0,0 +1,74 @@
+import unitas_waits as waits
+
+
+class FakeElement:
+    def __init__(self, id, text="", css_class="", displayed=True):
+        self.id = id
+        self.text = text
+        self.css_class = css_class
+        self.displayed = displayed
+
+    def is_displayed(self):
+        return self.displayed
+
+    def get_attribute(self, name):
+        return self.css_class if name == "class" else None
+
+
+class FakeSaveButton(FakeElement):
+    """Clicking runs on_click(driver), standing in for the page's response to Save"""
+
+    def __init__(self, driver, on_click):
+        super().__init__("save", "Save")
+        self.driver = driver
+        self.on_click = on_click
+        self.enabled = True
+
+    def click(self):
+        self.on_click(self.driver, self)
+
+    def is_enabled(self):
+        return self.enabled
+
+
+class FakeDriver:
+    def __init__(self, messages=()):
+        self.current_url = "https://unitas.test/farm/production"
+        self.messages = list(messages)
+
+    def find_elements(self, by, selector):
+        return list(self.messages)
+
+    def execute_script(self, script, *args):
+        # The network tracker reports a loaded, quiet page
+        return ["complete", 0, 10_000]
+
+
+def save(on_click, messages=()):
+    driver = FakeDriver(messages)
+    return waits.click_save(driver, FakeSaveButton(driver, on_click), timeout=0.3)
+
+
+def test_new_success_message_confirms():
+    assert save(lambda d, b: d.messages.append(FakeElement("t1", "Saved")))
+
+
+def test_form_closing_or_navigation_confirms():
+    def close(d, button):
+        button.displayed = False
+    assert save(close)
+    assert save(lambda d, b: setattr(d, "current_url", "https://unitas.test/farm/production?saved=1"))
+
+
+def test_error_message_is_a_failure():
+    assert not save(lambda d, b: d.messages.append(FakeElement("t1", "Save failed")))
+    assert not save(lambda d, b: d.messages.append(FakeElement("t1", "Total eggs", css_class="toast-danger")))
+
+
+def test_message_already_on_the_page_does_not_confirm():
+    old = FakeElement("old", "Saved")
+    assert not save(lambda d, b: None, messages=[old])
+
+
+def test_disabled_button_alone_does_not_confirm():
+    assert not save(lambda d, button: setattr(button, "enabled", False))
@@ -0,0 +1,26 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import database_helper as db
+
+
+def test_verify_jobs_are_queued_once_per_day(db_file):
+    first = db.enqueue_upload_job(db_file, "verify", "2025-10-02")
+    assert db.enqueue_upload_job(db_file, "verify", "2025-10-02") == first
+
+
+def test_prune_removes_only_old_finished_jobs(db_file):
+    old = (datetime.now() - timedelta(days=40)).isoformat(timespec="seconds")
+    jobs = {status: db.enqueue_upload_job(db_file, "production", f"2025-09-0{i}")
+            for i, status in enumerate(("done", "failed", "superseded", "pending"), start=1)}
+    recent = db.enqueue_upload_job(db_file, "production", "2025-09-09")
+    db.complete_upload_job(db_file, recent)
+    conn = sqlite3.connect(db_file)
+    for status, job_id in jobs.items():
+        conn.execute("UPDATE Upload_Jobs SET status = ?, updated_at = ? WHERE id = ?", (status, old, job_id))
+    conn.commit()
+
+    assert db.prune_upload_jobs(db_file, keep_days=30) == 3
+    left = {row[0] for row in conn.execute("SELECT id FROM Upload_Jobs")}
+    conn.close()
+    assert left == {jobs["pending"], recent}
@@ -0,0 +1,96 @@
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from server.weather import WeatherService, map_nws_description
+
+
+class FakeNWS:
+    """Serves /stations/<id>/observations/latest from a dict of descriptions"""
+
+    def __init__(self):
+        self.descriptions = {}
+        self.status = 200
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                fake.requests.append(self.path)
+                station = self.path.split("/")[2]
+                body = json.dumps({"properties": {"textDescription": fake.descriptions.get(station)}}).encode()
+                self.send_response(fake.status)
+                self.send_header("Content-Type", "application/geo+json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def nws():
+    fake = FakeNWS()
+    yield fake
+    fake.close()
+
+
+def test_map_nws_description():
+    assert map_nws_description("Partly Cloudy") == "Partly Cloudy"
+    assert map_nws_description("Light Rain and Fog") == "Rain"
+    assert map_nws_description("Clear") == "Sunny"
+    assert map_nws_description("Haze") is None
+    assert map_nws_description(None) is None
+
+
+def test_refresh_fills_the_cache(nws):
+    nws.descriptions["KMPR"] = "Mostly Cloudy"
+    service = WeatherService(base_url=nws.base_url)
+    assert service.refresh("KMPR") == "Mostly Cloudy"
+    assert nws.requests == ["/stations/KMPR/observations/latest"]
+    assert service.get("KMPR") == "Mostly Cloudy"
+    service.stop(timeout=1)
+
+
+def test_failed_fetch_keeps_the_previous_value(nws):
+    nws.descriptions["KMPR"] = "Sunny"
+    service = WeatherService(base_url=nws.base_url)
+    service.refresh("KMPR")
+    nws.status = 503
+    assert service.refresh("KMPR") is None
+    assert service.get("KMPR") == "Sunny"
+    service.stop(timeout=1)
+
+
+def test_too_stale_value_is_not_served(nws):
+    nws.descriptions["KMPR"] = "Snow"
+    service = WeatherService(base_url=nws.base_url, ttl=0, max_stale=0)
+    service.refresh("KMPR")
+    assert service.get("KMPR") is None
+    service.stop(timeout=1)
+
+
+def test_background_refresher_fetches_watched_stations(nws):
+    nws.descriptions["KMPR"] = "Thunderstorm"
+    service = WeatherService(base_url=nws.base_url)
+    try:
+        service.watch("KMPR")
+        for _ in range(50):
+            if service.get("KMPR"):
+                break
+            time.sleep(0.05)
+        assert service.get("KMPR") == "Severe Storm"
+    finally:
+        service.stop(timeout=1)
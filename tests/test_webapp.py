@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client():
+    import webapp
+    assert webapp.STARTUP_ERROR is None
+    return webapp.app.test_client()
+
+
+@pytest.fixture(scope="module")
+def pallet_id(client):
+    import webapp
+    response = client.post("/add_pallet", json={"pallet_id": "P-100", "weight": "1100", "yolk_color": "5"})
+    assert response.status_code == 200
+    conn = sqlite3.connect(webapp.DB_FILE)
+    (row_id,) = conn.execute("SELECT MAX(id) FROM Pallet_Log").fetchone()
+    conn.close()
+    return row_id
+
+
+def test_config_round_trip(client):
+    assert client.get("/config").status_code == 200
+    response = client.post("/save_settings", json={
+        "hatch_date": "2025-03-05", "birds_arrived_date": "2025-06-01", "nws_station_id": "",
+        "floor_eggs_through_belt": False, "pallet_tare": 200, "cases_per_pallet": 30,
+    })
+    assert response.status_code == 200, response.get_json()
+    assert client.get("/get_settings").get_json()["pallet_tare"] == 200
+
+
+def test_update_user_log(client):
+    response = client.post("/update_user_log?date=2025-09-01", json={"belt_eggs": 10000, "floor_eggs": 20})
+    assert response.status_code == 200, response.get_json()
+    user_log = client.get("/api/date_data?date=2025-09-01").get_json()["user_log"]
+    assert user_log["total_eggs"] == 10020
+
+
+def test_update_pallet(client, pallet_id):
+    response = client.post(f"/update_pallet/{pallet_id}", json={"weight": 1250})
+    assert response.status_code == 200, response.get_json()
+
+
+def test_sync_applies_log_edits(client):
+    response = client.post("/api/sync", json={"operations": [
+        {"op_id": "log-1", "kind": "log", "table": "user_log", "date": "2025-09-02",
+         "version": None, "fields": {"comments": "from the tablet"}},
+    ]})
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()["results"][0]["status"] == "applied"
+    # Resending the same operation is harmless
+    again = client.post("/api/sync", json={"operations": [
+        {"op_id": "log-1", "kind": "log", "table": "user_log", "date": "2025-09-02",
+         "version": None, "fields": {"comments": "from the tablet"}},
+    ]}).get_json()["results"][0]
+    assert again["duplicate"] is True
+
+
+def test_sync_rejects_a_bad_operation_but_applies_the_rest(client, pallet_id):
+    response = client.post("/api/sync", json={"operations": [
+        {"op_id": "pallet-bad", "kind": "pallet", "pallet_id": pallet_id, "fields": {"weight": "heavy"}},
+        {"op_id": "pallet-good", "kind": "pallet", "pallet_id": pallet_id, "fields": {"weight": "1180"}},
+        {"kind": "pallet", "pallet_id": pallet_id, "fields": {}},
+    ]})
+    assert response.status_code == 200
+    statuses = [r["status"] for r in response.get_json()["results"]]
+    assert statuses == ["rejected", "applied", "rejected"]
+
+
+@pytest.fixture
+def other_house(tmp_path):
+    from server.config import load_config, save_config
+    config = load_config()
+    config["houses"] = {"barn2": str(tmp_path / "barn2")}
+    save_config(config)
+    yield "barn2"
+    config = load_config()
+    config.pop("houses", None)
+    save_config(config)
+
+
+def test_send_to_unitas_refused_for_other_houses(client, other_house):
+    response = client.post(f"/update_user_log?date=2025-09-03&house={other_house}", json={"send_to_bot": 1})
+    assert response.status_code == 400
+    assert "only available" in response.get_json()["message"]
+    response = client.post(f"/api/manual_send_to_unitas?house={other_house}", json={"date": "2025-09-03"})
+    assert response.status_code == 400
+    results = client.post(f"/api/sync?house={other_house}", json={"operations": [
+        {"op_id": "send-1", "kind": "log", "table": "user_log", "date": "2025-09-03",
+         "version": None, "fields": {"send_to_bot": 1}},
+    ]}).get_json()["results"]
+    assert results[0]["status"] == "rejected"
+    # The default house still queues uploads
+    client.post("/update_user_log?date=2025-09-04&house=default", json={"comments": "ready"})
+    response = client.post("/update_user_log?date=2025-09-04&house=default", json={"send_to_bot": 1})
+    assert response.status_code == 200, response.get_json()
@@ -6,20 +6,20 @@ Provides web interface for viewing and editing farm data
 import os
 import sys
 import json
-import pathlib
-import requests
 import subprocess
-from flask import Flask, request, jsonify, render_template
-import sqlite3
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context, send_from_directory, g
 from datetime import date, datetime
 
 # Add server directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "server"))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "server/unitas_manager"))
 import database_helper as db
-from server.config import load_config, save_config, get_flat_config, get_database_path, get_deployment_mode, get_localhost_port, is_config_unconfigured, CONFIG_DIR
-from server.helpers import get_bird_age
-import server.unitas_manager.unitas_production as unitas
+from server.config import load_config, get_deployment_mode, get_localhost_port, is_config_unconfigured
+from server.tenants import house_registry
+from server.weather import weather_service
+from server.service_status import service_status_provider, MANAGED_SERVICES
+from server import metrics
+from server import export
+from server import charts
 
 app = Flask(__name__)
 
@@ -30,14 +30,19 @@ DB_FILE = None
 
 # Initialize database on startup - path depends on deployment mode
 try:
-    DB_FILE = pathlib.Path(get_database_path())
-    # Ensure directory exists
-    DB_FILE.parent.mkdir(parents=True, exist_ok=True)
-    db.setup_db(DB_FILE)
+    # The default house is the main config; other houses open on first request
+    DB_FILE = house_registry.default.db_file
 
-    # Initialize Unitas module with config
-    config = get_flat_config()
-    unitas.do_unitas_setup(config)
+    # Note: the web process never drives a browser, so the Unitas/Selenium
+    # modules are deliberately not imported here. The automation service owns
+    # all uploads; the web app only queues them.
+
+    # Request metrics (/metrics) - env var DATALOGGER_METRICS=1 also enables them
+    if load_config()["system"].get("metrics_enabled"):
+        metrics.configure(True)
+
+    # Start warming the weather cache so the Today tab never waits on NWS
+    weather_service.watch(load_config()["farm"].get("nws_station_id"))
 
     # Check if config needs to be configured
     CONFIG_NEEDS_SETUP = is_config_unconfigured()
@@ -49,68 +54,6 @@ except Exception as e:
     print(f"STARTUP ERROR: {e}")
     # Continue to allow Flask to start, but routes will show error page
 
-def fetch_nws_weather(station_id):
-    """Fetch current weather from National Weather Service station"""
-    try:
-        # Get latest observation from station
-        obs_url = f"https://api.weather.gov/stations/{station_id}/observations/latest"
-        headers = {'User-Agent': 'FarmDataLogger/1.0'}
-
-        print(f"DEBUG: Fetching weather from: {obs_url}")
-        obs_response = requests.get(obs_url, headers=headers, timeout=10)
-        print(f"DEBUG: Response status: {obs_response.status_code}")
-
-        if obs_response.status_code != 200:
-            print(f"DEBUG: Bad response code: {obs_response.status_code}")
-            return None
-
-        obs_data = obs_response.json()
-        text_description = obs_data['properties'].get('textDescription')
-        print(f"DEBUG: NWS text description: {text_description}")
-
-        if not text_description:
-            print("DEBUG: No text description in response")
-            return None
-
-        # Map NWS observation to our weather options
-        text_lower = text_description.lower()
-
-        weather_mapping = {
-            'sunny': 'Sunny',
-            'clear': 'Sunny',
-            'fair': 'Sunny',
-            'partly cloudy': 'Partly Cloudy',
-            'partly sunny': 'Partly Sunny',
-            'mostly cloudy': 'Mostly Cloudy',
-            'cloudy': 'Cloudy',
-            'overcast': 'Cloudy',
-            'rain': 'Rain',
-            'showers': 'Rain',
-            'drizzle': 'Rain',
-            'thunderstorm': 'Severe Storm',
-            'storm': 'Severe Storm',
-            'snow': 'Snow',
-            'sleet': 'Sleet',
-            'freezing': 'Freezing Rain',
-            'wind': 'Cloudy/Windy',
-        }
-
-        # Find best match
-        for key, value in weather_mapping.items():
-            if key in text_lower:
-                print(f"DEBUG: Matched '{key}' -> '{value}'")
-                return value
-
-        print(f"DEBUG: No match found for '{text_description}'")
-        return None  # Return None if no match
-
-    except Exception as e:
-        print(f"DEBUG: Error fetching weather: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
-
-
 # ─── Startup Error Handling ───
 
 from functools import wraps
@@ -124,10 +67,99 @@ def check_startup_error(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# ─── House Selection ───
+# One process can serve several houses (see server/tenants.py). A request
+# picks its house with ?house=, the X-House header or the "house" cookie
+# (set whenever ?house= is used); otherwise it gets the default house.
+
+HOUSE_COOKIE = "house"
+HOUSE_EXEMPT_ENDPOINTS = ("static", "service_worker", "metrics_endpoint")
+
+@app.before_request
+def select_house():
+    if STARTUP_ERROR or request.endpoint in HOUSE_EXEMPT_ENDPOINTS:
+        return None
+    name = request.args.get("house") or request.headers.get("X-House")
+    try:
+        if name:
+            g.house = house_registry.get(name)
+        else:
+            try:
+                g.house = house_registry.get(request.cookies.get(HOUSE_COOKIE))
+            except KeyError:
+                # House was removed from the config since the cookie was set
+                g.house = house_registry.default
+    except KeyError:
+        return jsonify({"status": "error", "message": f"Unknown house: {name}"}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"House {name} is not available: {e}"}), 503
+
+@app.after_request
+def remember_house(response):
+    if request.args.get("house") and "house" in g:
+        response.set_cookie(HOUSE_COOKIE, g.house.name, max_age=365 * 24 * 3600, samesite="Lax")
+    return response
+
+def current_house():
+    return g.get("house") or house_registry.default
+
+def current_db():
+    """Database file of the request's house"""
+    if "db_file" not in g:
+        g.db_file = current_house().db_file
+    return g.db_file
+
+def current_config():
+    return current_house().load_config()
+
+def save_current_config(config):
+    current_house().save_config(config)
+
+def current_calendar():
+    return current_house().flock_calendar()
+
+def _db_timestamp():
+    """Modification time of the house database, used by clients for polling"""
+    db_file = current_db()
+    return db_file.stat().st_mtime if db_file.exists() else 0
+
+# ─── Request Metrics ───
+
+def _metrics_endpoint_label():
+    """Use the route pattern (not the raw path) to keep label cardinality bounded"""
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+@app.before_request
+def metrics_begin_request():
+    metrics.begin_request()
+
+@app.after_request
+def metrics_end_request(response):
+    if metrics.ENABLED:
+        metrics.end_request(request.method, _metrics_endpoint_label(), response.status_code)
+    return response
+
+@app.teardown_request
+def metrics_teardown_request(exc):
+    if exc is not None and metrics.ENABLED:
+        endpoint = _metrics_endpoint_label()
+        metrics.record_exception(endpoint)
+        metrics.end_request(request.method, endpoint, 500)
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus scrape endpoint (404 when metrics are disabled)"""
+    if not metrics.ENABLED:
+        return jsonify({"status": "error", "message": "Metrics are disabled"}), 404
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 @app.context_processor
 def inject_config_status():
-    """Inject configuration status into all templates"""
-    return dict(config_needs_setup=CONFIG_NEEDS_SETUP)
+    """Inject configuration status and house selection into all templates"""
+    if STARTUP_ERROR:
+        return dict(config_needs_setup=CONFIG_NEEDS_SETUP)
+    return dict(config_needs_setup=CONFIG_NEEDS_SETUP, houses=house_registry.names(),
+                current_house=current_house().name)
 
 def render_startup_error():
     """Render a helpful error page when config/database initialization fails"""
@@ -204,10 +236,10 @@ def render_startup_error():
 @check_startup_error
 def index():
     today_str = date.today().isoformat()
-    user_log = db.get_daily_user_log(DB_FILE, today_str)
-    bot_log = db.get_daily_bot_log(DB_FILE, today_str)
-    user_logs = db.get_all_user_logs(DB_FILE)
-    bot_logs = db.get_all_bot_logs(DB_FILE)
+    user_log = db.get_daily_user_log(current_db(), today_str)
+    bot_log = db.get_daily_bot_log(current_db(), today_str)
+    user_logs = db.get_all_user_logs(current_db())
+    bot_logs = db.get_all_bot_logs(current_db())
     return render_template("index.html", user_log=user_log, bot_log=bot_log, user_logs=user_logs, bot_logs=bot_logs)
 
 @app.route("/add_pallet", methods=["POST"])
@@ -219,7 +251,7 @@ def add_pallet():
     house_id = 1
 
     # Get pallet settings from config
-    config = load_config()
+    config = current_config()
     pallet_tare = config["farm"].get("pallet_tare", 192)
     cases_per_pallet = config["farm"].get("cases_per_pallet", 30)
 
@@ -242,24 +274,24 @@ def add_pallet():
 
     # Calculate flock age from hatch date
     try:
-        flock_age = float(get_bird_age())
+        flock_age = float(current_calendar().age())
     except Exception as e:
         print(f"Error calculating bird age: {e}")
         flock_age = 0.0
 
     yolk_color = data.get("yolk_color")
 
-    db.insert_pallet_log(DB_FILE, thedate, pallet_id, house_id, total_pallet_weight, case_weight, flock_age, yolk_color)
+    db.insert_pallet_log(current_db(), thedate, pallet_id, house_id, total_pallet_weight, case_weight, flock_age, yolk_color)
 
     # Get DB timestamp for polling
-    db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
+    db_timestamp = _db_timestamp()
 
     return jsonify({"status": "ok", "message": "Pallet saved!", "db_timestamp": db_timestamp})
 
 @app.route("/get_pallet_logs", methods=["GET"])
 @check_startup_error
 def get_pallet_logs():
-    logs = db.get_recent_pallet_logs(DB_FILE, limit=10)
+    logs = db.get_recent_pallet_logs(current_db(), limit=10)
     return jsonify(logs)
 
 @app.route("/delete_pallet/<int:pallet_id>", methods=["DELETE"])
@@ -267,7 +299,7 @@ def get_pallet_logs():
 def delete_pallet(pallet_id):
     """Delete a pallet log entry by its ID"""
     try:
-        rows_deleted = db.delete_pallet_log(DB_FILE, pallet_id)
+        rows_deleted = db.delete_pallet_log(current_db(), pallet_id)
         if rows_deleted > 0:
             return jsonify({"status": "ok", "message": "Pallet deleted successfully"})
         else:
@@ -279,13 +311,13 @@ def delete_pallet(pallet_id):
 @check_startup_error
 def get_current_pallet():
     """Get the most recent pallet entry"""
-    pallet = db.get_most_recent_pallet(DB_FILE)
+    pallet = db.get_most_recent_pallet(current_db())
     if pallet:
         return jsonify(pallet)
     else:
         # No pallets exist yet, return empty structure with current bird age
         try:
-            flock_age = float(get_bird_age())
+            flock_age = float(current_calendar().age())
         except Exception as e:
             print(f"Error calculating bird age: {e}")
             flock_age = 0.0
@@ -304,10 +336,20 @@ def get_current_pallet():
 @check_startup_error
 def update_pallet(pallet_id):
     """Update a specific pallet entry (auto-save)"""
-    data = request.json
+    update_data = _pallet_update_data(request.json, current_config())
 
-    # Get pallet settings from config
-    config = load_config()
+    try:
+        db.update_pallet_log(current_db(), pallet_id, update_data)
+
+        # Get DB timestamp for polling
+        db_timestamp = _db_timestamp()
+
+        return jsonify({"status": "ok", "message": "Pallet updated", "db_timestamp": db_timestamp})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+def _pallet_update_data(data, config):
+    """Turn the pallet form fields into Pallet_Log columns, deriving weights from config"""
     pallet_tare = config["farm"].get("pallet_tare", 192)
     cases_per_pallet = config["farm"].get("cases_per_pallet", 30)
 
@@ -339,55 +381,19 @@ def update_pallet(pallet_id):
         update_data["case_weight"] = case_weight
         update_data["total_pallet_weight"] = total_pallet_weight
 
-    try:
-        db.update_pallet_log(DB_FILE, pallet_id, update_data)
-
-        # Get DB timestamp for polling
-        db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
-
-        return jsonify({"status": "ok", "message": "Pallet updated", "db_timestamp": db_timestamp})
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    return update_data
 
 @app.route("/create_new_pallet", methods=["POST"])
 @check_startup_error
 def create_new_pallet():
     """Create a new pallet entry with next ID and specified yolk color"""
-    data = request.json
-
-    # Get the most recent pallet to determine next ID
-    recent = db.get_most_recent_pallet(DB_FILE)
-
-    if recent and recent.get("pallet_id"):
-        # Try to parse and increment the pallet ID
-        try:
-            current_id = int(recent["pallet_id"])
-            next_id = str(current_id + 1)
-        except (ValueError, TypeError):
-            # If it's not a number, just use empty string
-            next_id = ""
-    else:
-        # No previous pallet or no ID, start fresh
-        next_id = ""
-
-    # Get yolk color from request (defaults to previous or empty)
-    yolk_color = data.get("yolk_color", "")
-    if not yolk_color and recent:
-        yolk_color = recent.get("yolk_color", "")
+    data = request.json or {}
 
-    # Create the new pallet entry
-    new_pallet_id = db.create_new_pallet_entry(DB_FILE, pallet_id=next_id, yolk_color=yolk_color)
-
-    # Fetch and return the newly created pallet
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM Pallet_Log WHERE id = ?", (new_pallet_id,))
-    new_pallet = dict(cur.fetchone())
-    conn.close()
+    # Next pallet number and insert happen in one transaction (safe under double taps)
+    new_pallet = db.create_pallet_with_next_id(current_db(), yolk_color=data.get("yolk_color", ""))
 
     # Get DB timestamp for polling
-    db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
+    db_timestamp = _db_timestamp()
     new_pallet["db_timestamp"] = db_timestamp
 
     return jsonify(new_pallet)
@@ -397,10 +403,10 @@ def create_new_pallet():
 def mark_pallet_completed(pallet_id):
     """Mark a pallet as completed"""
     try:
-        rows_updated = db.mark_pallet_completed(DB_FILE, pallet_id)
+        rows_updated = db.mark_pallet_completed(current_db(), pallet_id)
         if rows_updated > 0:
             # Get DB timestamp for polling
-            db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
+            db_timestamp = _db_timestamp()
             return jsonify({"status": "ok", "message": "Pallet marked as completed", "db_timestamp": db_timestamp})
         else:
             return jsonify({"status": "error", "message": "Pallet not found"}), 404
@@ -410,20 +416,19 @@ def mark_pallet_completed(pallet_id):
 @app.route("/config", methods=["GET"])
 @check_startup_error
 def get_config():
-    config = load_config()
+    config = current_config()
     return jsonify(config)
 
 @app.route("/add_daily_userlog", methods=["POST"])
 @check_startup_error
 def add_daily_userlog():
-    import json
     data = request.json
     date_val = date.today().isoformat()
     belt_eggs = data.get("belt_eggs")
     floor_eggs = data.get("floor_eggs")
 
     # Calculate total_eggs based on floor_eggs_through_belt setting
-    config = load_config()
+    config = current_config()
     floor_eggs_through_belt = config["farm"]["floor_eggs_through_belt"]
 
     belt_eggs_int = int(belt_eggs or 0)
@@ -466,7 +471,7 @@ def add_daily_userlog():
     door_closed = data.get("door_closed")
 
     db.insert_daily_user_log(
-        DB_FILE,
+        current_db(),
         date=date_val,
         belt_eggs=belt_eggs,
         floor_eggs=floor_eggs,
@@ -499,7 +504,7 @@ def add_daily_userlog():
     )
 
     # Get DB timestamp for polling
-    db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
+    db_timestamp = _db_timestamp()
 
     return jsonify({"status": "ok", "message": "Daily userlog saved!", "db_timestamp": db_timestamp})
 
@@ -508,17 +513,22 @@ def add_daily_userlog():
 def save_settings():
     data = request.json
     try:
-        config = load_config()
+        config = current_config()
+        old_hatch_date = config["farm"].get("hatch_date")
         config["farm"]["hatch_date"] = data.get("hatch_date")
         config["farm"]["birds_arrived_date"] = data.get("birds_arrived_date")
         config["farm"]["nws_station_id"] = data.get("nws_station_id")
         config["farm"]["floor_eggs_through_belt"] = data.get("floor_eggs_through_belt", False)
         config["farm"]["pallet_tare"] = data.get("pallet_tare", 192)
         config["farm"]["cases_per_pallet"] = data.get("cases_per_pallet", 30)
-        save_config(config)
+        save_current_config(config)
+
+        # A new hatch date starts a new flock: build its summaries from the existing logs
+        if config["farm"]["hatch_date"] and config["farm"]["hatch_date"] != old_hatch_date:
+            db.rebuild_summaries(current_db(), config["farm"]["hatch_date"])
 
         # Get DB timestamp for polling
-        db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
+        db_timestamp = _db_timestamp()
 
         return jsonify({"status": "ok", "message": "Settings saved!", "db_timestamp": db_timestamp})
     except Exception as e:
@@ -529,7 +539,7 @@ def save_settings():
 @check_startup_error
 def get_settings():
     try:
-        config = load_config()
+        config = current_config()
         return jsonify({
             "hatch_date": config["farm"]["hatch_date"],
             "birds_arrived_date": config["farm"]["birds_arrived_date"],
@@ -546,7 +556,7 @@ def get_settings():
 @check_startup_error
 def get_secrets():
     try:
-        config = load_config()
+        config = current_config()
         # Return flattened config for backwards compatibility with UI
         return jsonify({
             "Unitas_Username": config["unitas"]["username"],
@@ -575,7 +585,7 @@ def get_secrets():
 def save_secrets():
     data = request.json
     try:
-        config = load_config()
+        config = current_config()
 
         # Update config sections from flat data
         if "Unitas_Username" in data:
@@ -611,10 +621,10 @@ def save_secrets():
         if "telegram_chat_id" in data:
             config["telegram"]["chat_id"] = data["telegram_chat_id"]
 
-        save_config(config)
+        save_current_config(config)
 
         # Get DB timestamp for polling
-        db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
+        db_timestamp = _db_timestamp()
 
         return jsonify({"status": "ok", "message": "Configuration saved successfully!", "db_timestamp": db_timestamp})
     except Exception as e:
@@ -625,13 +635,13 @@ def save_secrets():
 @check_startup_error
 def get_weather():
     try:
-        config = load_config()
+        config = current_config()
         station_id = config["farm"].get("nws_station_id")
 
         if not station_id:
             return jsonify({"weather": None, "error": "No weather station configured"})
 
-        weather = fetch_nws_weather(station_id)
+        weather = weather_service.get(station_id)
         return jsonify({"weather": weather})
     except Exception:
         return jsonify({"weather": None, "error": "No weather station configured"})
@@ -642,12 +652,12 @@ def get_weather():
 def save_defaults():
     data = request.json
     try:
-        config = load_config()
+        config = current_config()
         config["form_defaults"] = data
-        save_config(config)
+        save_current_config(config)
 
         # Get DB timestamp for polling
-        db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
+        db_timestamp = _db_timestamp()
 
         return jsonify({"status": "ok", "message": "Defaults saved!", "db_timestamp": db_timestamp})
     except Exception as e:
@@ -658,7 +668,7 @@ def save_defaults():
 @check_startup_error
 def get_defaults():
     try:
-        config = load_config()
+        config = current_config()
         return jsonify(config.get("form_defaults", {}))
     except Exception:
         return jsonify({})
@@ -668,8 +678,9 @@ def get_defaults():
 def get_last_update_time():
     """Return the last modification time of the database file for polling"""
     try:
-        if DB_FILE and DB_FILE.exists():
-            mtime = DB_FILE.stat().st_mtime
+        db_file = current_db()
+        if db_file.exists():
+            mtime = db_file.stat().st_mtime
             return jsonify({"last_update": mtime})
         else:
             return jsonify({"last_update": 0})
@@ -677,14 +688,27 @@ def get_last_update_time():
         return jsonify({"last_update": 0, "error": str(e)})
 
 
-# Endpoint to update user log for a specific date
-TRIGGER_FILE_PATH = CONFIG_DIR / "pending_upload"
+def unitas_upload_error():
+    """Why the request's house can't send to Unitas, or None
+
+    The automation service only runs the upload queue of the default house's
+    database; a job queued in another house's database would never run.
+    """
+    if current_house() is house_registry.default:
+        return None
+    return f"Send to Unitas is only available for the {house_registry.default.name} house"
+
+def _sets_send_to_bot(change):
+    """True if a user_log change (batch save / sync operation) checks Send to Unitas"""
+    return change.get("table") == "user_log" and bool((change.get("fields") or {}).get("send_to_bot"))
 
+# Endpoint to update user log for a specific date
 def trigger_unitas_upload(date_str):
     """
     Trigger Unitas upload for a specific date.
     - If date is today: Do nothing (waits for 3 AM check)
-    - If date is not today: Create pending_upload trigger file
+    - If date is not today: Queue an upload job for the automation service
+    Callers reject sends for other houses first (unitas_upload_error()).
     """
     today_str = date.today().isoformat()
 
@@ -693,12 +717,10 @@ def trigger_unitas_upload(date_str):
         return
 
     try:
-        # Create trigger file for non-today dates
-        TRIGGER_FILE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        TRIGGER_FILE_PATH.touch()
-        print(f"[Upload] Created trigger file for {date_str}")
+        db.enqueue_upload_job(current_db(), "production", date_str)
+        print(f"[Upload] Queued upload for {date_str}")
     except Exception as e:
-        print(f"[Upload] Error creating trigger file: {e}")
+        print(f"[Upload] Error queuing upload: {e}")
 
 @app.route("/update_user_log", methods=["POST"])
 @check_startup_error
@@ -707,11 +729,11 @@ def update_user_log():
     # Get date from query parameter, default to today
     date_str = request.args.get('date', date.today().isoformat())
     # Get the current record to find the rowid or unique key
-    user_log = db.get_daily_user_log(DB_FILE, date_str)
+    user_log = db.get_daily_user_log(current_db(), date_str)
 
     # Calculate total_eggs based on floor_eggs_through_belt setting
     if 'belt_eggs' in data or 'floor_eggs' in data:
-        config = load_config()
+        config = current_config()
         floor_eggs_through_belt = config["farm"]["floor_eggs_through_belt"]
 
         belt_eggs = int(data.get('belt_eggs', 0) or 0)
@@ -732,22 +754,25 @@ def update_user_log():
         # Trigger upload if changing from unchecked to checked
         if not old_send_to_bot and new_send_to_bot:
             send_to_bot_changed = True
+            error = unitas_upload_error()
+            if error:
+                return jsonify({"status": "error", "message": error}), 400
 
     try:
         if not user_log:
             # No log exists, create a new one
             data['date'] = date_str
-            db.insert_daily_user_log(DB_FILE, **data)
+            db.insert_daily_user_log(current_db(), **data)
             message = f"User log created for {date_str}."
         else:
             # Update existing log
-            db.update_daily_user_log(DB_FILE, date_str, data)
+            db.update_daily_user_log(current_db(), date_str, data)
             message = f"User log updated for {date_str}."
 
         # Trigger upload if checkbox was just checked
         if send_to_bot_changed:
             # Check that bot_log exists before triggering upload
-            bot_log = db.get_daily_bot_log(DB_FILE, date_str)
+            bot_log = db.get_daily_bot_log(current_db(), date_str)
             if bot_log:
                 trigger_unitas_upload(date_str)
                 if date_str == date.today().isoformat():
@@ -758,7 +783,7 @@ def update_user_log():
                 message += " Warning: No bot log data found for this date - skipping upload."
 
         # Get DB timestamp for polling
-        db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
+        db_timestamp = _db_timestamp()
 
         return jsonify({"status": "ok", "message": message, "db_timestamp": db_timestamp})
     except Exception as e:
@@ -770,7 +795,7 @@ def update_user_log():
 def update_bot_log():
     data = request.json
     today_str = date.today().isoformat()
-    bot_log = db.get_daily_bot_log(DB_FILE, today_str)
+    bot_log = db.get_daily_bot_log(current_db(), today_str)
     if not bot_log:
         return jsonify({"status": "error", "message": "No bot log for today."}), 404
     # Use date or unique key for update
@@ -778,15 +803,133 @@ def update_bot_log():
     if not date_key:
         return jsonify({"status": "error", "message": "No date in bot log."}), 400
     try:
-        db.update_daily_bot_log(DB_FILE, date_key, data)
+        db.update_daily_bot_log(current_db(), date_key, data)
 
         # Get DB timestamp for polling
-        db_timestamp = DB_FILE.stat().st_mtime if DB_FILE and DB_FILE.exists() else 0
+        db_timestamp = _db_timestamp()
 
         return jsonify({"status": "ok", "message": "Bot log updated.", "db_timestamp": db_timestamp})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# Batched autosave endpoint for the Today tab
+@app.route("/api/batch_save", methods=["POST"])
+@check_startup_error
+def batch_save():
+    """
+    Apply several user_log/bot_log field changes in one transaction.
+
+    Body: {"changes": [{"table": "user_log"|"bot_log", "date": "YYYY-MM-DD",
+                        "version": <last seen row version>, "fields": {...}}, ...]}
+
+    Returns the new row versions, or 409 with the current rows if another
+    client changed any of them since the versions were read.
+    """
+    data = request.json or {}
+    changes = data.get("changes") or []
+    if not changes:
+        return jsonify({"status": "error", "message": "No changes provided"}), 400
+    if any(_sets_send_to_bot(c) for c in changes) and unitas_upload_error():
+        return jsonify({"status": "error", "message": unitas_upload_error()}), 400
+
+    try:
+        floor_eggs_through_belt = None
+        if any(c.get("table") == "user_log" and ("belt_eggs" in (c.get("fields") or {}) or "floor_eggs" in (c.get("fields") or {}))
+               for c in changes):
+            floor_eggs_through_belt = current_config()["farm"]["floor_eggs_through_belt"]
+
+        result = db.apply_log_changes(current_db(), changes, floor_eggs_through_belt=floor_eggs_through_belt)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    db_timestamp = _db_timestamp()
+
+    if result["conflicts"]:
+        return jsonify({
+            "status": "conflict",
+            "message": "Another device changed this data. Reload to see the latest values.",
+            "conflicts": result["conflicts"],
+            "db_timestamp": db_timestamp
+        }), 409
+
+    messages = _trigger_uploads_for(result["send_to_bot_set"])
+    return jsonify({
+        "status": "ok",
+        "message": " ".join(["Saved."] + messages),
+        "versions": result["versions"],
+        "db_timestamp": db_timestamp
+    })
+
+def _trigger_uploads_for(dates):
+    """Trigger uploads for dates whose send_to_bot was just checked; returns status messages"""
+    messages = []
+    for date_str in dates:
+        if db.get_daily_bot_log(current_db(), date_str):
+            trigger_unitas_upload(date_str)
+            if date_str == date.today().isoformat():
+                messages.append(f"{date_str} will upload at 3 AM.")
+            else:
+                messages.append(f"Upload triggered for {date_str}.")
+        else:
+            messages.append(f"Warning: No bot log data found for {date_str} - skipping upload.")
+    return messages
+
+# Replay of edits queued on a tablet while it was offline
+@app.route("/api/sync", methods=["POST"])
+@check_startup_error
+def api_sync():
+    """
+    Apply queued offline edits in order. Each operation carries a client op_id,
+    so a batch that is resent after a dropped response is not applied twice.
+
+    Body: {"operations": [{"op_id", "kind": "log", "table", "date", "version" | "base_op_id", "fields"},
+                          {"op_id", "kind": "pallet", "pallet_id", "fields": <pallet form fields>}, ...]}
+
+    Returns one result per operation: applied, duplicate (with the stored
+    result), conflict (with the current row) or rejected (with a message).
+    """
+    data = request.json or {}
+    operations = data.get("operations") or []
+    if not operations:
+        return jsonify({"status": "ok", "results": []})
+
+    try:
+        config = current_config()
+
+        def prepare(op):
+            # Bad pallet fields reject just this operation, not the whole batch
+            if op.get("kind") == "pallet":
+                op["fields"] = _pallet_update_data(op.get("fields") or {}, config)
+            elif _sets_send_to_bot(op) and unitas_upload_error():
+                raise ValueError(unitas_upload_error())
+
+        result = db.apply_sync_operations(
+            current_db(), operations, floor_eggs_through_belt=config["farm"]["floor_eggs_through_belt"],
+            prepare=prepare,
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    messages = _trigger_uploads_for(result["send_to_bot_set"])
+    db_timestamp = _db_timestamp()
+    return jsonify({
+        "status": "ok",
+        "message": " ".join(["Synced."] + messages),
+        "results": result["results"],
+        "db_timestamp": db_timestamp
+    })
+
+# Service worker must be served from the root so its scope covers the whole app
+@app.route("/sw.js")
+def service_worker():
+    response = send_from_directory(app.static_folder, "sw.js", mimetype="application/javascript")
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 # API endpoint to check send_to_bot status for a date range
 @app.route("/api/check_send_to_bot")
 @check_startup_error
@@ -798,7 +941,7 @@ def check_send_to_bot():
     if not date_str:
         return jsonify({"error": "No date provided"}), 400
 
-    user_log = db.get_daily_user_log(DB_FILE, date_str)
+    user_log = db.get_daily_user_log(current_db(), date_str)
     send_to_bot = user_log and (user_log.get('send_to_bot') == 1 or user_log.get('send_to_bot') == '1' or user_log.get('send_to_bot') == True)
 
     return jsonify({
@@ -818,32 +961,14 @@ def find_editable_date():
     if not start_date_str:
         return jsonify({"error": "No start_date provided"}), 400
 
-    from datetime import datetime, timedelta
     start_date = datetime.fromisoformat(start_date_str).date()
-    today = date.today()
-    offset = -1 if direction == 'prev' else 1
-
-    # Search for an editable date
-    for i in range(1, max_days + 1):
-        check_date = start_date + timedelta(days=offset * i)
-
-        # Don't go beyond today
-        if check_date > today:
-            break
+    found_date = db.find_editable_date(current_db(), start_date, direction=direction, max_days=max_days)
 
-        # Don't go too far back
-        if check_date.year < 2020:
-            break
-
-        check_date_str = check_date.isoformat()
-        user_log = db.get_daily_user_log(DB_FILE, check_date_str)
-
-        # If no log exists or send_to_bot is not checked, this date is editable
-        if not user_log or not (user_log.get('send_to_bot') == 1 or user_log.get('send_to_bot') == '1' or user_log.get('send_to_bot') == True):
-            return jsonify({
-                "found": True,
-                "date": check_date_str
-            })
+    if found_date:
+        return jsonify({
+            "found": True,
+            "date": found_date
+        })
 
     # No editable date found
     return jsonify({
@@ -855,25 +980,92 @@ def find_editable_date():
 @check_startup_error
 def all_data():
     # Fetch all user and bot logs
-    user_logs = db.get_all_user_logs(DB_FILE)
-    bot_logs = db.get_all_bot_logs(DB_FILE)
+    user_logs = db.get_all_user_logs(current_db())
+    bot_logs = db.get_all_bot_logs(current_db())
     return render_template("all_data.html", user_logs=user_logs, bot_logs=bot_logs)
 
 # API endpoint to fetch all user and bot logs as JSON for History tab
 @app.route("/api/all_data")
 @check_startup_error
 def api_all_data():
-    user_logs = db.get_all_user_logs(DB_FILE)
-    bot_logs = db.get_all_bot_logs(DB_FILE)
+    user_logs = db.get_all_user_logs(current_db())
+    bot_logs = db.get_all_bot_logs(current_db())
+    try:
+        current_calendar().annotate(user_logs)
+    except ValueError as e:
+        print(f"DEBUG: Not annotating bird age: {e}")
     return jsonify({"user_logs": user_logs, "bot_logs": bot_logs})
 
+# Weekly and flock-to-date production summaries
+@app.route("/api/production_summary")
+@check_startup_error
+def api_production_summary():
+    """Flock-to-date totals plus all weekly rows, or one week with ?week=N"""
+    flock_id = request.args.get("flock_id")
+    week = request.args.get("week")
+    if week is not None:
+        try:
+            summary = db.get_weekly_summary(current_db(), int(week), flock_id)
+        except ValueError:
+            return jsonify({"status": "error", "message": f"Invalid week: {week}"}), 400
+        return jsonify({"status": "ok", "week": summary})
+    return jsonify({
+        "status": "ok",
+        "flock": db.get_flock_summary(current_db(), flock_id),
+        "weeks": db.get_weekly_summaries(current_db(), flock_id),
+    })
+
+# Downsampled series for the History charts
+@app.route("/api/chart_data")
+@check_startup_error
+def api_chart_data():
+    """e.g. /api/chart_data?metrics=feed_consumption,water_consumption&start_date=2024-01-01&points=500"""
+    chart_metrics = [m.strip() for m in request.args.get("metrics", "").split(",") if m.strip()]
+    try:
+        points = int(request.args.get("points", 500))
+        data = charts.get_chart_data(
+            current_db(),
+            chart_metrics,
+            start_date=request.args.get("start_date"),
+            end_date=request.args.get("end_date"),
+            points=points,
+            method=request.args.get("method", "lttb"),
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"status": "ok", **data})
+
+# Streaming export of a whole table as CSV or NDJSON
+@app.route("/api/export/<dataset>")
+@check_startup_error
+def api_export(dataset):
+    """Stream user/bot/pallet/cooler rows, e.g. /api/export/bot?format=csv&start_date=2024-01-01&columns=date,total_eggs"""
+    fmt = request.args.get("format", "csv")
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+    columns = [c.strip() for c in request.args.get("columns", "").split(",") if c.strip()] or None
+
+    try:
+        chunks = export.stream_export(current_db(), dataset, fmt, start_date, end_date, columns)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+
+    filename = export.export_filename(dataset, fmt, start_date, end_date)
+    return Response(
+        stream_with_context(chunks),
+        mimetype=export.FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
 # API endpoint to fetch data for a specific date
 @app.route("/api/date_data")
 @check_startup_error
 def api_date_data():
     # Get date from query parameter, default to today
     date_str = request.args.get('date', date.today().isoformat())
-    user_log = db.get_daily_user_log(DB_FILE, date_str)
+    user_log = db.get_daily_user_log(current_db(), date_str)
 
     # If no user log exists for this date, create one with defaults
     if not user_log:
@@ -881,8 +1073,9 @@ def api_date_data():
         defaults = {}
 
         # Load defaults from config
+        config = None
         try:
-            config = load_config()
+            config = current_config()
             defaults = config.get("form_defaults", {}).copy()
             print(f"DEBUG: Loaded defaults: {defaults}")
         except Exception as e:
@@ -891,23 +1084,23 @@ def api_date_data():
         # Auto-fetch weather if station is configured (only for today)
         if date_str == date.today().isoformat():
             try:
-                config = load_config()
+                config = config or current_config()
                 station_id = config["farm"].get("nws_station_id")
                 if station_id:
-                    print(f"DEBUG: Attempting to fetch weather for station: {station_id}")
-                    weather = fetch_nws_weather(station_id)
+                    print(f"DEBUG: Reading cached weather for station: {station_id}")
+                    weather = weather_service.get(station_id)
                     if weather:
                         print(f"DEBUG: Got weather: {weather}")
                         defaults['weather'] = weather
                     else:
-                        print("DEBUG: Weather fetch returned None")
+                        print("DEBUG: No cached weather available yet")
             except Exception as e:
                 print(f"DEBUG: Failed to load config for weather: {e}")
 
             # Auto-fill nutritionist and ration_used from yesterday
             from datetime import timedelta
             yesterday = (date.today() - timedelta(days=1)).isoformat()
-            yesterday_log = db.get_daily_user_log(DB_FILE, yesterday)
+            yesterday_log = db.get_daily_user_log(current_db(), yesterday)
             if yesterday_log:
                 if yesterday_log.get('nutritionist'):
                     defaults['nutritionist'] = yesterday_log.get('nutritionist')
@@ -921,10 +1114,10 @@ def api_date_data():
         print(f"DEBUG: Creating user log with data: {defaults}")
         try:
             # Check again right before inserting to avoid race condition
-            user_log = db.get_daily_user_log(DB_FILE, date_str)
+            user_log = db.get_daily_user_log(current_db(), date_str)
             if not user_log:
-                db.insert_daily_user_log(DB_FILE, **defaults)
-                user_log = db.get_daily_user_log(DB_FILE, date_str)
+                db.insert_daily_user_log(current_db(), **defaults)
+                user_log = db.get_daily_user_log(current_db(), date_str)
                 print(f"DEBUG: Created user log: {user_log}")
             else:
                 print(f"DEBUG: User log was created by another request, using existing one")
@@ -933,7 +1126,7 @@ def api_date_data():
             import traceback
             traceback.print_exc()
             # Try to get it anyway in case another request created it
-            user_log = db.get_daily_user_log(DB_FILE, date_str)
+            user_log = db.get_daily_user_log(current_db(), date_str)
     else:
         print(f"DEBUG: Found existing user log for {date_str}: {user_log}")
         updates = {}
@@ -943,7 +1136,7 @@ def api_date_data():
             from datetime import datetime, timedelta
             current_date = datetime.fromisoformat(date_str).date()
             previous_day = (current_date - timedelta(days=1)).isoformat()
-            previous_log = db.get_daily_user_log(DB_FILE, previous_day)
+            previous_log = db.get_daily_user_log(current_db(), previous_day)
             if previous_log and previous_log.get('nutritionist'):
                 updates['nutritionist'] = previous_log.get('nutritionist')
                 print(f"DEBUG: Auto-filling nutritionist from {previous_day}: {updates['nutritionist']}")
@@ -952,36 +1145,37 @@ def api_date_data():
             from datetime import datetime, timedelta
             current_date = datetime.fromisoformat(date_str).date()
             previous_day = (current_date - timedelta(days=1)).isoformat()
-            previous_log = db.get_daily_user_log(DB_FILE, previous_day)
+            previous_log = db.get_daily_user_log(current_db(), previous_day)
             if previous_log and previous_log.get('ration_used'):
                 updates['ration_used'] = previous_log.get('ration_used')
                 print(f"DEBUG: Auto-filling ration_used from {previous_day}: {updates['ration_used']}")
 
         # If weather is blank and this is today, try to auto-fetch it
         if date_str == date.today().isoformat() and (not user_log.get('weather') or user_log.get('weather').strip() == ''):
-            print("DEBUG: Weather is blank, attempting to fetch")
+            print("DEBUG: Weather is blank, checking weather cache")
             try:
-                config = load_config()
+                config = current_config()
                 station_id = config["farm"].get("nws_station_id")
                 if station_id:
-                    print(f"DEBUG: Attempting to fetch weather for station: {station_id}")
-                    weather = fetch_nws_weather(station_id)
+                    print(f"DEBUG: Reading cached weather for station: {station_id}")
+                    weather = weather_service.get(station_id)
                     if weather:
                         print(f"DEBUG: Got weather: {weather}, updating user log")
                         updates['weather'] = weather
                     else:
-                        print("DEBUG: Weather fetch returned None")
+                        print("DEBUG: No cached weather available yet")
             except Exception as e:
                 print(f"DEBUG: Failed to load config for weather: {e}")
 
         # Apply all updates at once
         if updates:
-            db.update_daily_user_log(DB_FILE, date_str, updates)
-            user_log.update(updates)
+            db.update_daily_user_log(current_db(), date_str, updates)
+            # Re-read so the returned row carries the bumped version
+            user_log = db.get_daily_user_log(current_db(), date_str)
             print(f"DEBUG: Applied updates to user log: {updates}")
 
-    bot_log = db.get_daily_bot_log(DB_FILE, date_str)
-    pallet_log = db.get_pallets_by_date(DB_FILE, date_str)
+    bot_log = db.get_daily_bot_log(current_db(), date_str)
+    pallet_log = db.get_pallets_by_date(current_db(), date_str)
     return jsonify({"user_log": user_log, "bot_log": bot_log, "pallet_log": pallet_log})
 
 # API endpoint to fetch today's data (kept for backward compatibility)
@@ -989,7 +1183,7 @@ def api_date_data():
 @check_startup_error
 def api_today_data():
     today_str = date.today().isoformat()
-    user_log = db.get_daily_user_log(DB_FILE, today_str)
+    user_log = db.get_daily_user_log(current_db(), today_str)
 
     # If no user log exists for today, create one with defaults
     if not user_log:
@@ -998,7 +1192,7 @@ def api_today_data():
 
         # Load defaults from config
         try:
-            config = load_config()
+            config = current_config()
             defaults = config.get("form_defaults", {}).copy()
             print(f"DEBUG: Loaded defaults: {defaults}")
         except Exception as e:
@@ -1006,23 +1200,23 @@ def api_today_data():
 
         # Auto-fetch weather if station is configured
         try:
-            config = load_config()
+            config = current_config()
             station_id = config["farm"].get("nws_station_id")
             if station_id:
-                print(f"DEBUG: Attempting to fetch weather for station: {station_id}")
-                weather = fetch_nws_weather(station_id)
+                print(f"DEBUG: Reading cached weather for station: {station_id}")
+                weather = weather_service.get(station_id)
                 if weather:
                     print(f"DEBUG: Got weather: {weather}")
                     defaults['weather'] = weather
                 else:
-                    print("DEBUG: Weather fetch returned None")
+                    print("DEBUG: No cached weather available yet")
         except Exception as e:
             print(f"DEBUG: Failed to load config for weather: {e}")
 
         # Auto-fill nutritionist and ration_used from yesterday
         from datetime import timedelta
         yesterday = (date.today() - timedelta(days=1)).isoformat()
-        yesterday_log = db.get_daily_user_log(DB_FILE, yesterday)
+        yesterday_log = db.get_daily_user_log(current_db(), yesterday)
         if yesterday_log:
             if yesterday_log.get('nutritionist'):
                 defaults['nutritionist'] = yesterday_log.get('nutritionist')
@@ -1036,10 +1230,10 @@ def api_today_data():
         print(f"DEBUG: Creating user log with data: {defaults}")
         try:
             # Check again right before inserting to avoid race condition
-            user_log = db.get_daily_user_log(DB_FILE, today_str)
+            user_log = db.get_daily_user_log(current_db(), today_str)
             if not user_log:
-                db.insert_daily_user_log(DB_FILE, **defaults)
-                user_log = db.get_daily_user_log(DB_FILE, today_str)
+                db.insert_daily_user_log(current_db(), **defaults)
+                user_log = db.get_daily_user_log(current_db(), today_str)
                 print(f"DEBUG: Created user log: {user_log}")
             else:
                 print(f"DEBUG: User log was created by another request, using existing one")
@@ -1048,28 +1242,28 @@ def api_today_data():
             import traceback
             traceback.print_exc()
             # Try to get it anyway in case another request created it
-            user_log = db.get_daily_user_log(DB_FILE, today_str)
+            user_log = db.get_daily_user_log(current_db(), today_str)
     else:
         print(f"DEBUG: Found existing user log: {user_log}")
         # If weather is blank, try to auto-fetch it
         if not user_log.get('weather') or user_log.get('weather').strip() == '':
-            print("DEBUG: Weather is blank, attempting to fetch")
-            if os.path.exists(settings_path):
-                with open(settings_path, "r") as f:
-                    settings = json.load(f)
-                station_id = settings.get("nws_station_id")
+            print("DEBUG: Weather is blank, checking weather cache")
+            try:
+                station_id = current_config()["farm"].get("nws_station_id")
                 if station_id:
-                    print(f"DEBUG: Attempting to fetch weather for station: {station_id}")
-                    weather = fetch_nws_weather(station_id)
+                    print(f"DEBUG: Reading cached weather for station: {station_id}")
+                    weather = weather_service.get(station_id)
                     if weather:
                         print(f"DEBUG: Got weather: {weather}, updating user log")
                         # Update the weather field
-                        db.update_daily_user_log(DB_FILE, today_str, {'weather': weather})
+                        db.update_daily_user_log(current_db(), today_str, {'weather': weather})
                         user_log['weather'] = weather
                     else:
-                        print("DEBUG: Weather fetch returned None")
+                        print("DEBUG: No cached weather available yet")
+            except Exception as e:
+                print(f"DEBUG: Failed to load config for weather: {e}")
 
-    bot_log = db.get_daily_bot_log(DB_FILE, today_str)
+    bot_log = db.get_daily_bot_log(current_db(), today_str)
     return jsonify({"user_log": user_log, "bot_log": bot_log})
 
 # Service management endpoints
@@ -1078,27 +1272,7 @@ def api_today_data():
 def service_status():
     """Get status of datalogger and xml-watcher services"""
     try:
-        services = {}
-        for service_name in ['datalogger', 'xml-watcher']:
-            result = subprocess.run(
-                ['systemctl', 'show', f'{service_name}.service', '--property=ActiveState,SubState'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
-            # Parse output: ActiveState=active\nSubState=running
-            status = {}
-            for line in result.stdout.strip().split('\n'):
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    if key == 'ActiveState':
-                        status['active'] = value
-                    elif key == 'SubState':
-                        status['sub_state'] = value
-
-            services[service_name] = status
-
+        services = service_status_provider.get_status()
         return jsonify({"status": "ok", "services": services})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -1112,7 +1286,7 @@ def service_control():
     action = data.get('action')
 
     # Validate inputs
-    allowed_services = ['datalogger', 'xml-watcher']
+    allowed_services = MANAGED_SERVICES
     allowed_actions = ['start', 'stop', 'restart']
 
     if service not in allowed_services:
@@ -1123,12 +1297,14 @@ def service_control():
 
     try:
         # Execute systemctl command
-        result = subprocess.run(
-            ['sudo', 'systemctl', action, f'{service}.service'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        with metrics.time_outbound("systemctl"):
+            result = subprocess.run(
+                ['sudo', 'systemctl', action, f'{service}.service'],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+        service_status_provider.invalidate()
 
         if result.returncode == 0:
             return jsonify({
@@ -1149,41 +1325,43 @@ def service_control():
 @check_startup_error
 def unuploaded_days():
     """Return dates from the last 7 days (excluding today) not yet uploaded to Unitas"""
-    dates = db.get_unuploaded_days(DB_FILE, days=7)
+    dates = db.get_unuploaded_days(current_db(), days=7)
     return jsonify({"dates": dates})
 
 @app.route("/api/failed_verification_days")
 @check_startup_error
 def failed_verification_days():
     """Return dates that were uploaded to Unitas but failed verification"""
-    days = db.get_failed_verification_days(DB_FILE, days=14)
+    days = db.get_failed_verification_days(current_db(), days=14)
     return jsonify({"days": days})
 
 @app.route("/api/manual_send_to_unitas", methods=["POST"])
 @check_startup_error
 def manual_send_to_unitas():
-    """Manually trigger Unitas upload for a specific date by creating trigger file"""
+    """Manually trigger Unitas upload for a specific date by queuing an upload job"""
     data = request.json
     date_str = data.get('date')
 
     if not date_str:
         return jsonify({"status": "error", "message": "No date provided"}), 400
+    if unitas_upload_error():
+        return jsonify({"status": "error", "message": unitas_upload_error()}), 400
 
     # Validate that bot log exists
-    bot_log = db.get_daily_bot_log(DB_FILE, date_str)
+    bot_log = db.get_daily_bot_log(current_db(), date_str)
     if not bot_log:
         return jsonify({"status": "error", "message": "No bot log data found for this date"}), 400
 
     # Validate that send_to_bot is checked
-    user_log = db.get_daily_user_log(DB_FILE, date_str)
+    user_log = db.get_daily_user_log(current_db(), date_str)
     if not user_log or not user_log.get('send_to_bot'):
         return jsonify({"status": "error", "message": "Schedule Send to Unitas must be checked"}), 400
 
     # Clear the sent_to_unitas_at timestamp to mark as pending
-    db.clear_unitas_send_timestamp(DB_FILE, date_str)
+    db.clear_unitas_send_timestamp(current_db(), date_str)
     print(f"[Manual Send] Cleared sent_to_unitas_at timestamp for {date_str}")
 
-    # Create trigger file for automation.py to process
+    # Queue it for automation.py to process
     trigger_unitas_upload(date_str)
 
     return jsonify({
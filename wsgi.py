@@ -21,10 +21,11 @@ os.environ['DATALOGGER_CONFIG_DIR'] = '/var/lib/datalogger'
 project_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_dir)
 sys.path.insert(0, os.path.join(project_dir, "server"))
-sys.path.insert(0, os.path.join(project_dir, "server/unitas_manager"))
 
 # Import the Flask app from webapp
 # This will use production database due to DEPLOYMENT_MODE env var
+# Keep this import light: every mod_wsgi process pays for it, so webapp must not
+# import selenium/webdriver_manager (see benchmarks/bench_webapp_import.py)
 from webapp import app as application
 
 # Set production configuration